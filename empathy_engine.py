@@ -6,12 +6,32 @@ __license__ = "MIT"
 
 
 import argparse
+import asyncio
+import bisect
+import functools
+import hashlib
+import inspect
+import io
 import json
+import math
+import mmap
 import os
+import re
+import shutil
+import sqlite3
+import struct
 import sys
 import textwrap
+import tempfile
+import threading
+import time
+import zipfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
 from dataclasses import dataclass, asdict
 from typing import Optional
+from urllib.parse import parse_qs, urlsplit
 
 try:
     from rich.console import Console
@@ -19,6 +39,18 @@ try:
 except ImportError:
     _RICH = False
 
+try:
+    import numpy as np
+    _NUMPY = True
+except ImportError:
+    _NUMPY = False
+
+try:
+    import tomllib
+    _TOML = True
+except ImportError:
+    _TOML = False
+
 
 
 class C:
@@ -90,40 +122,576 @@ class StaminaSystem:
     overshoot_penalty: bool = False
 
 
+class _Deferred:
+    """Placeholder for a _Lazy field: fn(instance) produces the real value."""
+    __slots__ = ("fn",)
+
+    def __init__(self, fn):
+        self.fn = fn
+
+
+class _Lazy:
+    """
+    Dataclass field descriptor.  Assigning a _Deferred stores the thunk; the
+    first read runs it and keeps the result, so text nobody looks at is never
+    formatted.  Plain values pass straight through.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name, self.slot = name, "_lazy_" + name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            raise AttributeError(self.name)   # no class-level default for dataclass()
+        v = obj.__dict__[self.slot]
+        if type(v) is _Deferred:
+            v = obj.__dict__[self.slot] = v.fn(obj)
+        return v
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.slot] = value
+
+
 @dataclass
 class GeneratedGame:
     condition: str
     genre: str
     title: str
     tagline: str
-    core_loop: str
+    core_loop: str = _Lazy()
     mechanics: list
     timeline: TimelineLayer
     meta_console: MetaConsole
-    learning_objectives: list
+    learning_objectives: list = _Lazy()
+    design_notes: str = _Lazy()
+    pseudocode: str = _Lazy()
+    stamina: "StaminaSystem | None" = None
+
+    def __getstate__(self):
+        for k in self.__dataclass_fields__:
+            getattr(self, k)   # resolve deferred text: thunks don't pickle
+        return self.__dict__
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# FROZEN DATA MODEL  — compact, hashable, read-only twins of the classes above
+# ══════════════════════════════════════════════════════════════════════════════
+# freeze() converts any of the dataclasses above: lists become tuples and
+# strings are interned, so a catalog held in memory shares one copy of every
+# NT name, role and design note.  Frozen objects have no __dict__ and work
+# anywhere the engine only reads (game_to_dict, TerminalRenderer, export);
+# thaw() turns them back into the mutable classes.
+
+@dataclass(frozen=True, slots=True)
+class FrozenNeurotransmitter:
+    name: str
+    baseline: float
+    role: str
+    game_effect: str
+
+@dataclass(frozen=True, slots=True)
+class FrozenProfile:
+    condition_name: str
+    neurotransmitters: tuple
+    systems_affected: tuple
+    primary_symptoms: tuple
+    timeline_pattern: str
+    medication_targets: tuple
+
+@dataclass(frozen=True, slots=True)
+class FrozenMechanic:
+    name: str
+    description: str
+    mapped_from: str
+    implementation_hint: str
+    intensity: float = 1.0
+
+@dataclass(frozen=True, slots=True)
+class FrozenTimeline:
+    name: str
+    description: str
+    events: tuple
+    braid_mechanic: str
+
+@dataclass(frozen=True, slots=True)
+class FrozenMetaConsole:
+    label: str
+    variables: tuple
+    description: str
+    inception_note: str
+
+@dataclass(frozen=True, slots=True)
+class FrozenStamina:
+    max_stamina:      float
+    regen_rate:       float
+    drain_rate:       float
+    regen_cap:        float
+    serotonin_weight: float
+    formula:          str
+    rest_threshold:   float = 0.25
+    overshoot_penalty: bool = False
+
+@dataclass(frozen=True, slots=True)
+class FrozenGame:
+    condition: str
+    genre: str
+    title: str
+    tagline: str
+    core_loop: str
+    mechanics: tuple
+    timeline: FrozenTimeline
+    meta_console: FrozenMetaConsole
+    learning_objectives: tuple
     design_notes: str
     pseudocode: str
-    stamina: "StaminaSystem | None" = None
+    stamina: "FrozenStamina | None" = None
+
+
+_FROZEN = {
+    Neurotransmitter: FrozenNeurotransmitter, PhysiologyProfile: FrozenProfile,
+    GameMechanic: FrozenMechanic, TimelineLayer: FrozenTimeline,
+    MetaConsole: FrozenMetaConsole, StaminaSystem: FrozenStamina, GeneratedGame: FrozenGame,
+}
+
+
+def freeze(obj, pool: Optional[dict] = None):
+    """
+    Frozen, interned copy of a data-model object (or list of them).
+
+    Pass the same dict as pool across calls to also share equal sub-objects:
+    every game for one condition then points at a single FrozenTimeline,
+    one FrozenMechanic per mechanic, and so on.  Games themselves are never
+    pooled, so each freeze(game) call still returns its own FrozenGame.
+    """
+    if isinstance(obj, str):
+        return sys.intern(obj)
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(x, pool) for x in obj)
+    cls = _FROZEN.get(type(obj))
+    if cls is None:
+        return obj   # numbers, None, or already frozen
+    f = cls(*[freeze(getattr(obj, k), pool) for k in obj.__dataclass_fields__])
+    return f if pool is None or cls is FrozenGame else pool.setdefault(f, f)
+
+
+_THAWED = {v: k for k, v in _FROZEN.items()}
+
+
+def thaw(obj):
+    """Mutable dataclass copy of a frozen object (tuples become lists); inverse of freeze()."""
+    if isinstance(obj, tuple):
+        return [thaw(x) for x in obj]
+    cls = _THAWED.get(type(obj))
+    if cls is None:
+        return obj   # strings, numbers, None, or already mutable
+    return cls(*[thaw(getattr(obj, k)) for k in obj.__dataclass_fields__])
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# INSTRUMENTATION
+# ══════════════════════════════════════════════════════════════════════════════
+
+class _Span:
+    """One timed region. Hooks see it twice: on start and on end."""
+    __slots__ = ("name", "args", "nbytes", "start", "dur")
+
+    def __init__(self, name, args):
+        self.name, self.args = name, args
+        self.nbytes = self.start = self.dur = None
+
+    def __bool__(self): return True
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        Tracer._emit("B", self)
+        return self
+
+    def __exit__(self, *exc):
+        self.dur = time.perf_counter() - self.start
+        Tracer._emit("E", self)
+        return False
+
+
+class _NullSpan:
+    """Shared do-nothing span handed out while no hook is registered."""
+    __slots__ = ()
+    nbytes = None
+    def __bool__(self): return False
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Span hooks around the stages of generate_game() and export_game().
+
+    With no hook registered, span() returns one shared no-op object, so the
+    instrumented code pays one attribute lookup and nothing else.
+    Guard any extra measuring work (byte counts) with ``if sp:``::
+
+        rec = ChromeTraceRecorder()
+        Tracer.register(rec)
+        engine.generate_game("adhd", "puzzle")
+        rec.dump("trace.json")        # chrome://tracing or ui.perfetto.dev
+
+    A hook is any callable ``hook(phase, span)``: phase is "B" on start and
+    "E" on end, when span.dur (seconds) and span.nbytes are filled in.
+    """
+    _HOOKS: list = []
+
+    @classmethod
+    def register(cls, hook):
+        if hook not in cls._HOOKS:
+            cls._HOOKS.append(hook)
+        return hook
+
+    @classmethod
+    def unregister(cls, hook):
+        if hook in cls._HOOKS:
+            cls._HOOKS.remove(hook)
+
+    @classmethod
+    def span(cls, name, **args):
+        if not cls._HOOKS:
+            return _NULL_SPAN
+        return _Span(name, args)
+
+    @classmethod
+    def _emit(cls, phase, span):
+        for hook in cls._HOOKS:
+            hook(phase, span)
+
+
+class ChromeTraceRecorder:
+    """Tracer hook collecting events in Chrome trace-event JSON format."""
+
+    def __init__(self):
+        self.events = []
+        self._t0    = time.perf_counter()
+        self._pid   = os.getpid()
+
+    def __call__(self, phase, span):
+        t  = span.start if phase == "B" else span.start + span.dur
+        ev = {"name": span.name, "cat": span.name.split(".")[0], "ph": phase,
+              "ts": round((t - self._t0) * 1e6, 3),
+              "pid": self._pid, "tid": threading.get_ident()}
+        args = dict(span.args)
+        if phase == "E":
+            args["dur_ms"] = round(span.dur * 1e3, 4)
+            if span.nbytes is not None:
+                args["bytes"] = span.nbytes
+        if args:
+            ev["args"] = args
+        self.events.append(ev)
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+
+# NEUROTRANSMITTER REGISTRY
 
 
+class NTRegistry:
+    """
+    One canonical key and a dense integer id per neurotransmitter.
+
+    Every display name ("Substance P", "Glutamate (NMDA)", "Dopamine_mesolimbic")
+    normalises once, here, to the key the rest of the engine and the
+    generated runtimes use ("substance_p", "glutamate_nmda", ...).  Ids are
+    handed out in registration order and never change, so hot code can keep
+    per-NT values in a list indexed by id.  ConditionLibrary.register()
+    registers every NT a profile mentions.
+    """
+    KEYS: list = []        # id -> canonical key
+    IDS: dict  = {}        # canonical key -> id
+    _MEMO: dict = {}       # raw name -> canonical key
+    _SEP = re.compile(r"[^a-z0-9]+")
+
+    @classmethod
+    def key(cls, name) -> str:
+        k = cls._MEMO.get(name)
+        if k is None:
+            k = cls._MEMO[name] = cls._SEP.sub("_", name.lower()).strip("_")
+        return k
+
+    @classmethod
+    def register(cls, name) -> int:
+        k = cls.key(name)
+        i = cls.IDS.get(k)
+        if i is None:
+            i = cls.IDS[k] = len(cls.KEYS)
+            cls.KEYS.append(k)
+        return i
+
+    @classmethod
+    def id(cls, name) -> Optional[int]:
+        return cls.IDS.get(cls.key(name))
+
+    @classmethod
+    def levels(cls, neurotransmitters, default=1.0) -> list:
+        """Baselines as a list indexed by id; NTs the profile lacks read as default."""
+        v = [default] * len(cls.KEYS)
+        for nt in neurotransmitters:
+            if isinstance(nt.baseline, float):
+                v[cls.register(nt.name)] = nt.baseline
+        return v
+
+
+# Fixed ids for the NTs the engine's own formulas read
+for _name in ("Serotonin", "Dopamine", "Norepinephrine", "GABA",
+              "Glutamate", "Cortisol", "Substance P", "Endorphins"):
+    NTRegistry.register(_name)
+(NT_SEROTONIN, NT_DOPAMINE, NT_NOREPINEPHRINE, NT_GABA,
+ NT_GLUTAMATE, NT_CORTISOL, NT_SUBSTANCE_P, NT_ENDORPHINS) = range(8)
+
+
+# Medication button deltas per condition, keyed by any NT spelling;
+# medication_preset() resolves them to canonical keys.
+MEDICATION_PRESETS = dict(
+    depression = dict(serotonin=0.3,  dopamine=0.2,  norepinephrine=0.2),
+    adhd       = dict(dopamine=0.3,   norepinephrine=0.25),
+    anxiety    = dict(gaba=0.4,       cortisol=-0.5),
+    bipolar    = dict(dopamine=-0.5,  serotonin=0.3),
+    chronic_pain=dict(substance_p=-0.4, serotonin=0.3, endorphins=0.2),
+    ptsd       = dict(norepinephrine=-0.4, serotonin=0.3),
+    schizophrenia=dict(dopamine_mesolimbic=-0.5, glutamate_nmda=0.2),
+    autism     = dict(gaba=0.3, glutamate=-0.2),
+)
+
+
+def medication_preset(condition: str) -> dict:
+    return {NTRegistry.key(k): v for k, v in MEDICATION_PRESETS.get(condition.lower(), {}).items()}
+
+
+# Pharmacokinetics per drug class, matched against words in a profile's
+# medication_targets.  Times are game seconds (a compressed clinical
+# course: SSRIs still take far longer to act than a stimulant); effects are
+# the Emax NT shift at saturating concentration (see MedicationModel).
+DRUG_CLASSES = {
+    #                 onset  t_max  half_life  interval   effects (Emax)
+    "ssri":           dict(onset=45.0, t_max=20.0, half_life=120.0, interval=60.0,
+                           effects={"serotonin": 0.6}),
+    "snri":           dict(onset=40.0, t_max=20.0, half_life=90.0,  interval=60.0,
+                           effects={"serotonin": 0.5, "norepinephrine": 0.3}),
+    "bupropion":      dict(onset=30.0, t_max=15.0, half_life=60.0,  interval=60.0,
+                           effects={"dopamine": 0.4, "norepinephrine": 0.2}),
+    "stimulant":      dict(onset=3.0,  t_max=8.0,  half_life=25.0,  interval=45.0,
+                           effects={"dopamine": 0.6, "norepinephrine": 0.5}),
+    "atomoxetine":    dict(onset=30.0, t_max=15.0, half_life=60.0,  interval=60.0,
+                           effects={"norepinephrine": 0.5}),
+    "buspirone":      dict(onset=20.0, t_max=5.0,  half_life=20.0,  interval=30.0,
+                           effects={"serotonin": 0.3, "cortisol": -0.4}),
+    "benzodiazepine": dict(onset=2.0,  t_max=5.0,  half_life=30.0,  interval=60.0,
+                           effects={"gaba": 0.8}),
+    "lithium":        dict(onset=40.0, t_max=15.0, half_life=150.0, interval=60.0,
+                           effects={"dopamine": -0.6, "glutamate": -0.3, "serotonin": 0.2}),
+    "valproate":      dict(onset=15.0, t_max=10.0, half_life=90.0,  interval=60.0,
+                           effects={"glutamate": -0.4, "gaba": 0.4}),
+    "antipsychotic":  dict(onset=10.0, t_max=10.0, half_life=120.0, interval=60.0,
+                           effects={"dopamine": -0.8, "dopamine_mesolimbic": -1.0}),
+    "clozapine":      dict(onset=15.0, t_max=10.0, half_life=90.0,  interval=60.0,
+                           effects={"dopamine_mesolimbic": -0.8, "glutamate_nmda": 0.4}),
+    "risperidone":    dict(onset=10.0, t_max=8.0,  half_life=100.0, interval=60.0,
+                           effects={"dopamine": -0.6, "glutamate": -0.2}),
+    "gabapentinoid":  dict(onset=5.0,  t_max=10.0, half_life=40.0,  interval=45.0,
+                           effects={"substance_p": -0.8}),
+    "prazosin":       dict(onset=5.0,  t_max=8.0,  half_life=30.0,  interval=60.0,
+                           effects={"norepinephrine": -0.8}),
+}
+
+
+def medication_regimen(condition: str) -> list:
+    """
+    The drugs a condition's medication_targets name, first-line first, each
+    a DRUG_CLASSES entry plus "name" with effects on canonical NT keys.
+    Conditions whose targets match no drug class get one generic drug whose
+    single-dose peak reproduces their MEDICATION_PRESETS deltas.
+    """
+    p = ConditionLibrary.get(condition)
+    out = []
+    for target in (p.medication_targets if p else []):
+        words = ConditionLibrary._tokens(target)
+        for name, pk in DRUG_CLASSES.items():
+            if name in words and all(d["name"] != name for d in out):
+                out.append({"name": name, **pk,
+                            "effects": {NTRegistry.key(k): v for k, v in pk["effects"].items()}})
+    if not out:
+        out.append(dict(name="medication", onset=5.0, t_max=10.0, half_life=60.0, interval=60.0,
+                        effects={k: 2 * v for k, v in medication_preset(condition).items()}))
+    return out
+
 
 # CONDITION LIBRARY
 
 
 class ConditionLibrary:
-    REGISTRY: dict = {}
+    REGISTRY: dict = {}    # name -> parsed PhysiologyProfile
+    _PENDING: dict = {}    # name -> (path, key) indexed by load(), parsed on first get()
+    _SOURCES: dict = {}    # single-file database path -> its top-level records
+
+    # Inverted indexes, maintained by register() for query()
+    _BY_NT: dict         = {}   # NTRegistry key -> sorted [(baseline, condition)]
+    _BY_SYSTEM: dict     = {}   # system -> {condition}
+    _BY_SYMPTOM: dict    = {}   # symptom token -> {condition}
+    _BY_MEDICATION: dict = {}   # medication-target token -> {condition}
+    _TOKEN = re.compile(r"[a-z0-9]+")
 
     @classmethod
     def register(cls, name, profile):
-        cls.REGISTRY[name.lower()] = profile
+        name = name.lower()
+        cls._PENDING.pop(name, None)
+        old = cls.REGISTRY.get(name)
+        if old is not None:
+            cls._unindex(name, old)
+        for nt in profile.neurotransmitters:
+            NTRegistry.register(nt.name)
+        cls.REGISTRY[name] = profile
+        cls._index(name, profile)
+
+    @classmethod
+    def _tokens(cls, text) -> set:
+        # whole words, plural "s" folded so "SNRI" also finds "SNRIs"
+        return {t[:-1] if len(t) > 3 and t[-1] == "s" and t[-2] != "s" else t
+                for t in cls._TOKEN.findall(text.lower())}
+
+    @classmethod
+    def _postings(cls, profile):
+        yield from ((cls._BY_SYSTEM, s.lower()) for s in profile.systems_affected)
+        for index, texts in ((cls._BY_SYMPTOM, profile.primary_symptoms),
+                             (cls._BY_MEDICATION, profile.medication_targets)):
+            for tok in set().union(*map(cls._tokens, texts)):
+                yield index, tok
+
+    @classmethod
+    def _index(cls, name, profile):
+        for nt in profile.neurotransmitters:
+            bisect.insort(cls._BY_NT.setdefault(NTRegistry.key(nt.name), []), (nt.baseline, name))
+        for index, key in cls._postings(profile):
+            index.setdefault(key, set()).add(name)
+
+    @classmethod
+    def _unindex(cls, name, profile):
+        for nt in profile.neurotransmitters:
+            rows = cls._BY_NT[NTRegistry.key(nt.name)]
+            i = bisect.bisect_left(rows, (nt.baseline, name))
+            if i < len(rows) and rows[i] == (nt.baseline, name):
+                del rows[i]
+        for index, key in cls._postings(profile):
+            index[key].discard(name)
+
+    @classmethod
+    def query(cls, nt=None, system=None, symptom=None, medication=None) -> list:
+        """
+        Conditions matching every given criterion, sorted by name.
+
+            ConditionLibrary.query(nt={"serotonin": (None, 0.5)})
+            ConditionLibrary.query(system="HPA_axis", medication="SNRI")
+
+        nt maps neurotransmitter name -> (lo, hi) baseline range, lo
+        inclusive, hi exclusive, either end None for unbounded.  system,
+        symptom and medication take a string or a list of strings; symptom
+        and medication match whole words, so "sleep" finds "sleep
+        disruption".  Lazily loaded conditions are parsed first.
+        """
+        for name in list(cls._PENDING):
+            cls.get(name)
+        sets = []
+        for name, (lo, hi) in (nt or {}).items():
+            rows = cls._BY_NT.get(NTRegistry.key(name), [])
+            i = 0 if lo is None else bisect.bisect_left(rows, (lo,))
+            j = len(rows) if hi is None else bisect.bisect_left(rows, (hi,))
+            sets.append({c for _, c in rows[i:j]})
+        for index, terms, split in ((cls._BY_SYSTEM, system, False),
+                                    (cls._BY_SYMPTOM, symptom, True),
+                                    (cls._BY_MEDICATION, medication, True)):
+            if terms is None:
+                continue
+            for term in ([terms] if isinstance(terms, str) else terms):
+                for key in (cls._tokens(term) if split else [term.lower()]):
+                    sets.append(index.get(key, set()))
+        if not sets:
+            return cls.all_names()
+        sets.sort(key=len)
+        return sorted(sets[0].intersection(*sets[1:]))
 
     @classmethod
     def get(cls, name) -> Optional[PhysiologyProfile]:
-        return cls.REGISTRY.get(name.lower())
+        name = name.lower()
+        p = cls.REGISTRY.get(name)
+        if p is None and name in cls._PENDING:
+            path, key = cls._PENDING[name]
+            record = cls._read(path) if key is None else cls._SOURCES[path][key]
+            try:
+                p = cls.profile_from_dict(record)
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"{path}: bad condition record '{name}': {e!r}") from None
+            cls.register(name, p)
+        return p
 
     @classmethod
     def all_names(cls) -> list:
-        return sorted(cls.REGISTRY.keys())
+        return sorted(cls.REGISTRY.keys() | cls._PENDING.keys())
+
+    @classmethod
+    def load(cls, path) -> int:
+        """
+        Index an external condition database; returns the number of names.
+
+        path is either a directory of <name>.json / <name>.toml files (one
+        profile each), or a single .json / .toml file mapping name -> profile.
+        A directory is indexed from its file names alone; a single file is
+        read once.  Either way no PhysiologyProfile is built until get()
+        first asks for it.  Records use the asdict(PhysiologyProfile) layout
+        and override any condition already registered under the same name.
+        """
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            index = {}
+            for entry in os.scandir(path):
+                stem, ext = os.path.splitext(entry.name)
+                if ext.lower() in (".json", ".toml") and entry.is_file():
+                    index[stem.lower()] = (entry.path, None)
+        elif os.path.isfile(path):
+            records = cls._read(path)
+            if not isinstance(records, dict):
+                raise ValueError(f"{path}: expected a table of name -> condition record")
+            cls._SOURCES[path] = records
+            index = {k.lower(): (path, k) for k in records}
+        else:
+            raise ValueError(f"Condition database not found: {path}")
+        for name in index:
+            old = cls.REGISTRY.pop(name, None)
+            if old is not None:
+                cls._unindex(name, old)
+        cls._PENDING.update(index)
+        return len(index)
+
+    @staticmethod
+    def _read(path) -> dict:
+        if path.lower().endswith(".toml"):
+            if not _TOML:
+                raise ImportError("TOML condition files need Python 3.11+ (tomllib)")
+            with open(path, "rb") as f:
+                return tomllib.load(f)
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def profile_from_dict(d: dict) -> PhysiologyProfile:
+        return PhysiologyProfile(
+            d["condition_name"],
+            [Neurotransmitter(n["name"], float(n["baseline"]), n.get("role", ""), n.get("game_effect", ""))
+             for n in d["neurotransmitters"]],
+            list(d.get("systems_affected", [])),
+            list(d.get("primary_symptoms", [])),
+            d.get("timeline_pattern", "chronic"),
+            list(d.get("medication_targets", [])),
+        )
 
 
 def _init_conditions():
@@ -278,7 +846,7 @@ ENGINES = {
         import_snippet="import arcade",
     ),
     "pyglet": dict(
-        label="Pyglet", install="pip install pyglet",
+        label="Pyglet", install='pip install "pyglet>=2"',
         url="https://pyglet.org",
         description="OpenGL-based. Excellent for 2D games and multimedia. Strong sprite handling.",
         best_for=["platformer","rhythm","narrative","stealth"],
@@ -320,7 +888,7 @@ ENGINES = {
         import_snippet="from kivy.app import App\nfrom kivy.uix.widget import Widget",
     ),
     "pyopengl": dict(
-        label="PyOpenGL", install="pip install PyOpenGL PyOpenGL_accelerate",
+        label="PyOpenGL", install="pip install PyOpenGL PyOpenGL_accelerate numpy",
         url="https://pyopengl.sourceforge.net",
         description="Low-level 3D rendering. Often combined with Pygame/Pyglet.",
         best_for=["platformer","survival"],
@@ -331,13 +899,669 @@ ENGINES = {
 
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+# RUNTIME HELPERS  — embedded verbatim into generated scaffolds
+# ══════════════════════════════════════════════════════════════════════════════
+# Scaffolds are standalone files, so these classes are copied into them with
+# inspect.getsource().  Keep them free of engine-module globals; they may only
+# use modules every scaffold imports (time, deque, ...).
+
+@functools.lru_cache(maxsize=None)
+def _embed(*objs) -> str:
+    # getsource() re-parses the whole module (~tens of ms); memoise per helper set
+    return "\n\n".join(inspect.getsource(o).rstrip() for o in objs)
+
+
+class FrameProfiler:
+    """
+    Per-phase frame timer for generated game loops (toggled with F2).
+
+        prof.begin_frame()
+        handle_events();   prof.mark("events")
+        runtime.tick(...); prof.mark("mechanics")
+        ...
+        prof.end_frame()
+
+    Disabled, every call returns after one attribute check.  Enabled, it
+    keeps a rolling window of per-phase times for the overlay and a
+    per-frame log of the last log_limit frames (10 min at 60 FPS) that
+    dump_csv() writes out on exit.
+    """
+
+    BLOCKS = "▁▂▃▄▅▆▇█"
+
+    def __init__(self, phases, window=240, log_limit=36_000):
+        self.phases   = list(phases)
+        self.enabled  = False
+        self._hist    = {ph: deque(maxlen=window) for ph in self.phases}
+        self._frames  = deque(maxlen=window)
+        self._rows    = deque(maxlen=log_limit)
+        self._logged  = 0   # frames ever logged; those before the deque's head were dropped
+        self._cur     = {}
+        self._t0 = self._last = 0.0
+        self._in_frame = False
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def begin_frame(self):
+        if not self.enabled: return
+        self._t0 = self._last = time.perf_counter()
+        self._cur = {}
+        self._in_frame = True
+
+    def mark(self, phase):
+        if not self._in_frame: return
+        now = time.perf_counter()
+        self._cur[phase] = self._cur.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    def end_frame(self):
+        if not self._in_frame: return
+        self._in_frame = False
+        if not self.enabled: return
+        total = time.perf_counter() - self._t0
+        row = [self._cur.get(ph, 0.0) for ph in self.phases]
+        for ph, v in zip(self.phases, row):
+            self._hist[ph].append(v)
+        self._frames.append(total)
+        self._rows.append((total, *row))
+        self._logged += 1
+
+    @staticmethod
+    def _p95(vals):
+        if not vals: return 0.0
+        ordered = sorted(vals)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def stats(self):
+        """[(phase, avg_ms, p95_ms), ...] over the rolling window, frame total last."""
+        out = []
+        for ph in self.phases:
+            h = self._hist[ph]
+            out.append((ph, 1e3 * sum(h) / max(len(h), 1), 1e3 * self._p95(h)))
+        f = self._frames
+        out.append(("frame", 1e3 * sum(f) / max(len(f), 1), 1e3 * self._p95(f)))
+        return out
+
+    def history(self):
+        """Rolling frame times in seconds, oldest first."""
+        return list(self._frames)
+
+    def sparkline(self, width=48, budget=1 / 60):
+        """Text sparkline of recent frame times; full block = 2x budget."""
+        top = len(self.BLOCKS) - 1
+        return "".join(self.BLOCKS[min(top, int(ft / (2 * budget) * top))]
+                       for ft in list(self._frames)[-width:])
+
+    def dump_csv(self, path):
+        """Write the logged frames as ms; no-op if nothing was recorded."""
+        if not self._rows: return None
+        first = self._logged - len(self._rows)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("frame,total_ms," + ",".join(f"{ph}_ms" for ph in self.phases) + "\n")
+            for i, row in enumerate(self._rows, first):
+                f.write(f"{i}," + ",".join(f"{v * 1e3:.4f}" for v in row) + "\n")
+        print(f"[profiler] {len(self._rows)} frames -> {path}")
+        return path
+
+
+class TelemetryRecorder:
+    """
+    Fixed-layout binary per-frame log, written through a memory-mapped file.
+
+    Records are packed into an in-memory ring with struct.pack_into and
+    copied to the mapping one ring at a time, so a frame costs one pack and
+    no syscalls.  The file grows in `chunk`-record steps and is trimmed to
+    the exact record count on close().
+
+    File layout (little-endian):
+      header  64 B   magic "EMTL", version u16, nt_count u16, record_size u32,
+                     record_count u64, created f64
+      names   32 B   per NT, NUL-padded utf-8, in record order
+      records        frame u32, t f32, <nt_count x f32>, stamina, energy,
+                     dread, masking f32, mood u8, input flags u8, 2 B pad
+
+    Open a finished log with TelemetryReader.open() in the engine.
+    """
+
+    MAGIC, VERSION = b"EMTL", 1
+    HEADER     = struct.Struct("<4sHHIQd36x")
+    NAME_BYTES = 32
+    MOODS      = {"": 0, "mania": 1, "euthymia": 2, "depression": 3}
+
+    def __init__(self, path, nt_names, ring=1024, chunk=65536):
+        self.path     = path
+        self.nt_names = list(nt_names)
+        self.record_struct = struct.Struct(f"<If{len(self.nt_names)}f4fBB2x")
+        self.data_offset   = self.HEADER.size + self.NAME_BYTES * len(self.nt_names)
+        self.count  = 0
+        self.created = time.time()
+        self._size  = self.record_struct.size
+        self._ring  = bytearray(self._size * ring)
+        self._cap   = ring
+        self._n     = 0
+        self._chunk = chunk
+        self._file  = open(path, "w+b")
+        self._file.write(self._header())
+        for name in self.nt_names:
+            self._file.write(name.encode("utf-8")[:self.NAME_BYTES].ljust(self.NAME_BYTES, b"\0"))
+        self._file.truncate(self.data_offset + self._size * chunk)
+        self._file.flush()
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    def _header(self):
+        return self.HEADER.pack(self.MAGIC, self.VERSION, len(self.nt_names),
+                                self._size, self.count, self.created)
+
+    def record(self, frame, t, nt, gs, flags=0):
+        self.record_struct.pack_into(
+            self._ring, self._n * self._size, frame, t,
+            *[nt.get(k, 0.0) for k in self.nt_names],
+            gs.get("stamina", 0.0), gs.get("energy", 0.0),
+            gs.get("dread", 0.0), gs.get("masking", 0.0),
+            self.MOODS.get(gs.get("mood_phase", ""), 0), flags & 0xFF)
+        self._n += 1
+        if self._n == self._cap:
+            self.flush()
+
+    def flush(self):
+        if self._mm is None or not self._n: return
+        nbytes = self._n * self._size
+        off    = self.data_offset + self.count * self._size
+        if off + nbytes > len(self._mm):
+            self._mm.close()
+            self._file.truncate(off + nbytes + self._size * self._chunk)
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+        self._mm[off:off + nbytes] = memoryview(self._ring)[:nbytes]
+        self.count += self._n
+        self._n = 0
+        self._mm[:self.HEADER.size] = self._header()
+
+    def truncate(self, t) -> int:
+        """Drop the trailing records later than t (after a rewind); returns the last kept frame."""
+        limit, count = struct.unpack("<f", struct.pack("<f", t))[0], self.count
+        while self._n or self.count:
+            if self._n:
+                frame, rt = struct.unpack_from("<If", self._ring, (self._n - 1) * self._size)
+            else:
+                frame, rt = struct.unpack_from("<If", self._mm, self.data_offset + (self.count - 1) * self._size)
+            if rt <= limit:
+                break
+            if self._n: self._n -= 1
+            else:       self.count -= 1
+        else:
+            frame = 0
+        if self.count != count:
+            self._mm[:self.HEADER.size] = self._header()
+        return frame
+
+    def close(self):
+        if self._mm is None: return
+        self.flush()
+        self._mm.flush(); self._mm.close(); self._mm = None
+        self._file.truncate(self.data_offset + self.count * self._size)
+        self._file.close()
+        print(f"[telemetry] {self.count} frames -> {self.path}")
+
+
+class InputLog:
+    """
+    Compact per-frame input recording for deterministic replay.
+
+    Each frame is one input bitmask (held keys plus that frame's key
+    presses).  Only changes are stored, as (varint frame delta, u8 mask)
+    pairs, so an idle hour costs a few bytes.  The header carries the
+    mechanic RNG seed and the fixed step rate the session was played at.
+
+        log = InputLog.load("student_07.emir")
+        for mask in log.masks(): ...          # one mask per recorded frame
+    """
+
+    MAGIC, VERSION = b"EMIR", 1
+    HEADER = struct.Struct("<4sHHQI")    # magic, version, fps, seed, frames
+
+    def __init__(self, seed=0, fps=60):
+        self.seed   = seed % 2**64
+        self.fps    = fps
+        self.frames = 0
+        self._buf   = bytearray()
+        self._last  = 0
+        self._last_frame = 0
+
+    def append(self, mask):
+        mask &= 0xFF
+        if mask != self._last:
+            delta = self.frames - self._last_frame
+            while delta >= 0x80:
+                self._buf.append((delta & 0x7F) | 0x80)
+                delta >>= 7
+            self._buf.append(delta)
+            self._buf.append(mask)
+            self._last, self._last_frame = mask, self.frames
+        self.frames += 1
+
+    def _changes(self):
+        buf, i, frame = self._buf, 0, 0
+        while i < len(buf):
+            delta = shift = 0
+            while True:
+                b = buf[i]; i += 1
+                delta |= (b & 0x7F) << shift
+                shift += 7
+                if b < 0x80: break
+            frame += delta
+            yield frame, buf[i]
+            i += 1
+
+    def masks(self):
+        mask, changes = 0, self._changes()
+        nxt = next(changes, None)
+        for f in range(self.frames):
+            while nxt and nxt[0] == f:
+                mask = nxt[1]
+                nxt  = next(changes, None)
+            yield mask
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.fps, self.seed, self.frames))
+            f.write(self._buf)
+        print(f"[input] {self.frames} frames, {len(self._buf)} B -> {path}")
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            raw = f.read()
+        if len(raw) < cls.HEADER.size or raw[:4] != cls.MAGIC:
+            raise ValueError(f"'{path}' is not an input recording.")
+        _, version, fps, seed, frames = cls.HEADER.unpack_from(raw)
+        if version != cls.VERSION:
+            raise ValueError(f"Unsupported input recording version {version} in '{path}'.")
+        log = cls(seed, fps)
+        log.frames, log._buf = frames, bytearray(raw[cls.HEADER.size:])
+        return log
+
+
+class MedicationModel:
+    """
+    Pharmacokinetic medication layer: doses change NT levels over time.
+
+    Each drug follows a one-compartment oral curve (Bateman function) that
+    starts after an onset lag, peaks at t_max and decays with its half-life,
+    all in game seconds.  Doses superpose, and every dose's curve is the
+    difference of two exponentials, so concentration() keeps the two sums
+    for all absorbing doses and decays them forward: O(1) per call however
+    many doses are stacked.  A dose drops out 10 half-lives after its peak.
+    The single-dose curve is also tabulated at STEP resolution for
+    population().  Concentration C shifts each NT by emax * C / (1 + C):
+    half of emax at a single dose's peak, saturating rather than growing
+    without bound under stacked doses.
+
+        meds = MedicationModel(MEDICATION_REGIMEN)
+        meds.dose(t)          # M key
+        meds.apply(t, nt)     # every frame
+    """
+    STEP = 0.25
+
+    def __init__(self, drugs):
+        self.drugs   = list(drugs)
+        self.kinetics = [self.rates(d) for d in self.drugs]
+        self.tables  = [self.curve(d, self.STEP) for d in self.drugs]
+        self.doses   = [deque() for _ in self.drugs]   # dose times not yet eliminated
+        self.applied = {}                              # NT shift currently added to nt
+        self._sums   = [None] * len(self.drugs)        # [doses, t, absorbing, sum_e, sum_a]
+        self._np     = None
+
+    @staticmethod
+    def rates(drug) -> tuple:
+        """(ke, ka, peak, life): Bateman rate constants, single-dose peak, seconds from onset to drop-out."""
+        ke    = math.log(2) / drug["half_life"]
+        t_max = min(drug["t_max"], 0.99 / ke)
+        lo, hi = ke * (1 + 1e-9), ke * 1e4                # t_max(ka) falls as ka rises
+        for _ in range(100):
+            ka = (lo + hi) / 2
+            lo, hi = (ka, hi) if math.log(ka / ke) / (ka - ke) > t_max else (lo, ka)
+        peak = math.exp(-ke * t_max) - math.exp(-ka * t_max)
+        return ke, ka, peak, t_max + 10 * drug["half_life"]
+
+    @classmethod
+    def curve(cls, drug, step) -> list:
+        """Single-dose concentration sampled every step seconds, peak normalised to 1."""
+        ke, ka, peak, life = cls.rates(drug)
+        bateman = lambda t: math.exp(-ke * t) - math.exp(-ka * t) if t > 0 else 0.0
+        n = int((drug["onset"] + life) / step) + 2
+        return [bateman(i * step - drug["onset"]) / peak for i in range(n)]
+
+    def dose(self, t, drug=0):
+        self.doses[drug].append(t)
+
+    def concentration(self, t, drug=0) -> float:
+        doses = self.doses[drug]
+        ke, ka, peak, life = self.kinetics[drug]
+        onset = self.drugs[drug]["onset"]
+        s = self._sums[drug]
+        if s is None or s[0] is not doses or t < s[1] or s[2] > len(doses):
+            s = self._sums[drug] = [doses, t, 0, 0.0, 0.0]   # first call, or doses restored/rewound
+        _, t0, n, se, sa = s
+        if t > t0:
+            se *= math.exp(-ke * (t - t0)); sa *= math.exp(-ka * (t - t0))
+        while n < len(doses) and t >= doses[n] + onset:      # absorption starts
+            x = t - doses[n] - onset
+            se += math.exp(-ke * x); sa += math.exp(-ka * x); n += 1
+        while n and t - doses[0] - onset >= life:            # fully eliminated
+            x = t - doses.popleft() - onset
+            se -= math.exp(-ke * x); sa -= math.exp(-ka * x); n -= 1
+        if not n:
+            se = sa = 0.0
+        s[1:] = t, n, se, sa
+        return max(0.0, (se - sa) / peak)
+
+    def shift(self, t) -> dict:
+        """NT deltas the current drug concentrations produce."""
+        out = {}
+        for i, drug in enumerate(self.drugs):
+            c = self.concentration(t, i)
+            if c > 0:
+                e = c / (1.0 + c)
+                for k, emax in drug["effects"].items():
+                    out[k] = out.get(k, 0.0) + emax * e
+        return out
+
+    def apply(self, t, nt):
+        """Move nt by the change in drug effect since the last call (other edits to nt stay)."""
+        new, applied = self.shift(t), {}
+        for k in set(new) | set(self.applied):
+            if k in nt:
+                base  = nt[k] - self.applied.get(k, 0.0)
+                nt[k] = max(0.0, min(2.0, base + new.get(k, 0.0)))
+                if nt[k] != base:
+                    applied[k] = nt[k] - base   # the shift actually added, after clamping
+        self.applied = applied
+
+    def population(self, t, dose_times, drug=0):
+        """
+        Vectorised concentration for many agents (NumPy): t is a scalar or
+        (N,) array of times, dose_times an (N, D) array with NaN for doses
+        not taken.  Returns an (N,) array.
+        """
+        import numpy as np
+        if self._np is None:
+            self._np = [np.asarray(tab + [0.0]) for tab in self.tables]
+        tab = self._np[drug]
+        x = (np.asarray(t, dtype=float)[..., None] - dose_times) / self.STEP
+        ok = (x >= 0) & (x < len(tab) - 2)
+        x = np.where(ok, x, 0.0)
+        i = x.astype(np.intp)
+        return np.where(ok, tab[i] + (tab[i + 1] - tab[i]) * (x - i), 0.0).sum(axis=-1)
+
+
+class Rewind:
+    """
+    Keyframe + delta history of a flat state dict, for scrubbing back in time.
+
+    record() stores a full snapshot every `keyframe` seconds and, in between,
+    only the entries that changed since the previous frame.  seek(t) rebuilds
+    the last recorded frame at or before t from one snapshot plus at most
+    `keyframe` seconds of deltas.  Past `budget` bytes (estimated) the oldest
+    keyframe and its deltas are dropped, so history is a sliding window.
+
+        rewind.record(sim_t, capture_state(...))         # every frame
+        t, state = rewind.seek(sim_t - 10.0)             # 10 s back
+        restore_state(state, ...); rewind.truncate(t)    # play on from there
+    """
+
+    def __init__(self, keyframe=5.0, budget=32 << 20):
+        self.keyframe = keyframe
+        self.budget   = budget
+        self.starts   = []      # keyframe times, ascending
+        self.blocks   = []      # [snapshot, frame times, deltas, bytes]
+        self.size     = 0
+        self._last    = {}
+
+    @property
+    def start(self) -> float:
+        return self.starts[0] if self.starts else 0.0
+
+    @classmethod
+    def _sizeof(cls, obj) -> int:
+        n = sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            n += sum(cls._sizeof(v) for v in obj.values())
+        elif isinstance(obj, tuple):
+            n += sum(cls._sizeof(v) for v in obj)
+        return n
+
+    def record(self, t, state):
+        """Add the frame at time t; state must not be mutated afterwards."""
+        if not self.starts or t - self.starts[-1] >= self.keyframe:
+            cost = self._sizeof(state)
+            self.starts.append(t)
+            self.blocks.append([state, [], [], cost])
+        else:
+            last  = self._last
+            delta = {k: v for k, v in state.items() if k not in last or last[k] != v}
+            cost  = self._sizeof(delta) + 8
+            block = self.blocks[-1]
+            block[1].append(t); block[2].append(delta); block[3] += cost
+        self._last = state
+        self.size += cost
+        while self.size > self.budget and len(self.blocks) > 1:
+            self.size -= self.blocks.pop(0)[3]
+            self.starts.pop(0)
+
+    def seek(self, t) -> tuple:
+        """(time, state) of the last recorded frame at or before t (else the oldest)."""
+        if not self.blocks:
+            raise ValueError("nothing recorded yet")
+        i = max(0, bisect.bisect_right(self.starts, t) - 1)
+        snapshot, times, deltas, _ = self.blocks[i]
+        n = bisect.bisect_right(times, t)
+        state = dict(snapshot)
+        for delta in deltas[:n]:
+            state.update(delta)
+        return (times[n - 1] if n else self.starts[i]), state
+
+    def truncate(self, t):
+        """Forget every frame after t, so recording continues from a rewound state."""
+        while len(self.blocks) > 1 and self.starts[-1] > t:
+            self.size -= self.blocks.pop()[3]
+            self.starts.pop()
+        if not self.blocks:
+            return
+        block = self.blocks[-1]
+        n = bisect.bisect_right(block[1], t)
+        dropped = sum(self._sizeof(d) + 8 for d in block[2][n:])
+        del block[1][n:], block[2][n:]
+        block[3] -= dropped; self.size -= dropped
+        self._last = self.seek(t)[1]
+
+
+class WaveForm:
+    """
+    Lookahead intensity signal for the fluctuating "Wave Form" timeline.
+
+    intensity(t) = base + periodic components + seeded value noise + trigger
+    events, clipped to 0-1.  Noise knots and triggers come from a counter-
+    based hash of the seed, so every term is a pure function of t and any
+    stretch of time can be computed directly (seeking back is one block).
+    Samples are produced `block` at a time, vectorised with NumPy when it is
+    installed, into a ring buffer kept `ahead` seconds in front of the read
+    head: a 30 s preview is a slice of samples that already exist, and a
+    frame costs the same however far ahead the preview looks.
+
+        wave = WaveForm(WAVE_COMPONENTS)
+        wave.at(t)              # current intensity
+        wave.window(t, 30.0)    # next 30 s, one sample per STEP
+    """
+    STEP = 0.125
+
+    def __init__(self, components, base=0.3, noise=0.08, noise_step=2.0,
+                 trigger_every=40.0, trigger_p=0.5, trigger_amp=0.35, trigger_len=6.0,
+                 seed=0, ahead=60.0, block=256):
+        self.components = [tuple(c) for c in components]   # (period s, amplitude, phase rad)
+        self.base, self.noise, self.noise_step = base, noise, noise_step
+        self.trigger = (trigger_every, trigger_p, trigger_amp, trigger_len)
+        self.seed    = seed % 2**64
+        self.block   = block
+        self.ahead   = int(ahead / self.STEP)
+        self.cap     = self.ahead + block
+        self.ring    = [0.0] * self.cap
+        self.lo = self.hi = 0           # sample indices [lo, hi) held in the ring
+        try:
+            import numpy
+            self._np = numpy
+        except ImportError:
+            self._np = None
+
+    def _uniform(self, k, salt) -> float:
+        """splitmix64 of (seed, k, salt) as a float in [0, 1)."""
+        z = (self.seed + (k * 4 + salt + 1) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        return ((z ^ (z >> 31)) >> 11) * 2.0 ** -53
+
+    def _events(self, t0, t1) -> list:
+        """(start, length, amplitude) of triggers that can still be felt in [t0, t1]."""
+        every, p, amp, length = self.trigger
+        out = []
+        for k in range(math.floor((t0 - 18 * length) / every), math.floor(t1 / every) + 1):
+            if self._uniform(k, 0) < p:
+                out.append(((k + self._uniform(k, 1)) * every,
+                            length * (0.5 + self._uniform(k, 2)),
+                            amp * (0.5 + self._uniform(k, 3))))
+        return out
+
+    def compute(self, i0, n) -> list:
+        """Intensity for samples i0 .. i0+n-1 (sample i is at i * STEP seconds)."""
+        t0, t1 = i0 * self.STEP, (i0 + n - 1) * self.STEP
+        k0     = math.floor(t0 / self.noise_step)
+        knots  = [self.noise * (2 * self._uniform(k, 2**20) - 1)
+                  for k in range(k0, math.floor(t1 / self.noise_step) + 2)]
+        events = self._events(t0, t1)
+        np = self._np
+        if np is not None:
+            t = (i0 + np.arange(n)) * self.STEP
+            x = np.full(n, self.base)
+            for period, amp, phase in self.components:
+                x += amp * np.sin(2 * math.pi * t / period + phase)
+            u = t / self.noise_step
+            k = np.floor(u).astype(np.intp) - k0
+            f = u - np.floor(u)
+            f = f * f * (3 - 2 * f)
+            kn = np.asarray(knots)
+            x += kn[k] * (1 - f) + kn[k + 1] * f
+            for start, length, amp in events:   # 1 s attack, decays over 12 lengths, then cut
+                d = np.maximum(t - start, 0.0)
+                live = (t >= start) & (d < 12 * length)
+                x += np.where(live, amp * np.minimum(d, 1.0) * np.exp(-d / length), 0.0)
+            return np.clip(x, 0.0, 1.0).tolist()
+        out = []
+        for i in range(i0, i0 + n):
+            t = i * self.STEP
+            x = self.base
+            for period, amp, phase in self.components:
+                x += amp * math.sin(2 * math.pi * t / period + phase)
+            u = t / self.noise_step
+            k = math.floor(u)
+            f = u - k
+            f = f * f * (3 - 2 * f)
+            x += knots[k - k0] * (1 - f) + knots[k - k0 + 1] * f
+            for start, length, amp in events:
+                d = t - start
+                if 0.0 <= d < 12 * length:
+                    x += amp * min(d, 1.0) * math.exp(-d / length)
+            out.append(max(0.0, min(1.0, x)))
+        return out
+
+    def _ensure(self, i0, i1):
+        """Make samples [i0, i1) resident, computing whole blocks past hi."""
+        if i0 < self.lo or i0 > self.hi:
+            self.lo = self.hi = i0            # jumped: restart the ring here
+        while self.hi < i1:
+            vals = self.compute(self.hi, self.block)
+            for j, v in enumerate(vals, self.hi):
+                self.ring[j % self.cap] = v
+            self.hi += self.block
+            self.lo  = max(self.lo, self.hi - self.cap)
+
+    def at(self, t) -> float:
+        i = int(t / self.STEP)
+        self._ensure(i, i + self.ahead)
+        return self.ring[i % self.cap]
+
+    def window(self, t, seconds) -> list:
+        """Samples from t to t + seconds (at most `ahead`), now first."""
+        i = int(t / self.STEP)
+        n = min(self.ahead, int(seconds / self.STEP))
+        if n <= 0:
+            return []
+        self._ensure(i, i + self.ahead)
+        a, b = i % self.cap, (i + n) % self.cap
+        return self.ring[a:a + n] if a < b else self.ring[a:] + self.ring[:b]
+
+
+class TelemetryReader:
+    """
+    Zero-copy access to TelemetryRecorder logs as NumPy structured arrays::
+
+        log = TelemetryReader.open("session.emtl")
+        log["serotonin"].mean(), log["stamina"][-600:]
+        log[log["mood"] == TelemetryReader.MOODS["mania"]]["t"]
+
+    The array is a read-only np.memmap over the file; nothing is parsed or
+    copied until fields are touched.
+    """
+
+    MOODS = TelemetryRecorder.MOODS
+
+    @staticmethod
+    def header(path) -> dict:
+        R = TelemetryRecorder
+        with open(path, "rb") as f:
+            raw = f.read(R.HEADER.size)
+            if len(raw) < R.HEADER.size:
+                raise ValueError(f"'{path}' is not a telemetry log (truncated header).")
+            magic, version, n_nt, rsize, count, created = R.HEADER.unpack(raw)
+            if magic != R.MAGIC:
+                raise ValueError(f"'{path}' is not a telemetry log (bad magic {magic!r}).")
+            if version != R.VERSION:
+                raise ValueError(f"Unsupported telemetry version {version} in '{path}'.")
+            names = [f.read(R.NAME_BYTES).rstrip(b"\0").decode("utf-8") for _ in range(n_nt)]
+        return dict(version=version, nt_names=names, record_size=rsize,
+                    count=count, created=created,
+                    data_offset=R.HEADER.size + R.NAME_BYTES * n_nt)
+
+    @staticmethod
+    def dtype(nt_names):
+        if not _NUMPY:
+            raise ImportError("TelemetryReader needs numpy: pip install numpy")
+        return np.dtype([("frame", "<u4"), ("t", "<f4")]
+                        + [(n, "<f4") for n in nt_names]
+                        + [("stamina", "<f4"), ("energy", "<f4"), ("dread", "<f4"),
+                           ("masking", "<f4"), ("mood", "u1"), ("flags", "u1"), ("_pad", "V2")])
+
+    @classmethod
+    def open(cls, path):
+        h  = cls.header(path)
+        dt = cls.dtype(h["nt_names"])
+        if dt.itemsize != h["record_size"]:
+            raise ValueError(f"Record size mismatch in '{path}': "
+                             f"{h['record_size']} on disk, {dt.itemsize} expected.")
+        if not h["count"]:
+            return np.zeros(0, dtype=dt)
+        return np.memmap(path, dtype=dt, mode="r", offset=h["data_offset"], shape=(h["count"],))
+
+
 def _nt_dict(condition: str) -> str:
     profile = ConditionLibrary.get(condition)
     if not profile:
         return '{"serotonin": 0.5, "dopamine": 0.5}'
     pairs = []
     for nt in profile.neurotransmitters:
-        key = nt.name.lower().replace(" ","_").replace("(","").replace(")","")
+        key = NTRegistry.key(nt.name)
         val = nt.baseline if isinstance(nt.baseline, float) else 0.5
         pairs.append(f'    "{key}": {val}')
     return "{\n" + ",\n".join(pairs) + "\n}"
@@ -372,6 +1596,8 @@ class EngineAdapterGenerator:
                 f"DRAIN_RATE={s.drain_rate}, REGEN_CAP={s.regen_cap}, "
                 f"OVERSHOOT={s.overshoot_penalty}"
             )
+        profiler_src  = _embed(FrameProfiler)
+        telemetry_src = _embed(TelemetryRecorder, InputLog, MedicationModel, Rewind, WaveForm)
         return f'''"""{game.title} — Pygame scaffold.
 
 Condition: {condition} | Genre: {game.genre.upper()} | Engine: Pygame
@@ -380,11 +1606,14 @@ Install: {info['install']}
 """
 __version__ = "{__version__}"
 
-import pygame, sys, math, random
+import pygame, sys, math, random, time, atexit, argparse, struct, mmap, hashlib, bisect
+from collections import deque
 pygame.init()
 
 SCREEN_W, SCREEN_H, FPS = 800, 600, 60
+REWIND_SPEED = 4.0   # seconds of history per second of Backspace
 GRAVITY = 900
+PROFILE_CSV = "{game.condition}_{game.genre}_frame_profile.csv"
 
 
 NT = {nd}
@@ -401,11 +1630,30 @@ MECHANICS = {{
 {mechanic_rows}
 }}
 
+# Input flags: held keys (bits 0-2) and this frame's key presses (bits 3-6)
+IN_LEFT, IN_RIGHT, IN_JUMP             = 0x01, 0x02, 0x04
+IN_CONSOLE, IN_MED, IN_DISMISS, IN_RECOVER = 0x08, 0x10, 0x20, 0x40
+
+
+def held_input(keys) -> int:
+    mask = 0
+    if keys[pygame.K_LEFT]  or keys[pygame.K_a]: mask |= IN_LEFT
+    if keys[pygame.K_RIGHT] or keys[pygame.K_d]: mask |= IN_RIGHT
+    if keys[pygame.K_SPACE] or keys[pygame.K_UP] or keys[pygame.K_w]: mask |= IN_JUMP
+    return mask
+
 class MechanicRuntime:
-    """
-    def __init__(self, nt: dict, mechanics: dict):
+    """Applies every active mechanic to the game state, driven by live NT levels."""
+    # Timer/phase attributes that capture_state() snapshots for rewind
+    STATE = ("_distractor_timer", "_distractor_freeze", "_shuffle_timer",
+             "_false_alert_timer", "_false_alert_on", "_mood_timer", "_mood_phase", "draws")
+
+    def __init__(self, nt: dict, mechanics: dict, seed=None):
         self.nt        = nt
         self.mechanics = mechanics
+        self.seed      = random.randrange(2**32) if seed is None else seed
+        self.rng       = random.Random(self.seed)   # own stream: sessions replay exactly
+        self.draws     = 0                          # values taken from rng; rewind state is seed + draws
         # Internal state for mechanics that need it
         self._distractor_timer  = 0.0
         self._distractor_freeze = 0.0
@@ -413,7 +1661,7 @@ class MechanicRuntime:
         self._false_alert_timer = 0.0
         self._false_alert_on    = False
         self._mood_timer        = 0.0
-        self._mood_phase        = 0    0=mania 1=euthymia 2=depression 3=euthymia
+        self._mood_phase        = 0    # 0=mania 1=euthymia 2=depression 3=euthymia
         self._MOOD_PHASES       = [60, 30, 90, 30]
 
     def tick(self, gs: dict, dt: float) -> dict:
@@ -469,18 +1717,13 @@ class MechanicRuntime:
         if self.mechanics.get("Reward Blunting", {{}}).get("active"):
             gs["reward_mult"] *= 0.5
 
-        
-            self._distractor_timer += dt
-            if self._distractor_freeze > 0:
-                self._distractor_freeze -= dt
-                gs["input_frozen"] = True
-            else:
-                gs["input_frozen"] = False
-            if self._distractor_timer > 8.0:
-                self._distractor_timer = 0.0
-                gs["show_distractor"] = True
-            else:
-                gs["show_distractor"] = False
+        # Timers and the mood cycle, in O(1) however long dt is
+        frozen = self._distractor_freeze > 0
+        fired  = self.advance(dt)
+
+        if self.mechanics.get("Distractor Spawner", {{}}).get("active"):
+            gs["input_frozen"]    = frozen
+            gs["show_distractor"] = fired["distractors"] > 0
 
         
         if self.mechanics.get("Time Perception Warp", {{}}).get("active"):
@@ -488,12 +1731,6 @@ class MechanicRuntime:
 
         
         if self.mechanics.get("False Positive Alerts", {{}}).get("active"):
-            self._false_alert_timer += dt
-            if self._false_alert_timer > 15.0:
-                self._false_alert_timer = 0.0
-                ne = nt.get("norepinephrine", 1.5)
-                if random.random() < 0.25 * ne:
-                    self._false_alert_on = True
             if self._false_alert_on:
                 gs["show_alert"] = True
                 gs["dread"]      = min(1.0, gs.get("dread", 0) + 0.05 * dt)
@@ -502,10 +1739,6 @@ class MechanicRuntime:
 
         
         if self.mechanics.get("Mood Cycle", {{}}).get("active"):
-            self._mood_timer += dt
-            if self._mood_timer >= self._MOOD_PHASES[self._mood_phase]:
-                self._mood_timer = 0.0
-                self._mood_phase = (self._mood_phase + 1) % 4
             phase_name = ["mania","euthymia","depression","euthymia"][self._mood_phase]
             if phase_name == "mania":
                 gs["move_speed"]  = int(gs["move_speed"]  * 3.0)
@@ -536,6 +1769,49 @@ class MechanicRuntime:
 
         return gs
 
+    def advance(self, seconds: float) -> dict:
+        """
+        Move the active mechanics' timers and the mood cycle on by `seconds`
+        in O(1): the phase is the position in the cycle modulo its length,
+        periodic triggers are counted with divmod, and leftover time carries
+        into the next period.  Pausing is simply not calling this; skipping
+        ahead a week is one call.  Returns how many distractors and alert
+        rolls fell inside the skipped span.
+        """
+        fired  = {{"distractors": 0, "alert_rolls": 0}}
+        active = lambda name: self.mechanics.get(name, {{}}).get("active")
+        if active("Distractor Spawner"):
+            self._distractor_freeze = max(0.0, self._distractor_freeze - seconds)
+            n, self._distractor_timer = divmod(self._distractor_timer + seconds, 8.0)
+            fired["distractors"] = int(n)
+        if active("False Positive Alerts"):
+            n, self._false_alert_timer = divmod(self._false_alert_timer + seconds, 15.0)
+            if n:
+                # n rolls at p each, drawn once: P(any alert) = 1 - (1 - p)**n
+                p = min(1.0, 0.25 * self.nt.get("norepinephrine", 1.5))
+                if self.roll() < 1.0 - (1.0 - p) ** n:
+                    self._false_alert_on = True
+            fired["alert_rolls"] = int(n)
+        if active("Mood Cycle"):
+            phases = self._MOOD_PHASES
+            pos    = (sum(phases[:self._mood_phase]) + self._mood_timer + seconds) % sum(phases)
+            phase  = 0
+            while pos >= phases[phase]:
+                pos   -= phases[phase]
+                phase += 1
+            self._mood_phase, self._mood_timer = phase, pos
+        return fired
+
+    def roll(self) -> float:
+        self.draws += 1
+        return self.rng.random()
+
+    def resync_rng(self):
+        """Move rng to `draws` values into the seeded stream (after restore_state)."""
+        self.rng.seed(self.seed)
+        for _ in range(self.draws):
+            self.rng.random()
+
     def dismiss_alert(self):
         self._false_alert_on = False
 
@@ -569,17 +1845,15 @@ class Player(pygame.sprite.Sprite):
         self.image.fill((0, 0, 0, 0))
         pygame.draw.rect(self.image, color, (0, 0, 28, 52), border_radius=6)
 
-    def update(self, gs: dict, dt: float):
-        keys = pygame.key.get_pressed()
-
-        Input can be frozen by a mechanic (e.g. distractor, flashback, meltdown)
+    def update(self, gs: dict, dt: float, inp: int):
+        # Input can be frozen by a mechanic (e.g. distractor, flashback, meltdown)
         if not gs.get("input_frozen", False):
-            if keys[pygame.K_LEFT]  or keys[pygame.K_a]: self.rect.x -= gs["move_speed"] * dt
-            if keys[pygame.K_RIGHT] or keys[pygame.K_d]: self.rect.x += gs["move_speed"] * dt
-            if (keys[pygame.K_SPACE] or keys[pygame.K_UP] or keys[pygame.K_w]) and self.on_ground:
+            if inp & IN_LEFT:  self.rect.x -= gs["move_speed"] * dt
+            if inp & IN_RIGHT: self.rect.x += gs["move_speed"] * dt
+            if inp & IN_JUMP and self.on_ground:
                 self.vel_y = -gs["jump_speed"]
 
-        Gravity
+        # Gravity
         self.vel_y += GRAVITY * dt
         self.rect.y += int(self.vel_y * dt)
 
@@ -605,12 +1879,10 @@ class Player(pygame.sprite.Sprite):
         self._draw_player_shape((r, g, b))
 
         
-        gs["is_resting"] = self.on_ground and not (
-            keys[pygame.K_LEFT] or keys[pygame.K_RIGHT] or
-            keys[pygame.K_a]    or keys[pygame.K_d])
+        gs["is_resting"] = self.on_ground and not (inp & (IN_LEFT | IN_RIGHT))
 
 def build_level(condition: str) -> pygame.sprite.Group:
-    """
+    """Ground plus a per-condition platform layout."""
     platforms = pygame.sprite.Group()
 
     platforms.add(Platform(0, SCREEN_H - 40, SCREEN_W, 40, color=(55, 60, 80)))
@@ -667,8 +1939,12 @@ def draw_hud(surf, gs, stamina, font):
              (int(255*(1-energy)), int(200*energy), 60), label="Energy")
     draw_bar(surf, 10, 30, 180, 14, stamina, MAX_STAMINA,
              (60, 160, 255), label="Stamina")
+    if gs.get("med_level", 0.0) > 0.01:
+        draw_bar(surf, 10, 50, 180, 10, gs["med_level"], 2.0,
+                 (200, 120, 255), label=MEDICATION_REGIMEN[0]["name"])
 
-    hints = ["F1=console", "M=medication", "WASD/arrows=move", "Space=jump"]
+    hints = ["F1=console", "F2=profiler", "M=medication", "Bksp=rewind",
+             "WASD/arrows=move", "Space=jump"]
     phase = gs.get("mood_phase", "")
     if phase:             hints.append("Mood:" + phase.upper())
     if gs.get("show_alert"):   hints.append("!! FALSE ALERT !!")
@@ -710,52 +1986,220 @@ def draw_console(surf, nt, stamina, gs, font):
                            True, (90,90,110)), (20, y))
 
 
+{profiler_src}
+
+
+{telemetry_src}
+
+
+def draw_profiler(surf, prof, font):
+    """F2 overlay: per-phase avg/p95 table plus a frame-time sparkline."""
+    budget = 1.0 / FPS
+    panel  = pygame.Surface((300, 210), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 200))
+    surf.blit(panel, (SCREEN_W - 310, 10))
+    x, y = SCREEN_W - 300, 16
+    surf.blit(font.render("phase        avg ms   p95 ms", True, (120,220,255)), (x, y)); y += 16
+    for name, avg, p95 in prof.stats():
+        col = (255,110,90) if p95 > budget * 1e3 * 0.5 else (200,200,200)
+        surf.blit(font.render(f"{{name:<11}} {{avg:7.2f}}  {{p95:7.2f}}", True, col), (x, y))
+        y += 14
+    # Sparkline: 40 px = 2x frame budget; dashed line = budget
+    base = y + 46
+    for i, ft in enumerate(prof.history()[-280:]):
+        h   = min(40, int(ft / (2 * budget) * 40))
+        col = (255,80,80) if ft > budget else (80,200,120)
+        pygame.draw.line(surf, col, (x + i, base), (x + i, base - h))
+    for dx in range(0, 280, 6):
+        pygame.draw.line(surf, (150,150,150), (x + dx, base - 20), (x + dx + 3, base - 20))
+
+
+def draw_wave_preview(surf, t, font, seconds=30.0):
+    """Upcoming intensity, now at the left edge: peaks can be seen coming, not stopped."""
+    x0, y0, w, h = SCREEN_W // 2 - 120, 8, 240, 36
+    pygame.draw.rect(surf, (20, 20, 40), (x0, y0, w, h))
+    vals = WAVE.window(t, seconds)
+    pts  = [(x0 + i * (w - 1) // (len(vals) - 1), y0 + h - 1 - int(v * (h - 2)))
+            for i, v in enumerate(vals)]
+    pygame.draw.lines(surf, (255, 170, 90), False, pts)
+    surf.blit(font.render(f"next {{seconds:.0f}}s", True, (160, 160, 160)), (x0 + w + 6, y0))
+
+
 def draw_distractor(surf):
     t = pygame.time.get_ticks() / 400.0
     x = int(700 + 40 * math.sin(t))
     y = int(300 + 30 * math.cos(t * 1.3))
-    pygame.draw.circle(surf, (255, 215, 0), (x, y), 18)
-    pygame.draw.circle(surf, (255, 255, 150), (x, y), 10)
-    f = pygame.font.SysFont("monospace", 10)
-    surf.blit(f.render("SHINY", True, (80,60,0)), (x-18, y+20))
-
-
-MEDICATION_PRESETS = dict(
-    depression = dict(serotonin=0.3,  dopamine=0.2,  norepinephrine=0.2),
-    adhd       = dict(dopamine=0.3,   norepinephrine=0.25),
-    anxiety    = dict(gaba=0.4,       cortisol=-0.5),
-    bipolar    = dict(dopamine=-0.5,  serotonin=0.3),
-    chronic_pain=dict(substance_p=-0.4, serotonin=0.3, endorphins=0.2),
-    ptsd       = dict(norepinephrine=-0.4, serotonin=0.3),
-    schizophrenia=dict(dopamine_mesolimbic=-0.5, glutamate_nmda=0.2),
-    autism     = dict(gaba=0.3, glutamate=-0.2),
-)
+    pygame.draw.circle(surf, (255, 215, 0), (x, y), 18)
+    pygame.draw.circle(surf, (255, 255, 150), (x, y), 10)
+    f = pygame.font.SysFont("monospace", 10)
+    surf.blit(f.render("SHINY", True, (80,60,0)), (x-18, y+20))
 
 
-def main():
+# M key doses the first-line drug; --schedule doses it every "interval" seconds
+MEDICATION_REGIMEN = [
+{"".join(f"    {d!r},{chr(10)}" for d in medication_regimen(game.condition))}]
+
+# "Wave Form" timelines: the intensity wave (period s, amplitude, phase), previewed
+# 30 s ahead on the HUD.  Empty for other timelines.
+WAVE_COMPONENTS = {TimelineGenerator.wave(game.condition)!r}
+WAVE = WaveForm(WAVE_COMPONENTS) if WAVE_COMPONENTS else None
+
+
+def initial_state() -> dict:
+    return dict(move_speed=200, jump_speed=480, energy=1.0, stamina=MAX_STAMINA,
+                color_sat=1.0, input_frozen=False, reward_mult=1.0,
+                screen_flash=False, is_resting=False, dread=0.0,
+                masking=1.0, meltdown=False, mood_phase="", clock_speed=1.0)
+
+
+def step_mechanics(nt, gs, runtime, meds, inp, t, dt) -> dict:
+    """Key presses, drug levels + one MechanicRuntime tick; shared by live play and --replay."""
+    if inp & IN_MED:
+        meds.dose(t)
+    meds.apply(t, nt)
+    gs["med_level"] = meds.concentration(t)
+    if inp & IN_DISMISS and gs.get("show_alert"):
+        runtime.dismiss_alert()
+    if inp & IN_RECOVER and gs.get("meltdown"):
+        gs["meltdown"] = False   # reset meltdown
+    gs = runtime.tick(gs, dt)    # run all mechanics — modifies gs in place
+    if WAVE:
+        gs["intensity"] = level = WAVE.at(t)
+        gs["move_speed"] = int(gs["move_speed"] * (1.0 - 0.5 * level))
+        gs["color_sat"] *= 1.0 - 0.5 * level
+    return gs
+
+
+def capture_state(nt, gs, runtime, meds, player) -> dict:
+    """Flat snapshot of everything the simulation steps, for Rewind."""
+    state = {{"nt." + k: v for k, v in nt.items()}}
+    state.update(("gs." + k, v) for k, v in gs.items())
+    state.update(("rt." + k, getattr(runtime, k)) for k in runtime.STATE)
+    state["meds.doses"]   = tuple(tuple(d) for d in meds.doses)
+    state["meds.applied"] = tuple(sorted(meds.applied.items()))
+    state["player"]       = (player.rect.x, player.rect.y, player.vel_y, player.on_ground)
+    return state
+
+
+def restore_state(state, nt, gs, runtime, meds, player):
+    """Inverse of capture_state(); mutates the live objects in place."""
+    gs.clear()
+    for key, v in state.items():
+        scope, _, name = key.partition(".")
+        if scope == "nt":   nt[name] = v
+        elif scope == "gs": gs[name] = v
+    for k in runtime.STATE:
+        setattr(runtime, k, state["rt." + k])
+    runtime.resync_rng()
+    meds.doses   = [deque(d) for d in state["meds.doses"]]
+    meds.applied = dict(state["meds.applied"])
+    player.rect.x, player.rect.y, player.vel_y, player.on_ground = state["player"]
+
+
+def state_digest(nt, gs, player) -> str:
+    """Short hash of the simulation state, to compare replays across versions."""
+    keys = ("energy", "stamina", "dread", "masking", "mood_phase", "move_speed", "jump_speed")
+    blob = repr(([round(nt[k], 6) for k in sorted(nt)],
+                 [round(v, 6) if isinstance(v, float) else v for v in (gs.get(k) for k in keys)],
+                 tuple(player.rect)))
+    return hashlib.sha1(blob.encode()).hexdigest()[:16]
+
+
+def replay(path, telemetry_path=None):
+    """Re-run a recorded session headless (no window, no frame cap)."""
+    log     = InputLog.load(path)
+    nt      = dict(NT)
+    runtime = MechanicRuntime(nt, MECHANICS, seed=log.seed)
+    meds    = MedicationModel(MEDICATION_REGIMEN)
+    player  = Player(build_level("{game.condition}"))
+    gs      = initial_state()
+    dt      = 1.0 / log.fps
+    telemetry = TelemetryRecorder(telemetry_path, list(nt)) if telemetry_path else None
+    t0 = time.perf_counter()
+    for frame, inp in enumerate(log.masks(), 1):
+        gs = step_mechanics(nt, gs, runtime, meds, inp, (frame - 1) * dt, dt)
+        player.update(gs, dt, inp)
+        if telemetry:
+            telemetry.record(frame, frame * dt, nt, gs, inp)
+    wall = time.perf_counter() - t0
+    if telemetry:
+        telemetry.close()
+    game_s = log.frames * dt
+    digest = state_digest(nt, gs, player)
+    print(f"[replay] {{path}}: {{log.frames}} frames ({{game_s:.1f}}s) in {{wall:.3f}}s "
+          f"= {{game_s / max(wall, 1e-9):.0f}}x real time  digest={{digest}}")
+    return digest
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="{game.title}")
+    ap.add_argument("--telemetry", metavar="FILE",
+                    help="record per-frame NT/stamina/input telemetry (binary, memory-mapped)")
+    ap.add_argument("--seed", type=int,
+                    help="mechanic RNG seed (default: random; stored in --record files)")
+    ap.add_argument("--record", metavar="FILE",
+                    help="record input for --replay; the game then runs on a fixed 1/FPS step")
+    ap.add_argument("--replay", metavar="FILE", nargs="+",
+                    help="re-run recorded sessions headless at maximum speed, then exit")
+    ap.add_argument("--schedule", action="store_true",
+                    help="take the first-line medication on its dosing interval (as if M were pressed)")
+    ap.add_argument("--keyframe", type=float, default=5.0, metavar="S",
+                    help="seconds between rewind keyframes (seek replays at most this much)")
+    ap.add_argument("--rewind-mb", type=float, default=32.0, metavar="MB",
+                    help="memory budget for rewind history; oldest keyframes are dropped first")
+    args = ap.parse_args(argv)
+    if args.replay and args.telemetry and len(args.replay) > 1:
+        ap.error("--telemetry can only record a single --replay session")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.replay:
+        for path in args.replay:
+            replay(path, args.telemetry)
+        return
+
     screen   = pygame.display.set_mode((SCREEN_W, SCREEN_H))
     pygame.display.set_caption("{game.title}")
     clock    = pygame.time.Clock()
     font     = pygame.font.SysFont("monospace", 12)
     big_font = pygame.font.SysFont("monospace", 22)
 
+    seed     = args.seed if args.seed is not None else random.randrange(2**32)
     nt       = dict(NT)
     platforms = build_level("{game.condition}")
     player   = Player(platforms)
-    runtime  = MechanicRuntime(nt, MECHANICS)
+    runtime  = MechanicRuntime(nt, MECHANICS, seed=seed)
+    meds     = MedicationModel(MEDICATION_REGIMEN)
+    next_dose = 0.0 if args.schedule else None
 
     all_sprites = pygame.sprite.Group(player)
     all_sprites.add(platforms)
 
-    stamina = MAX_STAMINA
-    gs      = dict(move_speed=200, jump_speed=480, energy=1.0, stamina=stamina,
-                   color_sat=1.0, input_frozen=False, reward_mult=1.0,
-                   screen_flash=False, is_resting=False, dread=0.0,
-                   masking=1.0, meltdown=False, mood_phase="", clock_speed=1.0)
+    gs      = initial_state()
     console = False
+    prof    = FrameProfiler(["events", "mechanics", "player", "world",
+                             "saturation", "hud", "flip"])
+    atexit.register(prof.dump_csv, PROFILE_CSV)
+    telemetry = TelemetryRecorder(args.telemetry, list(nt)) if args.telemetry else None
+    if telemetry:
+        atexit.register(telemetry.close)
+    recording = InputLog(seed, FPS) if args.record else None
+    if recording:
+        atexit.register(recording.save, args.record)
+    # Rewinding rewrites the past, which an input recording cannot express
+    rewind = None if recording else Rewind(args.keyframe, int(args.rewind_mb * 2**20))
+    frame, sim_t = 0, 0.0
+    if rewind:
+        rewind.record(sim_t, capture_state(nt, gs, runtime, meds, player))
 
     while True:
         dt = clock.tick(FPS) / 1000.0
+        if recording:
+            dt = 1.0 / FPS   # fixed step, so --replay reproduces the session exactly
+        prof.begin_frame()
+        inp = 0
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -763,21 +2207,44 @@ def main():
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_F1:
                     console = not console
-                if event.key == pygame.K_m:
-                    preset = MEDICATION_PRESETS.get("{game.condition}", {{}})
-                    for k, v in preset.items():
-                        if k in nt: nt[k] = max(0.0, min(2.0, nt[k] + v))
-                if event.key == pygame.K_SPACE and gs.get("show_alert"):
-                    runtime.dismiss_alert()
-                if event.key == pygame.K_r and gs.get("meltdown"):
-                    gs["meltdown"] = False   # reset meltdown
-
-        # Run all mechanics — modifies gs in place
-        gs["stamina"] = stamina
-        gs = runtime.tick(gs, dt)
-        stamina = gs["stamina"]
-
-        player.update(gs, dt)
+                    inp |= IN_CONSOLE
+                if event.key == pygame.K_F2:
+                    prof.toggle()
+                if event.key == pygame.K_m:     inp |= IN_MED
+                if event.key == pygame.K_SPACE: inp |= IN_DISMISS
+                if event.key == pygame.K_r:     inp |= IN_RECOVER
+        keys = pygame.key.get_pressed()
+        inp |= held_input(keys)
+        rewinding = bool(rewind) and keys[pygame.K_BACKSPACE]
+        if next_dose is not None and sim_t >= next_dose and not rewinding:
+            inp |= IN_MED    # scheduled dose goes through the input mask, so --record captures it
+            next_dose += MEDICATION_REGIMEN[0]["interval"]
+        prof.mark("events")
+
+        if rewinding:
+            # One keyframe restore + <= --keyframe seconds of deltas, then drop the future
+            sim_t, state = rewind.seek(sim_t - REWIND_SPEED * dt)
+            restore_state(state, nt, gs, runtime, meds, player)
+            rewind.truncate(sim_t)
+            if telemetry:
+                frame = telemetry.truncate(sim_t)   # the log resumes from the rewound frame
+            if next_dose is not None:
+                interval  = MEDICATION_REGIMEN[0]["interval"]
+                next_dose = math.ceil(sim_t / interval) * interval
+            prof.mark("mechanics")
+        else:
+            gs = step_mechanics(nt, gs, runtime, meds, inp, sim_t, dt)
+            frame += 1; sim_t += dt
+            if recording:
+                recording.append(inp)
+            if telemetry:
+                telemetry.record(frame, sim_t, nt, gs, inp)
+            prof.mark("mechanics")
+
+            player.update(gs, dt, inp)
+            if rewind:
+                rewind.record(sim_t, capture_state(nt, gs, runtime, meds, player))
+        prof.mark("player")
 
         
         sat  = gs.get("color_sat", 1.0)
@@ -792,12 +2259,13 @@ def main():
         platforms.draw(world_surf)
         # Draw player
         world_surf.blit(player.image, player.rect)
+        prof.mark("world")
 
-       
         if sat < 0.95:
             world_surf = apply_saturation(world_surf, sat)
 
         screen.blit(world_surf, (0, 0))
+        prof.mark("saturation")
 
         
         if gs.get("screen_flash"):
@@ -816,12 +2284,23 @@ def main():
             t = big_font.render("SENSORY OVERLOAD — press R to recover", True, (255,120,50))
             screen.blit(t, (SCREEN_W//2 - t.get_width()//2, SCREEN_H//2 - 20))
 
+        if rewinding:
+            t = big_font.render(f"<< REWIND  {{sim_t:7.1f}}s", True, (150,200,255))
+            screen.blit(t, (SCREEN_W//2 - t.get_width()//2, 56))
+
         if console:
-            draw_console(screen, nt, stamina, gs, font)
+            draw_console(screen, nt, gs["stamina"], gs, font)
         else:
-            draw_hud(screen, gs, stamina, font)
+            draw_hud(screen, gs, gs["stamina"], font)
+        if WAVE and not console:
+            draw_wave_preview(screen, sim_t, font)
+        if prof.enabled:
+            draw_profiler(screen, prof, font)
+        prof.mark("hud")
 
         pygame.display.flip()
+        prof.mark("flip")
+        prof.end_frame()
 
 
 if __name__ == "__main__":
@@ -831,6 +2310,7 @@ if __name__ == "__main__":
     @staticmethod
     def _adapter_arcade(game, info):
         nd = _nt_dict(game.condition)
+        profiler_src = _embed(FrameProfiler)
         return f'''"""{game.title} — Arcade scaffold.
 
 Condition: {game.condition.upper().replace('_',' ')} | Genre: {game.genre.upper()} | Engine: Arcade
@@ -839,13 +2319,18 @@ Install engine: {info['install']}
 """
 __version__ = "{__version__}"
 
-import arcade
+import arcade, time, atexit
+from collections import deque
 
 SCREEN_W, SCREEN_H = 800, 600
 TITLE = "{game.title}"
+PROFILE_CSV = "{game.condition}_{game.genre}_frame_profile.csv"
 NT = {nd}
 
 
+{profiler_src}
+
+
 def nt_to_params(nt):
     return dict(
         move_speed  = 250 * nt.get("norepinephrine", 0.8),
@@ -856,6 +2341,14 @@ def nt_to_params(nt):
 
 
 class GameWindow(arcade.Window):
+    """
+    Retained-mode HUD: Text objects, bar sprites and the console backdrop
+    are built once in setup(); frames only change values that moved.
+    nt_version counts edits to self.nt, so params() and the console rows
+    are recomputed only after one.
+    """
+    PROFILER_HZ = 4   # profiler overlay text refresh rate
+
     def __init__(self):
         super().__init__(SCREEN_W, SCREEN_H, TITLE)
         arcade.set_background_color(arcade.color.DARK_MIDNIGHT_BLUE)
@@ -866,13 +2359,90 @@ class GameWindow(arcade.Window):
         self.player.change_y = 0
         self.energy, self.console = 1.0, False
         self.nt = dict(NT)
+        self.nt_version = 0
+        self._params, self._params_version = None, -1
         self.platform = arcade.SpriteSolidColor(SCREEN_W, 20, arcade.color.DIM_GRAY)
         self.platform.center_x, self.platform.center_y = SCREEN_W//2, 20
         self.all_sprites = arcade.SpriteList()
         self.all_sprites.extend([self.player, self.platform])
+        self.prof = FrameProfiler(["update", "draw"])
+        atexit.register(self.prof.dump_csv, PROFILE_CSV)
+        self._build_hud()
+
+    def params(self):
+        if self._params_version != self.nt_version:
+            self._params, self._params_version = nt_to_params(self.nt), self.nt_version
+        return self._params
+
+    @staticmethod
+    def _bar(left, bottom, height, color):
+        bar = arcade.SpriteSolidColor(1, height, arcade.color.WHITE)   # stretched and tinted
+        bar.left, bar.bottom, bar.color = left, bottom, color
+        return bar
+
+    @staticmethod
+    def _set_width(bar, width):
+        left = bar.left
+        bar.width, bar.visible = max(width, 1), width > 0
+        bar.left = left
+
+    def _build_hud(self):
+        self.hud_text   = arcade.Text("", 10, SCREEN_H-25, arcade.color.WHITE, 13)
+        self.energy_bar = self._bar(10, SCREEN_H-46, 16, (0, 200, 60))
+        self.hud_sprites = arcade.SpriteList()
+        self.hud_sprites.append(self.energy_bar)
+
+        self.console_shapes = arcade.ShapeElementList()
+        self.console_shapes.append(arcade.create_rectangle_filled(
+            SCREEN_W/2, SCREEN_H/2, SCREEN_W, SCREEN_H, (10,10,30,200)))
+        self.console_sprites = arcade.SpriteList()
+        self.console_text = [arcade.Text("META-CONSOLE (F1 close)", 20, SCREEN_H-40,
+                                         arcade.color.CYAN, 14)]
+        self.nt_rows = {{}}
+        for name in self.nt:
+            self._nt_row(name)
+
+        rows = len(self.prof.phases) + 2   # phases, frame total, sparkline
+        self.prof_text = [arcade.Text("", SCREEN_W-260, SCREEN_H-70-16*i, arcade.color.LIGHT_GREEN, 11)
+                          for i in range(rows)]
+        self._shown = dict(energy=None, nt=-1, prof=0.0)
+
+    def _nt_row(self, name):
+        y     = SCREEN_H-64 - 20*len(self.nt_rows)
+        bar   = self._bar(20, y, 12, (80,200,120))
+        label = arcade.Text("", 130, y, arcade.color.WHITE, 12)
+        self.console_sprites.append(bar)
+        self.console_text.append(label)
+        self.nt_rows[name] = (bar, label)
+        return bar, label
+
+    def _sync_hud(self):
+        """Push changed values into the retained HUD objects."""
+        pct = round(self.energy * 100)
+        if pct != self._shown["energy"]:
+            self._shown["energy"] = pct
+            e = pct / 100
+            self.hud_text.text = f"Vital Energy: {{pct}}%  F1=Console  F2=Profiler  M=Medication"
+            self._set_width(self.energy_bar, int(200*e))
+            self.energy_bar.color = (int(255*(1-e)), int(200*e), 60)
+        if self.console and self._shown["nt"] != self.nt_version:
+            self._shown["nt"] = self.nt_version
+            for name, val in self.nt.items():
+                bar, label = self.nt_rows.get(name) or self._nt_row(name)   # M can add an NT
+                self._set_width(bar, int(val*100))
+                label.text = f"{{name:<20}} {{val:.3f}}"
+        now = time.perf_counter()
+        if self.prof.enabled and now - self._shown["prof"] >= 1 / self.PROFILER_HZ:
+            self._shown["prof"] = now
+            rows = [f"{{name:<7}} avg {{avg:6.2f}}ms  p95 {{p95:6.2f}}ms"
+                    for name, avg, p95 in self.prof.stats()] + [self.prof.sparkline()]
+            for label, row in zip(self.prof_text, rows):
+                if label.text != row:
+                    label.text = row
 
     def on_update(self, dt):
-        p = nt_to_params(self.nt)
+        self.prof.begin_frame()
+        p = self.params()
         self.player.change_y -= 900 * dt
         self.player.update()
         if self.player.bottom <= 30:
@@ -880,31 +2450,34 @@ class GameWindow(arcade.Window):
         self.energy = max(0.0, self.energy - p["energy_drain"] * dt * 0.01)
         self.player.left  = max(0, self.player.left)
         self.player.right = min(SCREEN_W, self.player.right)
+        self.prof.mark("update")
 
     def on_draw(self):
         self.clear()
         self.all_sprites.draw()
-        arcade.draw_text(f"Vital Energy: {{self.energy:.0%}}  F1=Console  M=Medication",
-                         10, SCREEN_H-25, arcade.color.WHITE, 13)
-        arcade.draw_lrtb_rectangle_filled(10, 10+int(200*self.energy),
-                                          SCREEN_H-30, SCREEN_H-46,
-                                          (int(255*(1-self.energy)), int(200*self.energy), 60))
+        self._sync_hud()
+        self.hud_sprites.draw()
+        self.hud_text.draw()
         if self.console:
-            arcade.draw_lrtb_rectangle_filled(0, SCREEN_W, SCREEN_H, 0, (10,10,30,200))
-            y = SCREEN_H-40
-            arcade.draw_text("META-CONSOLE (F1 close)", 20, y, arcade.color.CYAN, 14); y-=24
-            for name, val in self.nt.items():
-                arcade.draw_lrtb_rectangle_filled(20, 20+int(val*100), y+12, y, (80,200,120))
-                arcade.draw_text(f"{{name:<20}} {{val:.3f}}", 130, y, arcade.color.WHITE, 12)
-                y -= 20
+            self.console_shapes.draw()
+            self.console_sprites.draw()
+            for label in self.console_text:
+                label.draw()
+        if self.prof.enabled:
+            for label in self.prof_text:
+                label.draw()
+        self.prof.mark("draw")
+        self.prof.end_frame()
 
     def on_key_press(self, key, mod):
         if key == arcade.key.F1: self.console = not self.console
+        if key == arcade.key.F2: self.prof.toggle()
         if key == arcade.key.M:
             self.nt["serotonin"]      = min(2.0, self.nt.get("serotonin",0)+0.3)
             self.nt["dopamine"]       = min(2.0, self.nt.get("dopamine",0)+0.2)
             self.nt["norepinephrine"] = min(2.0, self.nt.get("norepinephrine",0)+0.2)
-        p = nt_to_params(self.nt)
+            self.nt_version += 1
+        p = self.params()
         if key == arcade.key.LEFT:  self.player.change_x = -p["move_speed"]
         if key == arcade.key.RIGHT: self.player.change_x =  p["move_speed"]
         if key == arcade.key.SPACE and self.player.bottom <= 32:
@@ -924,6 +2497,7 @@ if __name__ == "__main__":
     @staticmethod
     def _adapter_pygame_zero(game, info):
         nd = _nt_dict(game.condition)
+        profiler_src = _embed(FrameProfiler)
         return f'''"""{game.title} — Pygame Zero scaffold.
 
 Run with: pgzrun {game.condition}_{game.genre}_pgzero.py
@@ -932,13 +2506,24 @@ Generated by Mechanistic Empathy Engine v{__version__}
 """
 __version__ = "{__version__}"
 
+import time, atexit
+from collections import deque
+
 WIDTH, HEIGHT = 800, 600
 TITLE = "{game.title}"
+PROFILE_CSV = "{game.condition}_{game.genre}_frame_profile.csv"
 
 nt    = {nd}
 state = dict(energy=1.0, x=400.0, y=500.0, vy=0.0, on_ground=True, console=False)
 
 
+{profiler_src}
+
+
+prof = FrameProfiler(["update", "draw"])
+atexit.register(prof.dump_csv, PROFILE_CSV)
+
+
 def params():
     return dict(
         speed = int(200 * nt.get("norepinephrine", 0.8)),
@@ -946,6 +2531,7 @@ def params():
     )
 
 def update():
+    prof.begin_frame()
     p = params()
     if keyboard.left:  state["x"] -= p["speed"] * 0.016
     if keyboard.right: state["x"] += p["speed"] * 0.016
@@ -955,6 +2541,7 @@ def update():
     if state["y"] >= HEIGHT - 60:
         state["y"] = HEIGHT-60; state["vy"] = 0; state["on_ground"] = True
     state["energy"] = max(0.0, state["energy"] - p["drain"] * 0.0002)
+    prof.mark("update")
 
 def draw():
     screen.clear(); screen.fill((20,20,30))
@@ -964,14 +2551,22 @@ def draw():
     screen.draw.filled_rect(Rect(10,10,200,16), (60,60,60))
     screen.draw.filled_rect(Rect(10,10,bw,16),
                              (int(255*(1-state["energy"])), int(200*state["energy"]), 60))
-    screen.draw.text("Vital Energy  F1=Console  M=Med", (10,28), color=(220,220,220), fontsize=13)
+    screen.draw.text("Vital Energy  F1=Console  F2=Profiler  M=Med", (10,28), color=(220,220,220), fontsize=13)
     if state["console"]:
         y = 55
         for k,v in nt.items():
             screen.draw.text(f"{{k}}: {{v:.3f}}", (20,y), color=(100,220,255), fontsize=12); y+=16
+    if prof.enabled:
+        y = 10
+        for name, avg, p95 in prof.stats():
+            screen.draw.text(f"{{name}} avg {{avg:.2f}}ms p95 {{p95:.2f}}ms",
+                             (WIDTH-230, y), color=(120,230,140), fontsize=13); y += 15
+    prof.mark("draw")
+    prof.end_frame()
 
 def on_key_down(key):
     if key == keys.F1: state["console"] = not state["console"]
+    if key == keys.F2: prof.toggle()
     if key == keys.M:
         nt["serotonin"]  = min(2.0, nt.get("serotonin",0)+0.3)
         nt["dopamine"]   = min(2.0, nt.get("dopamine",0)+0.2)
@@ -980,6 +2575,7 @@ def on_key_down(key):
     @staticmethod
     def _adapter_pyglet(game, info):
         nd = _nt_dict(game.condition)
+        profiler_src = _embed(FrameProfiler)
         return f'''"""{game.title} — Pyglet scaffold.
 
 Condition: {game.condition.upper().replace('_',' ')} | Genre: {game.genre.upper()} | Engine: Pyglet
@@ -988,35 +2584,102 @@ Generated by Mechanistic Empathy Engine v{__version__}
 """
 __version__ = "{__version__}"
 
-import pyglet
+import pyglet, time, atexit
+from collections import deque
 from pyglet.window import key as Key
 from pyglet import shapes
 
+PROFILE_CSV = "{game.condition}_{game.genre}_frame_profile.csv"
+
+
+{profiler_src}
+
+
+prof   = FrameProfiler(["update", "draw"])
+atexit.register(prof.dump_csv, PROFILE_CSV)
 window = pyglet.window.Window(800, 600, caption="{game.title}")
 batch  = pyglet.graphics.Batch()
 NT     = {nd}
-state  = dict(x=400.0, y=80.0, vx=0.0, vy=0.0, energy=1.0, on_ground=True, console=False)
+# nt_version counts edits to nt: params() and the console labels only refresh after one
+state  = dict(x=400.0, y=80.0, vx=0.0, vy=0.0, energy=1.0, on_ground=True, console=False,
+              nt_version=0)
 keys_held = set()
 player_shape = shapes.Rectangle(384, 48, 32, 64, color=(100,180,255), batch=batch)
 ground_shape = shapes.Rectangle(0, 0, 800, 30, color=(60,60,80), batch=batch)
 nt = dict(NT)
 
+# Every label lives in the batch from the start; frames only change .text/.visible
+PROFILER_HZ = 4
+hud_group   = pyglet.graphics.Group(order=1)
+hud_label   = pyglet.text.Label("", x=10, y=580, font_size=12, color=(220,220,220,255),
+                                batch=batch, group=hud_group)
+prof_labels = [pyglet.text.Label("", x=540, y=580 - 15*i, font_size=10, color=(120,230,140,255),
+                                 batch=batch, group=hud_group)
+               for i in range(len(prof.phases) + 2)]   # phases, frame total, sparkline
+nt_labels   = {{}}
+shown       = dict(energy=None, nt=-1, console=None, prof=None, prof_t=0.0)
+_params     = dict(version=-1, value=None)
+
+
+def nt_label(name):
+    label = pyglet.text.Label("", x=10, y=550 - 17*len(nt_labels), font_size=11,
+                              color=(100,220,255,255), batch=batch, group=hud_group)
+    label.visible = state["console"]
+    nt_labels[name] = label
+    return label
+
+for _name in nt:
+    nt_label(_name)
+
 
 def params():
-    return dict(
-        speed = 200 * nt.get("norepinephrine", 0.8),
-        drain = 0.8 / max(nt.get("serotonin", 0.5), 0.01),
-        jump  = 420 * nt.get("norepinephrine", 0.8),
-    )
+    if _params["version"] != state["nt_version"]:
+        _params["version"] = state["nt_version"]
+        _params["value"]   = dict(
+            speed = 200 * nt.get("norepinephrine", 0.8),
+            drain = 0.8 / max(nt.get("serotonin", 0.5), 0.01),
+            jump  = 420 * nt.get("norepinephrine", 0.8),
+        )
+    return _params["value"]
+
+
+def sync_labels():
+    """Push changed values into the persistent labels; glyph layout only happens on change."""
+    pct = round(state["energy"] * 100)
+    if pct != shown["energy"]:
+        shown["energy"] = pct
+        hud_label.text = f"Energy:{{pct}}% F1=Console F2=Profiler M=Med"
+    if shown["nt"] != state["nt_version"]:
+        shown["nt"] = state["nt_version"]
+        for k, v in nt.items():
+            (nt_labels.get(k) or nt_label(k)).text = f"{{k}}: {{v:.3f}}"   # M can add an NT
+    if shown["console"] != state["console"]:
+        shown["console"] = state["console"]
+        for label in nt_labels.values():
+            label.visible = state["console"]
+    if shown["prof"] != prof.enabled:
+        shown["prof"] = prof.enabled
+        for label in prof_labels:
+            label.visible = prof.enabled
+    now = time.perf_counter()
+    if prof.enabled and now - shown["prof_t"] >= 1 / PROFILER_HZ:
+        shown["prof_t"] = now
+        rows = [f"{{name:<7}} avg {{avg:6.2f}}ms  p95 {{p95:6.2f}}ms"
+                for name, avg, p95 in prof.stats()] + [prof.sparkline()]
+        for label, row in zip(prof_labels, rows):
+            if label.text != row:
+                label.text = row
 
 @window.event
 def on_key_press(symbol, mod):
     keys_held.add(symbol)
     if symbol == Key.F1: state["console"] = not state["console"]
+    if symbol == Key.F2: prof.toggle()
     if symbol == Key.M:
         nt["serotonin"]      = min(2.0, nt.get("serotonin",0)+0.3)
         nt["dopamine"]       = min(2.0, nt.get("dopamine",0)+0.2)
         nt["norepinephrine"] = min(2.0, nt.get("norepinephrine",0)+0.2)
+        state["nt_version"] += 1
     if symbol == Key.SPACE and state["on_ground"]:
         p = params(); state["vy"] = p["jump"]; state["on_ground"] = False
 
@@ -1025,6 +2688,7 @@ def on_key_release(symbol, mod):
     keys_held.discard(symbol)
 
 def update(dt):
+    prof.begin_frame()
     p = params()
     state["vx"] = (-p["speed"] if Key.LEFT in keys_held else
                     p["speed"] if Key.RIGHT in keys_held else 0)
@@ -1033,18 +2697,15 @@ def update(dt):
     state["x"] = max(0, min(768, state["x"]))
     state["energy"] = max(0.0, state["energy"] - p["drain"]*dt*0.01)
     player_shape.x, player_shape.y = int(state["x"]), int(state["y"])
+    prof.mark("update")
 
 @window.event
 def on_draw():
-    window.clear(); batch.draw()
-    pyglet.text.Label(f"Energy:{{state['energy']:.0%}} F1=Console M=Med",
-                      x=10, y=580, font_size=12, color=(220,220,220,255)).draw()
-    if state["console"]:
-        y = 550
-        for k,v in nt.items():
-            pyglet.text.Label(f"{{k}}: {{v:.3f}}", x=10, y=y,
-                              font_size=11, color=(100,220,255,255)).draw()
-            y -= 17
+    window.clear()
+    sync_labels()
+    batch.draw()
+    prof.mark("draw")
+    prof.end_frame()
 
 pyglet.clock.schedule_interval(update, 1/60.0)
 pyglet.app.run()
@@ -1063,6 +2724,12 @@ __version__ = "{__version__}"
 
 from ursina import *
 from ursina.prefabs.first_person_controller import FirstPersonController
+import sys
+
+# --uncached reassigns text, speed and colour every frame (the old behaviour),
+# for comparing against the change-driven path with the FPS counter
+UNCACHED = "--uncached" in sys.argv
+HUD_HZ   = 4   # FPS counter refresh rate
 
 app = Ursina()
 window.title = "{game.title}"
@@ -1071,7 +2738,11 @@ nt = {nd}
 ground = Entity(model="plane", scale=(30,1,30), color=color.dark_gray, collider="box")
 player = FirstPersonController(y=2)
 energy_text = Text("Vital Energy: 100%", origin=(-0.85, 0.45), scale=1.5, color=color.white)
+fps_text    = Text("", origin=(0.85, 0.45), scale=1.2, color=color.lime)
 energy = [1.0]
+# nt_version counts edits to nt; shown holds what the entities currently display
+state  = dict(nt_version=0)
+shown  = dict(pct=100, nt=-1, frames=0, elapsed=0.0)
 
 def input(key):
     if key == "f1":
@@ -1080,15 +2751,30 @@ def input(key):
         nt["serotonin"]      = min(2.0, nt.get("serotonin",0)+0.3)
         nt["dopamine"]       = min(2.0, nt.get("dopamine",0)+0.2)
         nt["norepinephrine"] = min(2.0, nt.get("norepinephrine",0)+0.2)
+        state["nt_version"] += 1
         print("[Medication applied]")
 
 def update():
     drain = 0.8 / max(nt.get("serotonin", 0.5), 0.01)
     energy[0] = max(0.0, energy[0] - drain * time.dt * 0.01)
-    energy_text.text = f"Vital Energy: {{energy[0]:.0%}}"
-    player.speed = 5 * nt.get("norepinephrine", 0.8)
-    sat = nt.get("serotonin", 0.5)
-    ground.color = color.hsv(200, sat*0.4, 0.3)
+    if UNCACHED:
+        energy_text.text = f"Vital Energy: {{energy[0]:.0%}}"
+        player.speed = 5 * nt.get("norepinephrine", 0.8)
+        ground.color = color.hsv(200, nt.get("serotonin", 0.5)*0.4, 0.3)
+    else:
+        pct = round(energy[0] * 100)
+        if pct != shown["pct"]:             # each .text assignment rebuilds the text mesh
+            shown["pct"] = pct
+            energy_text.text = f"Vital Energy: {{pct}}%"
+        if shown["nt"] != state["nt_version"]:
+            shown["nt"] = state["nt_version"]
+            player.speed = 5 * nt.get("norepinephrine", 0.8)
+            ground.color = color.hsv(200, nt.get("serotonin", 0.5)*0.4, 0.3)
+
+    shown["frames"] += 1; shown["elapsed"] += time.dt
+    if shown["elapsed"] >= 1 / HUD_HZ:
+        fps_text.text = f"{{shown['frames'] / shown['elapsed']:.0f}} fps  {{'uncached' if UNCACHED else 'cached'}}"
+        shown["frames"], shown["elapsed"] = 0, 0.0
 
 app.run()
 '''
@@ -1107,8 +2793,14 @@ __version__ = "{__version__}"
 from direct.showbase.ShowBase import ShowBase
 from direct.task import Task
 from panda3d.core import TextNode, Fog
+from collections import deque
 import sys
 
+# --uncached rebuilds the fog and HUD text every frame (the old behaviour), for
+# comparing against the cached path with the F3 frame-time readout
+UNCACHED = "--uncached" in sys.argv
+HUD_HZ   = 4   # frame-time readout refresh rate
+
 class EmpathyGame(ShowBase):
     def __init__(self):
         ShowBase.__init__(self)
@@ -1116,35 +2808,78 @@ class EmpathyGame(ShowBase):
         self.nt = {nd}
         self.energy = 1.0
 
+        # Fog is one node for the whole session; update_task only moves its range
+        self.fog = Fog("fog"); self.fog.setColor(0.05,0.05,0.08)
+        self.render.setFog(self.fog)
+        self._fog_serotonin = None
+        self._hud_shown     = None
+
         # Ground
         from panda3d.core import CardMaker
         cm = CardMaker("ground"); cm.setFrame(-20,20,-20,20)
         self.ground = self.render.attachNewNode(cm.generate())
         self.ground.setP(-90); self.ground.setColor(0.2,0.2,0.3,1)
 
-        # HUD text
+        # HUD text: the live readout, and a static key hint it never overwrites
         tn = TextNode("hud")
-        tn.setText("Vital Energy: 100%  F1=Console  M=Medication")
         tn.setTextColor(0.9,0.9,0.9,1)
         self.hud = self.aspect2d.attachNewNode(tn)
         self.hud.setPos(-1.3,0,0.9); self.hud.setScale(0.055)
+        hint = TextNode("hint")
+        hint.setText("F1=Console  F3=Frame time  M=Medication")
+        hint.setTextColor(0.6,0.6,0.65,1)
+        self.hint = self.aspect2d.attachNewNode(hint)
+        self.hint.setPos(-1.3,0,0.83); self.hint.setScale(0.04)
+
+        # F3: rolling frame time, to compare the cached and --uncached paths
+        ft = TextNode("frame_time")
+        ft.setTextColor(0.5,0.9,0.55,1)
+        self.frame_hud = self.aspect2d.attachNewNode(ft)
+        self.frame_hud.setPos(0.55,0,0.9); self.frame_hud.setScale(0.045)
+        self.frame_hud.hide()
+        self.frame_times = deque(maxlen=120)
+        self._frame_hud_t = 0.0
 
         self.accept("f1", self.toggle_console)
+        self.accept("f3", self.toggle_frame_time)
         self.accept("m",  self.apply_medication)
         self.accept("escape", sys.exit)
         self.taskMgr.add(self.update_task, "Update")
 
     def update_task(self, task):
         dt = globalClock.getDt()
-        drain = 0.8 / max(self.nt.get("serotonin",0.5), 0.01)
+        self.frame_times.append(dt)
+        serotonin = self.nt.get("serotonin",0.5)
+        drain = 0.8 / max(serotonin, 0.01)
         self.energy = max(0.0, self.energy - drain*dt*0.01)
-        self.hud.node().setText(
-            f"Energy: {{self.energy:.0%}}  serotonin={{self.nt.get('serotonin',0):.2f}}")
-        fog = Fog("fog"); fog.setColor(0.05,0.05,0.08)
-        fog.setLinearRange(10+30*self.nt.get("serotonin",0.5), 80)
-        self.render.setFog(fog)
+
+        if UNCACHED:
+            self.hud.node().setText(
+                f"Energy: {{self.energy:.0%}}  serotonin={{self.nt.get('serotonin',0):.2f}}")
+            fog = Fog("fog"); fog.setColor(0.05,0.05,0.08)
+            fog.setLinearRange(10+30*serotonin, 80)
+            self.render.setFog(fog)
+        else:
+            hud = f"Energy: {{self.energy:.0%}}  serotonin={{self.nt.get('serotonin',0):.2f}}"
+            if hud != self._hud_shown:      # TextNode regenerates geometry on every setText
+                self._hud_shown = hud
+                self.hud.node().setText(hud)
+            if serotonin != self._fog_serotonin:
+                self._fog_serotonin = serotonin
+                self.fog.setLinearRange(10+30*serotonin, 80)
+
+        if not self.frame_hud.isHidden() and task.time - self._frame_hud_t >= 1 / HUD_HZ:
+            self._frame_hud_t = task.time
+            ms = sorted(1e3 * t for t in self.frame_times)
+            self.frame_hud.node().setText(
+                f"frame {{sum(ms)/len(ms):5.2f}} ms  p95 {{ms[int(0.95*(len(ms)-1))]:5.2f}} ms"
+                f"  {{'uncached' if UNCACHED else 'cached'}}")
         return Task.cont
 
+    def toggle_frame_time(self):
+        if self.frame_hud.isHidden(): self.frame_hud.show()
+        else:                         self.frame_hud.hide()
+
     def toggle_console(self):
         for k,v in self.nt.items(): print(f"  {{k}}: {{v:.3f}}")
 
@@ -1168,11 +2903,16 @@ Generated by Mechanistic Empathy Engine v{__version__}
 """
 __version__ = "{__version__}"
 
-import cocos
+import cocos, sys
 from cocos.director import director
 from cocos import layer, scene, text
 from pyglet.window import key as Key
 
+# --uncached reformats and sets the label every frame (the old behaviour),
+# for comparing against the change-driven path with the FPS counter
+UNCACHED = "--uncached" in sys.argv
+HUD_HZ   = 4   # FPS counter refresh rate
+
 director.init(width=800, height=600, caption="{game.title}")
 NT = {nd}
 
@@ -1181,17 +2921,35 @@ class GameLayer(layer.Layer):
     def __init__(self):
         super().__init__()
         self.nt, self.energy = dict(NT), 1.0
-        self.lbl = text.Label("Energy: 100%  F1=Console  M=Medication",
-                               font_size=12, color=(220,220,220,255))
+        self.nt_version = 0   # bumped on every edit to self.nt
+        self.lbl = text.Label("Energy: 100%", font_size=12, color=(220,220,220,255))
         self.lbl.position = (10, 580); self.add(self.lbl)
+        self.hint = text.Label("F1=Console  M=Medication", font_size=10, color=(150,150,165,255))
+        self.hint.position = (10, 562); self.add(self.hint)   # static: update() never touches it
+        self.fps_lbl = text.Label("", font_size=11, color=(120,230,140,255))
+        self.fps_lbl.position = (640, 580); self.add(self.fps_lbl)
         self.player = text.Label("♟", font_size=40, color=(100,180,255,255))
         self.player.position = (400, 60); self.add(self.player)
+        self._shown = dict(pct=None, nt=-1, frames=0, elapsed=0.0)
         self.schedule(self.update)
 
     def update(self, dt):
         drain = 0.8 / max(self.nt.get("serotonin",0.5), 0.01)
         self.energy = max(0.0, self.energy - drain*dt*0.01)
-        self.lbl.element.text = f"Energy:{{self.energy:.0%}}  serotonin={{self.nt.get('serotonin',0):.2f}}"
+        shown = self._shown
+        if UNCACHED:
+            self.lbl.element.text = f"Energy:{{self.energy:.0%}}  serotonin={{self.nt.get('serotonin',0):.2f}}"
+        else:
+            pct = round(self.energy * 100)
+            if (pct, self.nt_version) != (shown["pct"], shown["nt"]):   # relayout only on change
+                shown["pct"], shown["nt"] = pct, self.nt_version
+                self.lbl.element.text = f"Energy:{{pct}}%  serotonin={{self.nt.get('serotonin',0):.2f}}"
+
+        shown["frames"] += 1; shown["elapsed"] += dt
+        if shown["elapsed"] >= 1 / HUD_HZ:
+            self.fps_lbl.element.text = (f"{{shown['frames'] / shown['elapsed']:.0f}} fps  "
+                                         f"{{'uncached' if UNCACHED else 'cached'}}")
+            shown["frames"], shown["elapsed"] = 0, 0.0
 
     def on_key_press(self, symbol, mod):
         speed = 200 * self.nt.get("norepinephrine", 0.8)
@@ -1201,6 +2959,7 @@ class GameLayer(layer.Layer):
             for k,v in self.nt.items(): print(f"  {{k}}: {{v:.3f}}")
         if symbol == Key.M:
             self.nt["serotonin"] = min(2.0, self.nt.get("serotonin",0)+0.3)
+            self.nt_version += 1
             print("[Medication applied]")
 
 director.run(scene.Scene(GameLayer()))
@@ -1226,25 +2985,46 @@ from kivy.clock import Clock
 NT = {nd}
 
 class GameWidget(Widget):
+    """
+    Canvas instructions are created once and kept; update() only mutates
+    pos, size and rgb on the ones whose inputs changed, so an idle frame
+    touches no graphics state at all.
+    """
     def __init__(self, **kw):
         super().__init__(**kw)
         self.nt, self.energy, self.px = dict(NT), 1.0, 400
-        self.hud = Label(text="Vital Energy: 100%", pos=(10,560), size=(300,30))
+        with self.canvas:   # before add_widget, so the HUD label draws on top
+            Color(0.08,0.08,0.12); Rectangle(pos=(0,0), size=(800,600))
+            Color(0.25,0.25,0.35); Rectangle(pos=(0,0), size=(800,30))
+            self.energy_color = Color(0.0, 0.8, 0.2)
+            self.energy_bar   = Rectangle(pos=(10,570), size=(200,16))
+            self.player_color = Color(0.2, 0.35, 1.0)
+            self.player_rect  = Rectangle(pos=(self.px-16, 30), size=(32,64))
+        self.hud = Label(text="Energy: 100%", pos=(10,560), size=(300,30))
         self.add_widget(self.hud)
+        self._shown = dict(pct=100, bar=200, px=self.px, sat=None)
         Clock.schedule_interval(self.update, 1/60.0)
 
     def update(self, dt):
         drain = 0.8 / max(self.nt.get("serotonin",0.5), 0.01)
         self.energy = max(0.0, self.energy - drain*dt*0.01)
-        self.hud.text = f"Energy: {{self.energy:.0%}}"
-        self.canvas.clear()
-        with self.canvas:
-            Color(0.08,0.08,0.12); Rectangle(pos=(0,0), size=(800,600))
-            Color(0.25,0.25,0.35); Rectangle(pos=(0,0), size=(800,30))
-            r = 1.0-self.energy; g = self.energy*0.8
-            Color(r,g,0.2); Rectangle(pos=(10,570), size=(int(200*self.energy),16))
-            sat = self.nt.get("serotonin", 0.5)
-            Color(sat*0.4, sat*0.7, 1.0); Rectangle(pos=(self.px-16, 30), size=(32,64))
+        shown = self._shown
+        pct = round(self.energy * 100)
+        if pct != shown["pct"]:
+            shown["pct"] = pct
+            self.hud.text = f"Energy: {{pct}}%"
+        bar = int(200 * self.energy)
+        if bar != shown["bar"]:
+            shown["bar"] = bar
+            self.energy_bar.size   = (bar, 16)
+            self.energy_color.rgb  = (1.0-self.energy, self.energy*0.8, 0.2)
+        if self.px != shown["px"]:
+            shown["px"] = self.px
+            self.player_rect.pos   = (self.px-16, 30)
+        sat = self.nt.get("serotonin", 0.5)
+        if sat != shown["sat"]:
+            shown["sat"] = sat
+            self.player_color.rgb  = (sat*0.4, sat*0.7, 1.0)
 
     def on_touch_down(self, touch):
         if touch.x > 400: self.px = min(780, self.px+30)
@@ -1267,42 +3047,149 @@ Generated by Mechanistic Empathy Engine v{__version__}
 """
 __version__ = "{__version__}"
 
+import sys, time
+import numpy as np
 from OpenGL.GL import *
 from OpenGL.GLUT import *
 from OpenGL.GLU import *
 
+# --stress N adds N drifting quads to the same batch (still one draw call)
+STRESS = int(sys.argv[sys.argv.index("--stress") + 1]) if "--stress" in sys.argv else 0
+TITLE  = "{game.title}"
+
 NT = {nd}
 nt = dict(NT)
 energy = [1.0]
+state  = dict(nt_version=0)   # bumped on every edit to nt
+
+
+class QuadBatch:
+    """
+    Every quad in one pair of NumPy arrays (xy and rgba, six vertices per
+    quad as two triangles), mirrored in two VBOs and drawn with a single
+    glDrawArrays.  set()/set_many() edit the arrays and widen a dirty span
+    per array; draw() uploads only that span with glBufferSubData.  Client
+    arrays sourced from VBOs are plain GL 1.5, so this runs on software Mesa
+    (llvmpipe) as well as on hardware drivers.
+    """
+    CORNERS = np.array([(0,0), (1,0), (1,1), (0,0), (1,1), (0,1)], np.float32)
+
+    def __init__(self, capacity):
+        self.n     = 0
+        self.xy    = np.zeros((capacity * 6, 2), np.float32)
+        self.rgba  = np.zeros((capacity * 6, 4), np.float32)
+        self.dirty = {{"xy": None, "rgba": None}}    # [lo, hi) quad span per array
+        self.vbo   = dict(zip(("xy", "rgba"), glGenBuffers(2)))
+        for name in self.vbo:
+            arr = getattr(self, name)
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo[name])
+            glBufferData(GL_ARRAY_BUFFER, arr.nbytes, arr, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def _mark(self, name, lo, hi):
+        span = self.dirty[name]
+        self.dirty[name] = (lo, hi) if span is None else (min(span[0], lo), max(span[1], hi))
+
+    def add(self, count=1) -> int:
+        first, self.n = self.n, self.n + count
+        return first
+
+    def set(self, i, x, y, w, h, r, g, b, a=1.0):
+        self.xy[6*i:6*i+6] = self.CORNERS * (w, h) + (x, y)
+        self.rgba[6*i:6*i+6] = (r, g, b, a)
+        self._mark("xy", i, i+1); self._mark("rgba", i, i+1)
+
+    def set_many(self, first, x, y, w, h, rgba=None):
+        """Vectorised set() for quads first..first+len(x)-1; rgba=None keeps colours."""
+        k = len(x)
+        v = self.xy[6*first:6*(first+k)].reshape(k, 6, 2)
+        v[..., 0] = x[:, None] + self.CORNERS[:, 0] * np.asarray(w)[..., None]
+        v[..., 1] = y[:, None] + self.CORNERS[:, 1] * np.asarray(h)[..., None]
+        self._mark("xy", first, first + k)
+        if rgba is not None:
+            self.rgba[6*first:6*(first+k)] = np.repeat(rgba, 6, axis=0)
+            self._mark("rgba", first, first + k)
+
+    def flush(self):
+        for name, span in self.dirty.items():
+            if span is None: continue
+            arr, (lo, hi) = getattr(self, name), span
+            stride = arr.itemsize * arr.shape[1] * 6
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo[name])
+            glBufferSubData(GL_ARRAY_BUFFER, lo * stride, (hi - lo) * stride, arr[6*lo:6*hi])
+            self.dirty[name] = None
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw(self):
+        self.flush()
+        glEnableClientState(GL_VERTEX_ARRAY); glEnableClientState(GL_COLOR_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo["xy"]);   glVertexPointer(2, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo["rgba"]); glColorPointer(4, GL_FLOAT, 0, None)
+        glDrawArrays(GL_TRIANGLES, 0, 6 * self.n)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_COLOR_ARRAY); glDisableClientState(GL_VERTEX_ARRAY)
 
 
 def init():
     glClearColor(0.08,0.08,0.12,1.0)
     glEnable(GL_BLEND); glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
     gluOrtho2D(0,800,0,600)
-
-
-def rect(x,y,w,h,r,g,b,a=1.0):
-    glColor4f(r,g,b,a); glBegin(GL_QUADS)
-    glVertex2f(x,y); glVertex2f(x+w,y); glVertex2f(x+w,y+h); glVertex2f(x,y+h)
-    glEnd()
+    global batch, BG, GROUND, PLAYER, BAR, FIRST_STRESS, stress
+    batch = QuadBatch(4 + STRESS)
+    BG, GROUND, PLAYER, BAR = (batch.add() for _ in range(4))
+    FIRST_STRESS = batch.add(STRESS)
+    batch.set(GROUND, 0,0,800,30, 0.25,0.25,0.35)
+    if STRESS:
+        rng    = np.random.default_rng(0)
+        stress = dict(x=rng.uniform(0, 792, STRESS).astype(np.float32),
+                      y=rng.uniform(30, 592, STRESS).astype(np.float32),
+                      vx=rng.uniform(-60, 60, STRESS).astype(np.float32),
+                      vy=rng.uniform(-60, 60, STRESS).astype(np.float32))
+        rgba = np.column_stack([rng.uniform(0.3, 1.0, (STRESS, 3)),
+                                np.full(STRESS, 0.6)]).astype(np.float32)
+        batch.set_many(FIRST_STRESS, stress["x"], stress["y"], 8, 8, rgba)
+
+
+shown = dict(nt=-1, bar=None, frames=0, t=time.perf_counter())
+
+
+def sync(dt):
+    """Write changed quads into the batch; draw() then uploads only those spans."""
+    if shown["nt"] != state["nt_version"]:
+        shown["nt"] = state["nt_version"]
+        sat = nt.get("serotonin", 0.5)
+        batch.set(BG, 0,0,800,600, 0.08*sat,0.08*sat,0.12+sat*0.1)            # desaturating bg
+        r,g = 1-nt.get("serotonin",0.5), nt.get("dopamine",0.5)*0.8
+        batch.set(PLAYER, 384,48,32,64, r*0.4,g,sat*0.8+0.2)                  # player
+    bar = int(200*energy[0])
+    if bar != shown["bar"]:
+        shown["bar"] = bar
+        batch.set(BAR, 10,570,bar,16, 1-energy[0],energy[0]*0.8,0.2)         # energy bar
+    if STRESS:
+        s = stress
+        s["x"] += s["vx"] * dt; s["y"] += s["vy"] * dt
+        for pos, vel, lo, hi in ((s["x"], s["vx"], 0, 792), (s["y"], s["vy"], 30, 592)):
+            vel[(pos < lo) | (pos > hi)] *= -1                                # bounce
+        batch.set_many(FIRST_STRESS, s["x"], s["y"], 8, 8)                    # positions only
 
 
 def display():
     glClear(GL_COLOR_BUFFER_BIT)
     glLoadIdentity()
-    sat = nt.get("serotonin", 0.5)
-    rect(0,0,800,600, 0.08*sat,0.08*sat,0.12+sat*0.1)   # desaturating bg
-    rect(0,0,800,30,  0.25,0.25,0.35)                    # ground
-    r,g = 1-nt.get("serotonin",0.5), nt.get("dopamine",0.5)*0.8
-    rect(384,48,32,64, r*0.4,g,sat*0.8+0.2)              # player
-    rect(10,570,int(200*energy[0]),16, 1-energy[0],energy[0]*0.8,0.2)  # energy bar
+    batch.draw()
     glutSwapBuffers()
+    shown["frames"] += 1
+    now = time.perf_counter()
+    if now - shown["t"] >= 1.0:    # FPS in the title bar: no text rendering needed
+        fps = shown["frames"] / (now - shown["t"])
+        glutSetWindowTitle(f"{{TITLE}}  |  {{fps:.0f}} fps, {{batch.n}} quads, 1 draw call".encode())
+        shown["frames"], shown["t"] = 0, now
 
 
 def timer_cb(v):
     drain = 0.8 / max(nt.get("serotonin",0.5), 0.01)
     energy[0] = max(0.0, energy[0] - drain*0.016*0.01)
+    sync(0.016)
     glutPostRedisplay(); glutTimerFunc(16, timer_cb, 0)
 
 
@@ -1310,13 +3197,14 @@ def keyboard(key, x, y):
     if key == b"m":
         nt["serotonin"] = min(2.0, nt.get("serotonin",0)+0.3)
         nt["dopamine"]  = min(2.0, nt.get("dopamine",0)+0.2)
+        state["nt_version"] += 1
         print("[Medication applied] NT levels raised; observe colour shift.")
-    if key == b"\\x1b": import sys; sys.exit(0)
+    if key == b"\\x1b": sys.exit(0)
 
 
 glutInit(); glutInitDisplayMode(GLUT_DOUBLE|GLUT_RGB)
-glutInitWindowSize(800,600); glutCreateWindow(b"{game.title}")
-init()
+glutInitWindowSize(800,600); glutCreateWindow(TITLE.encode())
+init(); sync(0.0)
 glutDisplayFunc(display); glutKeyboardFunc(keyboard)
 glutTimerFunc(16, timer_cb, 0); glutMainLoop()
 '''
@@ -1382,16 +3270,14 @@ class StaminaSystemGenerator:
             return cls._default()
 
         # Pull relevant NT baselines (default to 1.0 if absent)
-        nt_map = {nt.name.lower().replace(" ","_"): nt.baseline
-                  for nt in profile.neurotransmitters
-                  if isinstance(nt.baseline, float)}
+        nt_map = NTRegistry.levels(profile.neurotransmitters, 1.0)
 
-        serotonin      = nt_map.get("serotonin",      1.0)
-        norepinephrine = nt_map.get("norepinephrine",  1.0)
-        dopamine       = nt_map.get("dopamine",        1.0)
-        cortisol       = nt_map.get("cortisol",        1.0)
-        gaba           = nt_map.get("gaba",            1.0)
-        substance_p    = nt_map.get("substance_p",     1.0)
+        serotonin      = nt_map[NT_SEROTONIN]
+        norepinephrine = nt_map[NT_NOREPINEPHRINE]
+        dopamine       = nt_map[NT_DOPAMINE]
+        cortisol       = nt_map[NT_CORTISOL]
+        gaba           = nt_map[NT_GABA]
+        substance_p    = nt_map[NT_SUBSTANCE_P]
 
         # ── max_stamina ───────────────────────────────────────────────────────
         # Chronic pain / high substance P reduces maximum capacity
@@ -1700,11 +3586,20 @@ class TimelineGenerator:
             ["Predictable peaks","Predictable troughs","Trigger events","Intervention effects"],
             "Preview 30s ahead. No rewind. Preparation is the agency, not prevention."),
     }
+    # Periodic components (period s, amplitude, phase) of the in-game WaveForm
+    _WAVES = {
+        "fluctuating": [(120.0, 0.25, 0.0), (45.0, 0.12, 1.1), (11.0, 0.05, 2.3)],
+    }
     @classmethod
     def generate(cls, condition):
         p = ConditionLibrary.get(condition)
         return cls._T.get(p.timeline_pattern if p else "episodic", cls._T["episodic"])
 
+    @classmethod
+    def wave(cls, condition) -> list:
+        p = ConditionLibrary.get(condition)
+        return list(cls._WAVES.get(p.timeline_pattern if p else "episodic", []))
+
 
 class MetaConsoleGenerator:
     @staticmethod
@@ -1725,17 +3620,238 @@ class MetaConsoleGenerator:
         )
 
 
+class TimelineStore:
+    """
+    Minute-resolution lifetime behind a TimelineLayer, for scrubbing.
+
+    Intensity (0-1) is sampled on a uniform grid, step minutes apart from
+    start, and kept as one byte per sample: forty years at one-minute
+    resolution is ~21 MB.  Events (episodes, flares, medication trials, ...)
+    are (start, end, kind, label) intervals kept sorted by start.
+
+        store = TimelineStore.simulate("bipolar", years=40, seed=7)
+        level, active = store.seek(TimelineStore.minutes(years=23.5))
+        for start, end, kind, label in store.events_between(t0, t1): ...
+        mins, maxs, means, bucket = store.view(t0, t1, width=800)
+
+    seek() is O(1) for intensity and O(log n) for events.  view() reads a
+    min/max/mean level-of-detail pyramid (LOD_FACTOR x coarser per level),
+    so a view spanning decades touches about width buckets, not millions
+    of samples.
+    """
+    LOD_FACTOR       = 8
+    MINUTES_PER_YEAR = 525_960   # 365.25 days
+
+    def __init__(self, step=1.0, start=0.0):
+        self.step, self.start = step, start
+        self.samples  = bytearray()
+        self.ev_start = array("d")
+        self.ev_end   = array("d")
+        self.ev_info  = []        # (kind, label), parallel to ev_start
+        self._max_len = 0.0       # longest event, bounds the overlap search
+        self._lod     = []        # level k: [mins, maxs, means], LOD_FACTOR**(k+1) samples per bucket
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def end(self) -> float:
+        return self.start + len(self.samples) * self.step
+
+    @classmethod
+    def minutes(cls, years=0.0, days=0.0, hours=0.0) -> float:
+        return years * cls.MINUTES_PER_YEAR + days * 1440.0 + hours * 60.0
+
+    # ── building ──────────────────────────────────────────────────────────────
+    def extend(self, values):
+        """Append intensity samples: floats in 0-1, or bytes already scaled to 0-255."""
+        if isinstance(values, (bytes, bytearray, memoryview)):
+            self.samples += values
+        elif _NUMPY:
+            v = np.clip(np.asarray(values, dtype=np.float32) * 255 + 0.5, 0, 255)
+            self.samples += v.astype(np.uint8).tobytes()
+        else:
+            self.samples += bytes(max(0, min(255, int(v * 255 + 0.5))) for v in values)
+
+    def add_event(self, start, end, kind, label=""):
+        i = bisect.bisect_right(self.ev_start, start)
+        self.ev_start.insert(i, start)
+        self.ev_end.insert(i, end)
+        self.ev_info.insert(i, (kind, label))
+        self._max_len = max(self._max_len, end - start)
+
+    # ── queries ───────────────────────────────────────────────────────────────
+    def _range(self, t0, t1) -> tuple:
+        n  = len(self.samples)
+        i0 = max(0, min(n, int((t0 - self.start) / self.step)))
+        i1 = max(i0, min(n, math.ceil((t1 - self.start) / self.step)))
+        return i0, i1
+
+    def intensity(self, t) -> float:
+        if not self.samples:
+            return 0.0
+        i = max(0, min(len(self.samples) - 1, int((t - self.start) / self.step)))
+        return self.samples[i] / 255
+
+    def seek(self, t) -> tuple:
+        """(intensity at t, events active at t)."""
+        return self.intensity(t), self.events_between(t, t)
+
+    def samples_between(self, t0, t1) -> memoryview:
+        """Raw 0-255 samples for [t0, t1), zero-copy (release it before extend())."""
+        i0, i1 = self._range(t0, t1)
+        return memoryview(self.samples)[i0:i1]
+
+    def events_between(self, t0, t1) -> list:
+        """Events overlapping [t0, t1], in start order."""
+        i0 = bisect.bisect_left(self.ev_start, t0 - self._max_len)
+        i1 = bisect.bisect_right(self.ev_start, t1)
+        return [(self.ev_start[i], self.ev_end[i], *self.ev_info[i])
+                for i in range(i0, i1) if self.ev_end[i] >= t0]
+
+    def view(self, t0, t1, width=800) -> tuple:
+        """
+        (mins, maxs, means, bucket_minutes) over [t0, t1) from the coarsest
+        level that still has at least width buckets there; bytes, 0-255.
+        """
+        self._build_lod()
+        i0, i1 = self._range(t0, t1)
+        level, size = -1, 1
+        while (level + 1 < len(self._lod)
+               and (i1 - i0) // (size * self.LOD_FACTOR) >= width):
+            level += 1
+            size  *= self.LOD_FACTOR
+        if level < 0:
+            raw = bytes(self.samples[i0:i1])
+            return raw, raw, raw, self.step
+        b0, b1 = i0 // size, -(-i1 // size)
+        mins, maxs, means = self._lod[level]
+        return bytes(mins[b0:b1]), bytes(maxs[b0:b1]), bytes(means[b0:b1]), size * self.step
+
+    def _build_lod(self):
+        """Extend the pyramid over samples added since the last call (whole buckets only)."""
+        F, level = self.LOD_FACTOR, 0
+        src = (self.samples,) * 3
+        while len(src[0]) >= F:
+            if level == len(self._lod):
+                self._lod.append([bytearray(), bytearray(), bytearray()])
+            dst = mins, maxs, means = self._lod[level]
+            done, full = len(mins), len(src[0]) // F
+            if full > done:
+                a, b = done * F, full * F
+                if _NUMPY:
+                    lo, hi, mid = (np.frombuffer(x, np.uint8)[a:b].reshape(-1, F) for x in src)
+                    mins  += lo.min(axis=1).tobytes()
+                    maxs  += hi.max(axis=1).tobytes()
+                    means += ((mid.sum(axis=1, dtype=np.uint32) + F // 2) // F).astype(np.uint8).tobytes()
+                    del lo, hi, mid   # drop buffer exports so samples can grow again
+                else:
+                    for j in range(a, b, F):
+                        mins.append(min(src[0][j:j + F]))
+                        maxs.append(max(src[1][j:j + F]))
+                        means.append((sum(src[2][j:j + F]) + F // 2) // F)
+            src, level = dst, level + 1
+
+    # ── simulated lifetime ────────────────────────────────────────────────────
+    @classmethod
+    def simulate(cls, condition, years=40, step=1.0, seed=0) -> "TimelineStore":
+        """
+        A plausible lifetime for the condition's timeline_pattern, seeded:
+        episodic (episodes, diagnosis, medication trials), chronic (rising
+        baseline with flares and interventions), fluctuating (periodic
+        cycles plus trigger events) or developmental (present from birth,
+        compensated with age, with burnout periods).  Every pattern gets a
+        circadian ripple and smoothed noise.  Built a year at a time with
+        NumPy, so peak memory is one year of float32 samples.
+        """
+        if not _NUMPY:
+            raise ImportError("TimelineStore.simulate needs numpy: pip install numpy")
+        p       = ConditionLibrary.get(condition)
+        pattern = p.timeline_pattern if p else "episodic"
+        rng     = np.random.default_rng(seed)
+        Y, D    = cls.MINUTES_PER_YEAR, 1440.0
+        total   = years * Y
+        store   = cls(step)
+        bumps   = []          # (start, end, amplitude) added to the baseline
+        waves   = []          # (period, amplitude, phase) periodic components
+        relief  = []          # (start, factor) effective treatment from start on
+
+        def events(kind, rate_per_year, dur_days, amp, t0, label=""):
+            t = t0 + rng.exponential(Y / rate_per_year)
+            while t < total:
+                dur = rng.uniform(*dur_days) * D
+                bumps.append((t, t + dur, rng.uniform(*amp)))
+                store.add_event(t, t + dur, kind, label)
+                t += dur + rng.exponential(Y / rate_per_year)
+
+        if pattern == "developmental":
+            onset = 0.0
+            store.add_event(0.0, 0.0, "onset", "Early childhood traits")
+            for age, kind, label in ((6.0, "milestone", "School differences noted"),
+                                     (rng.uniform(7, 11), "referral", "Referral"),
+                                     (rng.uniform(9, 16), "diagnosis", "Diagnosis"),
+                                     (rng.uniform(12, 18), "intervention", "Accommodations")):
+                if age * Y < total:
+                    store.add_event(age * Y, age * Y, kind, label)
+            events("burnout", 0.3, (30, 90), (0.2, 0.35), 18 * Y, "Masking burnout")
+        else:
+            onset = min(rng.uniform(14, 28) * Y, total)
+            store.add_event(onset, onset, "onset", "First signs")
+            if pattern == "episodic":
+                events("episode", 0.4, (30, 180), (0.5, 0.8), onset, "Episode")
+            elif pattern == "chronic":
+                events("flare", 6.0, (2, 14), (0.15, 0.35), onset, "Flare")
+            else:
+                waves += [(rng.uniform(60, 150) * D, 0.30, rng.uniform(0, 2 * np.pi)),
+                          (365.25 * D, 0.08, rng.uniform(0, 2 * np.pi)),
+                          (7 * D, 0.04, rng.uniform(0, 2 * np.pi))]
+                events("trigger", 3.0, (1, 5), (0.2, 0.35), onset, "Trigger event")
+            diagnosis = onset + rng.uniform(0.2, 3.0) * Y
+            if diagnosis < total:
+                store.add_event(diagnosis, diagnosis, "diagnosis", "Diagnosis")
+                t = diagnosis
+                for trial in range(int(rng.integers(1, 4))):
+                    dur = rng.uniform(90, 270) * D
+                    store.add_event(t, t + dur, "medication_trial", f"Medication trial {trial + 1}")
+                    t += dur + rng.uniform(30, 365) * D
+                relief.append((t, 0.6))   # the last trial sticks
+
+        chunk = int(Y / step)
+        for c0 in range(0, math.ceil(total / step), chunk):
+            n = min(chunk, math.ceil(total / step) - c0)
+            t = (c0 + np.arange(n)) * step
+            if pattern == "developmental":
+                x = 0.35 + 0.35 * np.exp(-t / (12 * Y))
+            elif pattern == "chronic":
+                x = np.where(t < onset, 0.05, 0.40 + 0.15 * (t - onset) / max(total - onset, 1.0))
+            else:
+                x = np.where(t < onset, 0.05, 0.15)
+            for period, amp, phase in waves:
+                x = x + np.where(t < onset, 0.0, amp * np.sin(2 * np.pi * t / period + phase))
+            t_lo, t_hi = t[0], t[-1]
+            for b0, b1, amp in bumps:
+                if b1 >= t_lo and b0 <= t_hi:
+                    ramp = 0.1 * (b1 - b0)
+                    x = x + amp * np.clip(np.minimum(t - b0, b1 - t) / ramp, 0.0, 1.0)
+            for r0, factor in relief:
+                x = np.where(t >= r0, x * factor, x)
+            x = x + 0.05 * np.sin(2 * np.pi * t / D)                       # circadian
+            hours = np.arange(math.floor(t_lo / 60), math.ceil(t_hi / 60) + 2) * 60.0
+            x = x + np.interp(t, hours, rng.normal(0.0, 0.04, len(hours)))  # smoothed noise
+            store.extend(np.clip(x, 0.0, 1.0))
+        return store
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # PSEUDOCODE + LEARNING OBJECTIVES
 # ══════════════════════════════════════════════════════════════════════════════
 
-def _make_pseudocode(game):
-    p = ConditionLibrary.get(game.condition)
+def _make_pseudocode(game, p):
     nt_block = ""
     if p:
         for nt in p.neurotransmitters:
             val = nt.baseline if isinstance(nt.baseline, float) else 0.5
-            nt_block += f"            '{nt.name.lower()}': {val},\n"
+            nt_block += f"            '{NTRegistry.key(nt.name)}': {val},\n"
     mhints = "\n".join(f"        # {m.name}: {m.implementation_hint}" for m in game.mechanics[:5])
 
     s = game.stamina
@@ -1845,8 +3961,7 @@ _OBJ = [
     "Understand the {p} timeline pattern — how the condition evolves, cycles, or persists.",
 ]
 
-def _objectives(condition):
-    p = ConditionLibrary.get(condition)
+def _objectives(p):
     if not p: return ["Build empathy through gameplay."]
     return [t.format(c=p.condition_name,
                      s=p.primary_symptoms[i % len(p.primary_symptoms)],
@@ -1854,6 +3969,273 @@ def _objectives(condition):
             for i,t in enumerate(_OBJ)]
 
 
+def _title_tagline(p, genre) -> tuple:
+    cw = p.condition_name.split()[0]
+    gw = GENRES[genre]["core_mechanic"].split(",")[0].strip().title()
+    return (f"{cw}: A {gw} of {p.condition_name}",
+            f"What if you felt what they feel? A {genre} about living with {p.condition_name}.")
+
+
+# Deferred text fields of GeneratedGame (see MechanisticEngine.generate_game).
+# Each takes the profile the game was generated from, never a fresh
+# ConditionLibrary lookup: the condition may be redefined before first read.
+
+def _core_loop(g, n_symptoms) -> str:
+    s = g.stamina
+    return (f"Standard {g.genre} loop ({GENRES[g.genre]['core_mechanic']}) "
+            f"modified by {n_symptoms} symptom mechanics. "
+            f"Timeline: {g.timeline.name}. Meta-console exposes {len(g.meta_console.variables)} variables. "
+            f"Serotonin-driven stamina: regen={s.regen_rate:.4f}/s, "
+            f"cap={s.regen_cap:.0%}, max={s.max_stamina:.2f}.")
+
+
+def _design_notes(g) -> str:
+    return (f"Genre strength: '{GENRES[g.genre]['strength']}'. "
+            f"Limitation: '{GENRES[g.genre]['weakness']}'. "
+            f"Mitigate with narrative tooltips.")
+
+
+def _traced_objectives(g, p) -> list:
+    with Tracer.span("generate.objectives", condition=g.condition):
+        return _objectives(p)
+
+
+def _traced_pseudocode(g, p) -> str:
+    with Tracer.span("generate.pseudocode", condition=g.condition, genre=g.genre) as sp:
+        code = _make_pseudocode(g, p)
+        if sp: sp.nbytes = len(code.encode("utf-8"))
+    return code
+
+# ══════════════════════════════════════════════════════════════════════════════
+# SERIALISATION
+# ══════════════════════════════════════════════════════════════════════════════
+
+_JSON_COMPACT = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _fields(obj) -> dict:
+    # Shallow asdict(): every spec field is a str/number/bool or a list of str,
+    # so the deepcopy asdict() does per value is wasted work here.
+    return {k: getattr(obj, k) for k in obj.__dataclass_fields__}
+
+
+def game_to_dict(game: GeneratedGame, pseudocode=False) -> dict:
+    """
+    The *_spec.json payload for a game.  Pseudocode ships as its own file;
+    pass pseudocode=True for a lossless record that game_from_dict() restores.
+    """
+    d = {
+        "title":game.title,"tagline":game.tagline,
+        "condition":game.condition,"genre":game.genre,
+        "core_loop":game.core_loop,
+        "stamina_system": _fields(game.stamina) if game.stamina else None,
+        "mechanics":[_fields(m) for m in game.mechanics],
+        "timeline":_fields(game.timeline),
+        "meta_console":_fields(game.meta_console),
+        "learning_objectives":game.learning_objectives,
+        "design_notes":game.design_notes,
+    }
+    if pseudocode:
+        d["pseudocode"] = game.pseudocode
+    return d
+
+
+def game_from_dict(d: dict) -> GeneratedGame:
+    st = d.get("stamina_system")
+    return GeneratedGame(
+        condition=d["condition"], genre=d["genre"], title=d["title"], tagline=d["tagline"],
+        core_loop=d["core_loop"], mechanics=[GameMechanic(**m) for m in d["mechanics"]],
+        timeline=TimelineLayer(**d["timeline"]), meta_console=MetaConsole(**d["meta_console"]),
+        learning_objectives=d["learning_objectives"], design_notes=d["design_notes"],
+        pseudocode=d.get("pseudocode", ""), stamina=StaminaSystem(**st) if st else None)
+
+
+def game_to_json(game: GeneratedGame) -> str:
+    """Compact single-line JSON for a game — one NDJSON record."""
+    return _JSON_COMPACT.encode(game_to_dict(game))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# PERSISTENT SPEC CACHE
+# ══════════════════════════════════════════════════════════════════════════════
+
+class SpecCache:
+    """
+    Optional on-disk cache of generated games and rendered scaffolds (SQLite).
+
+        engine = MechanisticEngine(cache=SpecCache("~/.cache/empathy.sqlite"))
+
+    Keys are SHA-256 digests over the condition's PhysiologyProfile, the
+    genre, the engine target, any custom mechanics and __version__, so an
+    edited profile or an engine upgrade simply misses.  The file runs in WAL
+    mode with a busy timeout, and writes take an IMMEDIATE transaction, so
+    any number of processes can share one cache.  When the stored payload
+    exceeds max_bytes, least-recently-used entries are evicted down to 90%.
+    Games are stored as compact JSON (game_to_dict), scaffolds as UTF-8 text.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key       TEXT PRIMARY KEY,
+            kind      TEXT NOT NULL,
+            value     BLOB NOT NULL,
+            size      INTEGER NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_used);
+    """
+
+    TIMEOUT_S     = 30   # busy timeout for reads and writes
+    TOUCH_WAIT_MS = 20   # LRU touches give up after this instead of queueing behind writers
+
+    def __init__(self, path, max_bytes=256 * 2**20):
+        self.path      = os.path.expanduser(path)
+        self.max_bytes = max_bytes
+        self._local    = threading.local()
+        self._conn().executescript(self.SCHEMA)
+
+    def __getstate__(self):
+        return {"path": self.path, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are per-thread; one per thread per process
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.TIMEOUT_S, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def key(kind, condition, profile, genre, engine="", custom=()) -> str:
+        blob = json.dumps([kind, condition, asdict(profile) if profile else None, genre,
+                           engine, [asdict(m) for m in custom], __version__],
+                          sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get(self, key) -> Optional[bytes]:
+        conn = self._conn()
+        row  = conn.execute("SELECT value FROM entries WHERE key=?", (key,)).fetchone()
+        if row is None:
+            return None
+        # LRU touch is best-effort: a hit must not wait out another process's write
+        conn.execute(f"PRAGMA busy_timeout={self.TOUCH_WAIT_MS}")
+        try:
+            conn.execute("UPDATE entries SET last_used=? WHERE key=?", (time.time(), key))
+        except sqlite3.OperationalError:
+            pass
+        finally:
+            conn.execute(f"PRAGMA busy_timeout={self.TIMEOUT_S * 1000}")
+        return row[0]
+
+    def put(self, key, kind, value: bytes):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?,?,?,?,?)",
+                         (key, kind, value, len(value), time.time()))
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size),0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        excess, doomed = total - int(self.max_bytes * 0.9), []
+        for k, size in conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            if excess <= 0: break
+            doomed.append((k,)); excess -= size
+        conn.executemany("DELETE FROM entries WHERE key=?", doomed)
+        return len(doomed)
+
+    def get_game(self, key) -> Optional[GeneratedGame]:
+        raw = self.get(key)
+        return None if raw is None else game_from_dict(json.loads(raw))
+
+    def put_game(self, key, game: GeneratedGame):
+        self.put(key, "game", _JSON_COMPACT.encode(game_to_dict(game, pseudocode=True)).encode("utf-8"))
+
+    def stats(self) -> dict:
+        rows = self._conn().execute(
+            "SELECT kind, COUNT(*), COALESCE(SUM(size),0) FROM entries GROUP BY kind").fetchall()
+        return {kind: dict(entries=n, bytes=b) for kind, n, b in rows}
+
+    def clear(self):
+        self._conn().execute("DELETE FROM entries")
+
+    def warm(self, engine, engines=None) -> tuple:
+        """
+        Pre-populate every condition x genre game and every scaffold, then
+        trim to max_bytes.  Returns (entries written, entries evicted).
+        """
+        before = sum(v["entries"] for v in self.stats().values())
+        for c in engine.list_conditions():
+            for g in engine.list_genres():
+                game = engine.generate_game(c, g)
+                for e in (engines or engine.list_engines()):
+                    engine.render_scaffold(game, e)
+        conn = self._conn()
+        written = sum(v["entries"] for v in self.stats().values()) - before
+        conn.execute("BEGIN IMMEDIATE"); evicted = self._evict(conn); conn.execute("COMMIT")
+        return max(written, 0), evicted
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# INCREMENTAL REGENERATION
+# ══════════════════════════════════════════════════════════════════════════════
+# What every derived artifact of generate_game / export_game reads: either a
+# PhysiologyProfile field or an earlier artifact.  Entries are in dependency
+# order; "file:" nodes are export_game outputs (keys of its returned dict).
+
+ARTIFACT_DEPS = {
+    "stamina":              {"neurotransmitters"},
+    "mechanics.nt":         {"neurotransmitters", "stamina"},     # NT meters + stamina mechanic
+    "mechanics.symptom":    {"primary_symptoms"},                 # condition x genre mechanics
+    "mechanics":            {"mechanics.nt", "mechanics.symptom"},
+    "timeline":             {"timeline_pattern"},
+    "meta_console":         {"condition_name", "neurotransmitters", "primary_symptoms", "medication_targets"},
+    "learning_objectives":  {"condition_name", "primary_symptoms", "medication_targets", "timeline_pattern"},
+    "title":                {"condition_name"},
+    "tagline":              {"condition_name"},
+    "core_loop":            {"primary_symptoms", "timeline", "meta_console", "stamina"},
+    "design_notes":         set(),
+    "pseudocode":           {"neurotransmitters", "title", "mechanics", "stamina"},
+    "file:json":            {"title", "tagline", "core_loop", "mechanics", "timeline", "meta_console",
+                             "stamina", "learning_objectives", "design_notes"},
+    "file:pseudocode":      {"pseudocode"},
+    "file:engine_scaffold": {"neurotransmitters", "medication_targets", "timeline_pattern",
+                             "title", "mechanics", "stamina"},
+    "file:engine_module":   set(),
+    "file:pyproject":       {"title"},
+    "file:readme":          {"condition_name", "title", "tagline", "mechanics", "timeline",
+                             "meta_console", "learning_objectives", "design_notes"},
+}
+
+
+def profile_diff(old: PhysiologyProfile, new: PhysiologyProfile) -> list:
+    """PhysiologyProfile fields that differ between two versions of a condition."""
+    return [k for k in PhysiologyProfile.__dataclass_fields__ if getattr(old, k) != getattr(new, k)]
+
+
+def affected_artifacts(changed) -> list:
+    """Every ARTIFACT_DEPS node downstream of the changed profile fields, in dependency order."""
+    dirty = set(changed)
+    out = []
+    for node, deps in ARTIFACT_DEPS.items():
+        if deps & dirty:
+            dirty.add(node)
+            out.append(node)
+    return out
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # THE ENGINE  — public API
 # ══════════════════════════════════════════════════════════════════════════════
@@ -1883,10 +4265,16 @@ class MechanisticEngine:
         ))
         game = engine.generate_game("fibromyalgia", "survival")
         engine.export_game(game, "./fibromyalgia_out", engine_target="arcade")
+
+    Pass cache=SpecCache(path) to reuse games and scaffolds across processes.
     """
 
-    def __init__(self):
+    EXPORTS_KEPT = 256   # most recent exports update_condition() keeps up to date
+
+    def __init__(self, cache: "SpecCache | None" = None):
         self._custom: dict = {}
+        self.cache = cache
+        self._exports: dict = {}   # (directory, condition, genre, engine) -> exported game, oldest first
 
     def define_condition(self, name, physiology, additional_mechanics=None):
         """Register a new (or override an existing) condition."""
@@ -1895,8 +4283,84 @@ class MechanisticEngine:
             self._custom[name.lower()] = additional_mechanics
         print(f"{C.GREEN}+ Condition '{name}' registered.{C.RESET}")
 
-    def generate_game(self, condition: str, genre: str) -> GeneratedGame:
-        """Generate a complete empathy game specification."""
+    def update_condition(self, name, physiology, verbose=True) -> dict:
+        """
+        Replace a condition's profile and bring every export of it up to date.
+
+        Only the artifacts downstream of the changed profile fields (see
+        ARTIFACT_DEPS) are recomputed, and only files whose content actually
+        changed are rewritten.  Returns {"profile": changed fields,
+        "artifacts": recomputed nodes, "files": {path: rewritten?}}.
+        """
+        name = name.lower()
+        old  = ConditionLibrary.get(name)
+        ConditionLibrary.register(name, physiology)
+        changed = profile_diff(old, physiology) if old else list(PhysiologyProfile.__dataclass_fields__)
+        dirty   = affected_artifacts(changed)
+        report  = {"profile": changed, "artifacts": dirty, "files": {}}
+        for key, game in list(self._exports.items()):
+            directory, cond, genre, engine_key = key
+            if cond != name or not dirty:
+                continue
+            game = self._exports[key] = self._refresh(game, old, physiology, dirty)
+            _, written = self._export(game, directory, engine_key,
+                                      only={n[5:] for n in dirty if n.startswith("file:")})
+            report["files"].update(written)
+        if verbose:
+            print(f"{C.GREEN}~ Condition '{name}' updated:{C.RESET} {', '.join(changed) or 'no changes'}")
+            if dirty:
+                print(f"  {C.GRAY}recomputed: {', '.join(n for n in dirty if not n.startswith('file:'))}{C.RESET}")
+            for path, rewritten in report["files"].items():
+                mark = f"{C.YELLOW}rewritten{C.RESET}" if rewritten else f"{C.GRAY}unchanged{C.RESET}"
+                print(f"  {mark:<20} {path}")
+        return report
+
+    def _refresh(self, game, old, p, dirty) -> GeneratedGame:
+        """A copy of game (frozen if game is) with only the dirty artifacts recomputed against p."""
+        frozen = isinstance(game, FrozenGame)
+        if frozen:
+            game = thaw(game)   # recomputed parts are lists; splice into lists, refreeze below
+        c, g = game.condition, game.genre
+        d = {k: getattr(game, k) for k in game.__dataclass_fields__}
+        if "stamina" in dirty:
+            d["stamina"] = StaminaSystemGenerator.generate(c)
+        if "mechanics" in dirty:
+            split  = len(old.neurotransmitters) + 1 if old else 0   # NT meters + stamina come first
+            custom = self._custom.get(c, [])
+            nt_part = (MechanicGenerator._nt_mechanics(c) if "mechanics.nt" in dirty
+                       else d["mechanics"][:split])
+            specific = (MechanicGenerator.generate(c, g)[len(p.neurotransmitters) + 1:]
+                        if "mechanics.symptom" in dirty
+                        else d["mechanics"][split:len(d["mechanics"]) - len(custom)])
+            d["mechanics"] = nt_part + specific + custom
+        if "timeline" in dirty:
+            d["timeline"] = TimelineGenerator.generate(c)
+        if "meta_console" in dirty:
+            d["meta_console"] = MetaConsoleGenerator.generate(c)
+        if "learning_objectives" in dirty:
+            d["learning_objectives"] = _objectives(p)
+        if "title" in dirty or "tagline" in dirty:
+            d["title"], d["tagline"] = _title_tagline(p, g)
+        game = GeneratedGame(**d)
+        if "core_loop" in dirty:
+            game.core_loop = _core_loop(game, len(p.primary_symptoms))
+        if "pseudocode" in dirty:
+            game.pseudocode = _make_pseudocode(game, p)
+        return freeze(game) if frozen else game
+
+    def load_conditions(self, path) -> int:
+        """Index a JSON/TOML condition database (see ConditionLibrary.load); parsed on first use."""
+        return ConditionLibrary.load(path)
+
+    def generate_game(self, condition: str, genre: str, lite=False) -> GeneratedGame:
+        """
+        Generate a complete empathy game specification.
+
+        core_loop, learning_objectives, design_notes and pseudocode are
+        formatted on first access.  lite=True leaves them empty for batch
+        consumers that only read the mechanics and stamina numbers (lite
+        games bypass the spec cache).
+        """
         condition = condition.lower().replace(" ","_")
         genre     = genre.lower().replace(" ","_")
         p = ConditionLibrary.get(condition)
@@ -1907,74 +4371,128 @@ class MechanisticEngine:
             raise ValueError(f"Unknown genre '{genre}'. "
                              f"Available: {', '.join(GENRES)}.")
 
-        mechanics  = MechanicGenerator.generate(condition, genre)
-        mechanics += self._custom.get(condition, [])
-        timeline   = TimelineGenerator.generate(condition)
-        console    = MetaConsoleGenerator.generate(condition)
-        objs       = _objectives(condition)
-        stamina_sys = StaminaSystemGenerator.generate(condition)
-
-        cw = p.condition_name.split()[0]
-        gw = GENRES[genre]["core_mechanic"].split(",")[0].strip().title()
-        title   = f"{cw}: A {gw} of {p.condition_name}"
-        tagline = f"What if you felt what they feel? A {genre} about living with {p.condition_name}."
-        core    = (f"Standard {genre} loop ({GENRES[genre]['core_mechanic']}) "
-                   f"modified by {len(p.primary_symptoms)} symptom mechanics. "
-                   f"Timeline: {timeline.name}. Meta-console exposes {len(console.variables)} variables. "
-                   f"Serotonin-driven stamina: regen={stamina_sys.regen_rate:.4f}/s, "
-                   f"cap={stamina_sys.regen_cap:.0%}, max={stamina_sys.max_stamina:.2f}.")
-        notes   = (f"Genre strength: '{GENRES[genre]['strength']}'. "
-                   f"Limitation: '{GENRES[genre]['weakness']}'. "
-                   f"Mitigate with narrative tooltips.")
-
-        game = GeneratedGame(condition=condition, genre=genre, title=title, tagline=tagline,
-                             core_loop=core, mechanics=mechanics, timeline=timeline,
-                             meta_console=console, learning_objectives=objs,
-                             design_notes=notes, pseudocode="", stamina=stamina_sys)
-        game.pseudocode = _make_pseudocode(game)
+        key = None
+        if self.cache and not lite:
+            key = SpecCache.key("game", condition, p, genre, custom=self._custom.get(condition, ()))
+            with Tracer.span("generate.cache_lookup") as sp:
+                hit = self.cache.get_game(key)
+                if sp: sp.args["hit"] = hit is not None
+            if hit is not None:
+                return hit
+
+        with Tracer.span("generate_game", condition=condition, genre=genre):
+            with Tracer.span("generate.mechanics"):
+                mechanics  = MechanicGenerator.generate(condition, genre)
+                mechanics += self._custom.get(condition, [])
+            with Tracer.span("generate.timeline"):
+                timeline   = TimelineGenerator.generate(condition)
+            with Tracer.span("generate.meta_console"):
+                console    = MetaConsoleGenerator.generate(condition)
+            with Tracer.span("generate.stamina"):
+                stamina_sys = StaminaSystemGenerator.generate(condition)
+
+            title, tagline = _title_tagline(p, genre)
+            if lite:
+                core = notes = code = ""; objs = []
+            else:
+                core  = _Deferred(lambda g: _core_loop(g, len(p.primary_symptoms)))
+                notes = _Deferred(_design_notes)
+                objs  = _Deferred(lambda g: _traced_objectives(g, p))
+                code  = _Deferred(lambda g: _traced_pseudocode(g, p))
+
+            game = GeneratedGame(condition=condition, genre=genre, title=title, tagline=tagline,
+                                 core_loop=core, mechanics=mechanics, timeline=timeline,
+                                 meta_console=console, learning_objectives=objs,
+                                 design_notes=notes, pseudocode=code, stamina=stamina_sys)
+        if key:
+            self.cache.put_game(key, game)
         return game
 
-    def export_game(self, game: GeneratedGame, directory=".", engine_target="pygame") -> dict:
+    def render_scaffold(self, game: GeneratedGame, engine_key: str) -> str:
+        """EngineAdapterGenerator.generate(), served from the cache when one is set."""
+        if not self.cache:
+            return EngineAdapterGenerator.generate(game, engine_key)
+        engine_key = engine_key.lower()
+        key = SpecCache.key("scaffold", game.condition, ConditionLibrary.get(game.condition),
+                            game.genre, engine_key, self._custom.get(game.condition, ()))
+        hit = self.cache.get(key)
+        if hit is not None:
+            return hit.decode("utf-8")
+        code = EngineAdapterGenerator.generate(game, engine_key)
+        self.cache.put(key, "scaffold", code.encode("utf-8"))
+        return code
+
+    def export_game(self, game: GeneratedGame, directory=".", engine_target="pygame",
+                    verbose=True) -> dict:
         """
         Export game to directory. Creates:
           - spec JSON, pseudocode .py, engine scaffold .py
           - pyproject.toml  (Flit packaging — run 'flit build' to create .whl)
           - README.md
+        Files whose content is already up to date are left untouched, and
+        the export is remembered so update_condition() can refresh it (the
+        EXPORTS_KEPT most recent ones).  verbose=False skips the summary
+        printed to stdout.
         """
-        os.makedirs(directory, exist_ok=True)
-        slug = f"{game.condition}_{game.genre}"
-        paths = {}
-
-        # JSON
-        json_path = os.path.join(directory, f"{slug}_spec.json")
-        with open(json_path,"w",encoding="utf-8") as f:
-            json.dump({
-                "title":game.title,"tagline":game.tagline,
-                "condition":game.condition,"genre":game.genre,
-                "core_loop":game.core_loop,
-                "stamina_system": asdict(game.stamina) if game.stamina else None,
-                "mechanics":[asdict(m) for m in game.mechanics],
-                "timeline":asdict(game.timeline),
-                "meta_console":asdict(game.meta_console),
-                "learning_objectives":game.learning_objectives,
-                "design_notes":game.design_notes,
-            }, f, indent=2, ensure_ascii=False)
-        paths["json"] = json_path
-
-        # Pseudocode
-        py_path = os.path.join(directory, f"{slug}_pseudocode.py")
-        with open(py_path,"w",encoding="utf-8") as f:
-            f.write(game.pseudocode)
-        paths["pseudocode"] = py_path
-
-        # Engine scaffold
         engine_key = engine_target.lower()
-        eng = ENGINES.get(engine_key, ENGINES["pygame"])
-        code = EngineAdapterGenerator.generate(game, engine_key)
-        ep = os.path.join(directory, f"{slug}_{engine_key}.py")
-        with open(ep,"w",encoding="utf-8") as f:
-            f.write(code)
-        paths["engine_scaffold"] = ep
+        paths, _ = self._export(game, directory, engine_key)
+        key = (os.path.abspath(directory), game.condition, game.genre, engine_key)
+        self._exports.pop(key, None)
+        self._exports[key] = game
+        if len(self._exports) > self.EXPORTS_KEPT:
+            del self._exports[next(iter(self._exports))]
+        if verbose:
+            print(f"\n{C.GREEN}Exported {len(paths)} files -> {directory}/{C.RESET}")
+            for role, path in paths.items():
+                print(f"  {C.CYAN}{role:<18}{C.RESET} {path}")
+            print()
+        return paths
+
+    @staticmethod
+    def _write(path, text, span, **args) -> bool:
+        """Write text unless the file already holds exactly that; True if written."""
+        data = text.encode("utf-8")
+        with Tracer.span(span, **args) as sp:
+            try:
+                with open(path, "rb") as f:
+                    if f.read() == data:
+                        return False
+            except OSError:
+                pass
+            with open(path, "wb") as f:
+                f.write(data)
+            if sp: sp.nbytes = len(data)
+        return True
+
+    def _export(self, game, directory, engine_key, only=None) -> tuple:
+        """
+        export_game() body.  only limits rendering to those file roles (the
+        others keep their paths).  Returns (paths, {path: rewritten?}).
+        """
+        os.makedirs(directory, exist_ok=True)
+        slug    = f"{game.condition}_{game.genre}"
+        eng     = ENGINES.get(engine_key, ENGINES["pygame"])
+        paths   = {"json":            os.path.join(directory, f"{slug}_spec.json"),
+                   "pseudocode":      os.path.join(directory, f"{slug}_pseudocode.py"),
+                   "engine_scaffold": os.path.join(directory, f"{slug}_{engine_key}.py"),
+                   "engine_module":   os.path.join(directory, "mechanistic_empathy_engine.py"),
+                   "pyproject":       os.path.join(directory, "pyproject.toml"),
+                   "readme":          os.path.join(directory, "README.md")}
+        want    = lambda role: only is None or role in only
+        written = {}
+
+        if want("json"):
+            written[paths["json"]] = self._write(
+                paths["json"], json.dumps(game_to_dict(game), indent=2, ensure_ascii=False),
+                "export.json", slug=slug)
+        if want("pseudocode"):
+            written[paths["pseudocode"]] = self._write(
+                paths["pseudocode"], game.pseudocode, "export.pseudocode", slug=slug)
+        if want("engine_scaffold"):
+            with Tracer.span("export.scaffold", slug=slug, engine=engine_key):
+                code = self.render_scaffold(game, engine_key)
+                written[paths["engine_scaffold"]] = self._write(
+                    paths["engine_scaffold"], code, "export.scaffold.write", slug=slug)
 
         # ── Copy the engine module itself into the export directory ──────────────
         # Flit reads the MODULE FILE for __version__ and the module docstring.
@@ -1983,13 +4501,24 @@ class MechanisticEngine:
         #   2. Start with a triple-quoted module docstring (no shebang above it)
         #   3. Have __version__ = "x.y.z" at top level
         # The engine file already satisfies all three requirements.
-        import shutil as _shutil
-        engine_src = os.path.abspath(__file__)
-        engine_dst = os.path.join(directory, "mechanistic_empathy_engine.py")
-        if os.path.abspath(engine_src) != os.path.abspath(engine_dst):
-            _shutil.copy2(engine_src, engine_dst)
-        paths["engine_module"] = engine_dst
+        if want("engine_module"):
+            engine_src = os.path.abspath(__file__)
+            engine_dst = paths["engine_module"]
+            with Tracer.span("export.engine_module") as sp:
+                if os.path.abspath(engine_src) != os.path.abspath(engine_dst):
+                    shutil.copy2(engine_src, engine_dst)
+                if sp: sp.nbytes = os.path.getsize(engine_dst)
+
+        if want("pyproject"):
+            written[paths["pyproject"]] = self._write(
+                paths["pyproject"], self._render_pyproject(game, eng), "export.pyproject")
+        if want("readme"):
+            written[paths["readme"]] = self._write(
+                paths["readme"], self._render_readme(game, eng, engine_key), "export.readme")
+        return paths, written
 
+    @staticmethod
+    def _render_pyproject(game, eng) -> str:
         # ── pyproject.toml (Flit-compatible) ──────────────────────────────────
         # Key rules obeyed here:
         #   * [tool.flit.module] = "mechanistic_empathy_engine"  ← the module Flit reads
@@ -1999,8 +4528,9 @@ class MechanisticEngine:
         pkg       = f"empathy-{game.condition.replace('_','-')}-{game.genre.replace('_','-')}"
         cmd_name  = f"empathy-{game.condition.replace('_','-')}-{game.genre.replace('_','-')}"
         eng_deps  = eng['install'].replace('pip install ','').strip()
-        # Strip any extras like "PyOpenGL_accelerate" into a list
-        dep_list  = [d.strip() for d in eng_deps.split() if d.strip()]
+        # Strip any extras like "PyOpenGL_accelerate" into a list; shell quotes
+        # around version specifiers ("pyglet>=2") are not part of the requirement
+        dep_list  = [d.strip("\"'") for d in eng_deps.split() if d.strip("\"'")]
         deps_toml = "\n".join(f'  "{d}",' for d in dep_list)
 
         toml = f"""\
@@ -2052,12 +4582,12 @@ Tracker    = "https://github.com/education-singularity/mechanistic-empathy-engin
 [project.optional-dependencies]
 dev = ["flit", "pytest", "mypy"]
 """
-        tp = os.path.join(directory, "pyproject.toml")
-        with open(tp,"w",encoding="utf-8") as f:
-            f.write(toml)
-        paths["pyproject"] = tp
+        return toml
 
+    @staticmethod
+    def _render_readme(game, eng, engine_key) -> str:
         # README + troubleshooting guide
+        slug = f"{game.condition}_{game.genre}"
         mech_md = "\n".join(
             f"- **{m.name}** ({m.intensity:.0%}) — {m.description[:70]}…"
             for m in game.mechanics[:6])
@@ -2088,6 +4618,7 @@ python {slug}_{engine_key}.py
 |-----|--------|
 | Arrow keys / WASD | Movement |
 | `F1` | Toggle Meta-Console — live neurotransmitter editor |
+| `F2` | Toggle frame profiler — per-phase avg/p95, CSV written on exit |
 | `M` | Apply medication preset (raises NT levels, observe mechanic change) |
 | `Esc` | Quit |
 
@@ -2168,20 +4699,13 @@ Variables: `{', '.join(game.meta_console.variables[:6])}`…
 ---
 MIT License — Open Source — Extend freely.
 """
-        rp = os.path.join(directory, "README.md")
-        with open(rp,"w",encoding="utf-8") as f:
-            f.write(readme)
-        paths["readme"] = rp
-
-        print(f"\n{C.GREEN}Exported {len(paths)} files -> {directory}/{C.RESET}")
-        for role, path in paths.items():
-            print(f"  {C.CYAN}{role:<18}{C.RESET} {path}")
-        print()
-        return paths
+        return readme
 
     @staticmethod
     def list_conditions(): return ConditionLibrary.all_names()
     @staticmethod
+    def find_conditions(**criteria): return ConditionLibrary.query(**criteria)
+    @staticmethod
     def list_genres():     return sorted(GENRES.keys())
     @staticmethod
     def list_engines():    return sorted(ENGINES.keys())
@@ -2191,166 +4715,547 @@ MIT License — Open Source — Extend freely.
 # TERMINAL RENDERER
 # ══════════════════════════════════════════════════════════════════════════════
 
+class _NoColor:
+    """Drop-in for C with every escape code blanked."""
+    vars().update(dict.fromkeys((k for k in vars(C) if k.isupper()), ""))
+
+
 class TerminalRenderer:
+    """
+    Renders a GeneratedGame as a terminal report.
+
+    The report is assembled line by line in a list and handed to the stream
+    in one write(), so dumping a catalog to a pager, file or SSH session
+    costs one syscall per spec instead of several hundred.
+
+        TerminalRenderer.render(game)                          # stdout
+        TerminalRenderer.render(game, stream=f, color=False)   # plain text
+        text = TerminalRenderer(width=100).format(game)
+
+    width defaults to the terminal width when the stream is a TTY, else W.
+    color defaults to on for TTYs, off for pipes/files or when NO_COLOR is set.
+    """
     W = 80
 
-    @classmethod
-    def render(cls, game: GeneratedGame):
-        p = ConditionLibrary.get(game.condition)
-        cls._header(game); cls._section("CORE LOOP", game.core_loop)
-        cls._physiology(p); cls._stamina(game.stamina)
-        cls._mechanics(game.mechanics)
-        cls._timeline(game.timeline); cls._console(game.meta_console)
-        cls._objectives(game.learning_objectives); cls._notes(game.design_notes)
-        cls._pseudocode_preview(game.pseudocode)
-        cls._engines_hint(game); cls._footer()
+    def __init__(self, stream=None, width=None, color=None):
+        self.stream = stream if stream is not None else sys.stdout
+        tty = getattr(self.stream, "isatty", lambda: False)()
+        if width is None:
+            width = shutil.get_terminal_size((self.W, 24)).columns if tty else self.W
+        self.W = max(40, width)
+        if color is None:
+            color = tty and "NO_COLOR" not in os.environ
+        self.c     = C if color else _NoColor
+        self._buf  = []
+        self._w    = self._buf.append
 
     @classmethod
-    def _hr(cls, ch="─", col=C.GRAY): print(f"{col}{ch*cls.W}{C.RESET}")
+    def render(cls, game: GeneratedGame, stream=None, width=None, color=None):
+        r = cls(stream, width, color)
+        r.stream.write(r.format(game))
+        r.stream.flush()
 
-    @classmethod
-    def _stamina(cls, s: "StaminaSystem | None"):
+    def format(self, game: GeneratedGame) -> str:
+        self._buf.clear()
+        p = ConditionLibrary.get(game.condition)
+        self._header(game); self._section("CORE LOOP", game.core_loop)
+        self._physiology(p); self._stamina(game.stamina)
+        self._mechanics(game.mechanics)
+        self._timeline(game.timeline); self._console(game.meta_console)
+        self._objectives(game.learning_objectives); self._notes(game.design_notes)
+        self._pseudocode_preview(game.pseudocode)
+        self._engines_hint(game); self._footer()
+        self._buf.append("")
+        return "\n".join(self._buf)
+
+    def _hr(self, ch="─", col=None):
+        c = self.c
+        self._w(f"{col or c.GRAY}{ch*self.W}{c.RESET}")
+
+    def _stamina(self, s: "StaminaSystem | None"):
+        c, w = self.c, self._w
         if not s: return
-        print(f"{C.BOLD}{C.YELLOW}>> REGENERATIVE STAMINA SYSTEM  [serotonin-driven]{C.RESET}")
+        w(f"{c.BOLD}{c.YELLOW}>> REGENERATIVE STAMINA SYSTEM  [serotonin-driven]{c.RESET}")
 
         # Visual bar helpers
-        def bar(val, maxv=1.0, width=24, col=C.GREEN):
+        def bar(val, maxv=1.0, width=24, col=c.GREEN):
             filled = max(0, min(width, int(val / maxv * width)))
-            return col + "█"*filled + C.GRAY + "░"*(width-filled) + C.RESET
+            return col + "█"*filled + c.GRAY + "░"*(width-filled) + c.RESET
 
         # Regen rate bar (0 → 0.08 is healthy reference)
         regen_pct = min(1.0, s.regen_rate / 0.08)
         drain_pct = min(1.0, s.drain_rate / 0.10)
 
-        print(f"    {C.BOLD}max_stamina     {C.RESET} {bar(s.max_stamina)}  {s.max_stamina:.3f}")
-        print(f"    {C.BOLD}regen_rate      {C.RESET} {bar(regen_pct, col=C.CYAN)}  {s.regen_rate:.4f}/s"
-              f"  {C.DIM}(serotonin_weight={s.serotonin_weight:.3f}){C.RESET}")
-        print(f"    {C.BOLD}drain_rate      {C.RESET} {bar(drain_pct, col=C.RED)}  {s.drain_rate:.4f}/s")
-        print(f"    {C.BOLD}regen_cap       {C.RESET} {bar(s.regen_cap)}  {s.regen_cap:.0%}"
-              f"  {C.DIM}(max recoverable without sleep){C.RESET}")
-        print(f"    {C.BOLD}rest_threshold  {C.RESET} {bar(s.rest_threshold, col=C.YELLOW)}  {s.rest_threshold:.0%}"
-              f"  {C.DIM}(below this: forced-rest warning){C.RESET}")
+        w(f"    {c.BOLD}max_stamina     {c.RESET} {bar(s.max_stamina)}  {s.max_stamina:.3f}")
+        w(f"    {c.BOLD}regen_rate      {c.RESET} {bar(regen_pct, col=c.CYAN)}  {s.regen_rate:.4f}/s"
+              f"  {c.DIM}(serotonin_weight={s.serotonin_weight:.3f}){c.RESET}")
+        w(f"    {c.BOLD}drain_rate      {c.RESET} {bar(drain_pct, col=c.RED)}  {s.drain_rate:.4f}/s")
+        w(f"    {c.BOLD}regen_cap       {c.RESET} {bar(s.regen_cap)}  {s.regen_cap:.0%}"
+              f"  {c.DIM}(max recoverable without sleep){c.RESET}")
+        w(f"    {c.BOLD}rest_threshold  {c.RESET} {bar(s.rest_threshold, col=c.YELLOW)}  {s.rest_threshold:.0%}"
+              f"  {c.DIM}(below this: forced-rest warning){c.RESET}")
         if s.overshoot_penalty:
-            print(f"    {C.MAGENTA}⚡ MANIA OVERSHOOT ACTIVE{C.RESET}"
-                  f"  {C.DIM}stamina decays when above max (excess dopamine){C.RESET}")
-        print()
-        print(f"    {C.BOLD}Live formula:{C.RESET}")
+            w(f"    {c.MAGENTA}⚡ MANIA OVERSHOOT ACTIVE{c.RESET}"
+                  f"  {c.DIM}stamina decays when above max (excess dopamine){c.RESET}")
+        w("")
+        w(f"    {c.BOLD}Live formula:{c.RESET}")
         for ln in s.formula.split("\n"):
-            print(f"      {C.DIM}{ln}{C.RESET}")
-        print()
-        print(f"    {C.BOLD}Usage in your game loop:{C.RESET}")
-        print(f"      {C.GREEN}from mechanistic_empathy_engine import StaminaSystemGenerator{C.RESET}")
-        print(f"      {C.GREEN}stamina = StaminaSystemGenerator.tick({C.RESET}")
-        print(f"      {C.GREEN}    stamina, NT, game.stamina, dt,{C.RESET}")
-        print(f"      {C.GREEN}    is_resting=player.is_idle,{C.RESET}")
-        print(f"      {C.GREEN}    is_sleeping=player.at_sleep_checkpoint){C.RESET}")
-        print()
-
-    @classmethod
-    def _header(cls, g):
-        print(); cls._hr("═",C.CYAN)
-        print(f"  {C.BOLD}{C.CYAN}{g.title}{C.RESET}")
-        print(f"  {C.ITALIC}{C.GRAY}{g.tagline}{C.RESET}")
-        print(f"  {C.YELLOW}Condition:{C.RESET} {g.condition.upper().replace('_',' ')}   "
-              f"{C.YELLOW}Genre:{C.RESET} {g.genre.upper()}")
-        cls._hr("═",C.CYAN); print()
-
-    @classmethod
-    def _section(cls, h, b):
-        print(f"{C.BOLD}{C.YELLOW}>> {h}{C.RESET}")
-        for ln in textwrap.wrap(b, cls.W-4): print(f"    {ln}")
-        print()
-
-    @classmethod
-    def _physiology(cls, p):
+            w(f"      {c.DIM}{ln}{c.RESET}")
+        w("")
+        w(f"    {c.BOLD}Usage in your game loop:{c.RESET}")
+        w(f"      {c.GREEN}from mechanistic_empathy_engine import StaminaSystemGenerator{c.RESET}")
+        w(f"      {c.GREEN}stamina = StaminaSystemGenerator.tick({c.RESET}")
+        w(f"      {c.GREEN}    stamina, NT, game.stamina, dt,{c.RESET}")
+        w(f"      {c.GREEN}    is_resting=player.is_idle,{c.RESET}")
+        w(f"      {c.GREEN}    is_sleeping=player.at_sleep_checkpoint){c.RESET}")
+        w("")
+
+    def _header(self, g):
+        c, w = self.c, self._w
+        w(""); self._hr("═",c.CYAN)
+        w(f"  {c.BOLD}{c.CYAN}{g.title}{c.RESET}")
+        w(f"  {c.ITALIC}{c.GRAY}{g.tagline}{c.RESET}")
+        w(f"  {c.YELLOW}Condition:{c.RESET} {g.condition.upper().replace('_',' ')}   "
+              f"{c.YELLOW}Genre:{c.RESET} {g.genre.upper()}")
+        self._hr("═",c.CYAN); w("")
+
+    def _section(self, h, b):
+        c, w = self.c, self._w
+        w(f"{c.BOLD}{c.YELLOW}>> {h}{c.RESET}")
+        for ln in textwrap.wrap(b, self.W-4): w(f"    {ln}")
+        w("")
+
+    def _physiology(self, p):
+        c, w = self.c, self._w
         if not p: return
-        print(f"{C.BOLD}{C.YELLOW}>> PHYSIOLOGY{C.RESET}")
-        print(f"    {C.BOLD}Condition:{C.RESET} {p.condition_name}  |  Pattern: {p.timeline_pattern}")
-        print(f"    {C.BOLD}Systems:{C.RESET}   {', '.join(p.systems_affected)}")
-        print(); print(f"    {C.BOLD}Neurotransmitter Baselines:{C.RESET}")
+        w(f"{c.BOLD}{c.YELLOW}>> PHYSIOLOGY{c.RESET}")
+        w(f"    {c.BOLD}Condition:{c.RESET} {p.condition_name}  |  Pattern: {p.timeline_pattern}")
+        w(f"    {c.BOLD}Systems:{c.RESET}   {', '.join(p.systems_affected)}")
+        w(""); w(f"    {c.BOLD}Neurotransmitter Baselines:{c.RESET}")
         for nt in p.neurotransmitters:
             lvl = nt.baseline if isinstance(nt.baseline, float) else 0.5
             fl  = min(20, max(0, int(lvl*10)))
-            bar = C.GREEN+"█"*fl+C.GRAY+"░"*(20-fl)+C.RESET
+            bar = c.GREEN+"█"*fl+c.GRAY+"░"*(20-fl)+c.RESET
             lvs = f"{lvl:.2f}" if isinstance(nt.baseline, float) else str(nt.baseline)
-            print(f"      {C.CYAN}{nt.name:<22}{C.RESET} {bar} {lvs}  {C.DIM}{nt.game_effect}{C.RESET}")
-        print(); print(f"    {C.BOLD}Symptoms:{C.RESET}")
-        for s in p.primary_symptoms: print(f"      {C.GRAY}*{C.RESET} {s}")
-        print(); print(f"    {C.BOLD}Medication Targets:{C.RESET}")
-        for m in p.medication_targets: print(f"      {C.MAGENTA}[M]{C.RESET} {m}")
-        print()
-
-    @classmethod
-    def _mechanics(cls, mechanics):
-        print(f"{C.BOLD}{C.YELLOW}>> GAME MECHANICS  ({len(mechanics)} total){C.RESET}")
+            w(f"      {c.CYAN}{nt.name:<22}{c.RESET} {bar} {lvs}  {c.DIM}{nt.game_effect}{c.RESET}")
+        w(""); w(f"    {c.BOLD}Symptoms:{c.RESET}")
+        for s in p.primary_symptoms: w(f"      {c.GRAY}*{c.RESET} {s}")
+        w(""); w(f"    {c.BOLD}Medication Targets:{c.RESET}")
+        for m in p.medication_targets: w(f"      {c.MAGENTA}[M]{c.RESET} {m}")
+        w("")
+
+    def _mechanics(self, mechanics):
+        c, w = self.c, self._w
+        w(f"{c.BOLD}{c.YELLOW}>> GAME MECHANICS  ({len(mechanics)} total){c.RESET}")
         for i, m in enumerate(mechanics, 1):
             ib = int(m.intensity*10)
-            bar= C.RED+"#"*ib+C.GRAY+"."*(10-ib)+C.RESET
-            print(f"    {C.BOLD}{C.WHITE}{i:02d}. {m.name}{C.RESET}  [{bar}]")
-            for ln in textwrap.wrap(m.description, cls.W-10): print(f"        {ln}")
-            print(f"        {C.GRAY}From:{C.RESET} {C.ITALIC}{m.mapped_from}{C.RESET}")
-            print(f"        {C.GRAY}Impl:{C.RESET} {C.DIM}{m.implementation_hint}{C.RESET}")
-            print()
-
-    @classmethod
-    def _timeline(cls, tl):
-        print(f"{C.BOLD}{C.YELLOW}>> TIMELINE LAYER  [{tl.name}]{C.RESET}")
-        for ln in textwrap.wrap(tl.description, cls.W-4): print(f"    {ln}")
-        print()
+            bar= c.RED+"#"*ib+c.GRAY+"."*(10-ib)+c.RESET
+            w(f"    {c.BOLD}{c.WHITE}{i:02d}. {m.name}{c.RESET}  [{bar}]")
+            for ln in textwrap.wrap(m.description, self.W-10): w(f"        {ln}")
+            w(f"        {c.GRAY}From:{c.RESET} {c.ITALIC}{m.mapped_from}{c.RESET}")
+            w(f"        {c.GRAY}Impl:{c.RESET} {c.DIM}{m.implementation_hint}{c.RESET}")
+            w("")
+
+    def _timeline(self, tl):
+        c, w = self.c, self._w
+        w(f"{c.BOLD}{c.YELLOW}>> TIMELINE LAYER  [{tl.name}]{c.RESET}")
+        for ln in textwrap.wrap(tl.description, self.W-4): w(f"    {ln}")
+        w("")
         for i,ev in enumerate(tl.events):
-            c = "--" if i<len(tl.events)-1 else "  "
-            print(f"    {C.CYAN}*{c}{C.RESET} {ev}")
-        print(f"\n    {C.BOLD}Braid mechanic:{C.RESET} {tl.braid_mechanic}\n")
-
-    @classmethod
-    def _console(cls, con):
-        print(f"{C.BOLD}{C.YELLOW}>> META-CONSOLE  [{con.label}]{C.RESET}")
-        for ln in textwrap.wrap(con.description, cls.W-4): print(f"    {ln}")
-        print(); print(f"    {C.BOLD}Variables:{C.RESET}")
+            link = "--" if i<len(tl.events)-1 else "  "
+            w(f"    {c.CYAN}*{link}{c.RESET} {ev}")
+        w(f"\n    {c.BOLD}Braid mechanic:{c.RESET} {tl.braid_mechanic}\n")
+
+    def _console(self, con):
+        c, w = self.c, self._w
+        w(f"{c.BOLD}{c.YELLOW}>> META-CONSOLE  [{con.label}]{c.RESET}")
+        for ln in textwrap.wrap(con.description, self.W-4): w(f"    {ln}")
+        w(""); w(f"    {c.BOLD}Variables:{c.RESET}")
         cols=3; v=con.variables
         for rs in range(0,len(v),cols):
-            print("    "+"   ".join(f"{C.CYAN}{x:<24}{C.RESET}" for x in v[rs:rs+cols]))
-        print(); print(f"    {C.BOLD}Inception note:{C.RESET}")
-        for ln in textwrap.wrap(con.inception_note, cls.W-6): print(f"      {C.DIM}{ln}{C.RESET}")
-        print()
-
-    @classmethod
-    def _objectives(cls, objs):
-        print(f"{C.BOLD}{C.YELLOW}>> LEARNING OBJECTIVES{C.RESET}")
+            w("    "+"   ".join(f"{c.CYAN}{x:<24}{c.RESET}" for x in v[rs:rs+cols]))
+        w(""); w(f"    {c.BOLD}Inception note:{c.RESET}")
+        for ln in textwrap.wrap(con.inception_note, self.W-6): w(f"      {c.DIM}{ln}{c.RESET}")
+        w("")
+
+    def _objectives(self, objs):
+        c, w = self.c, self._w
+        w(f"{c.BOLD}{c.YELLOW}>> LEARNING OBJECTIVES{c.RESET}")
         for i,o in enumerate(objs,1):
-            for j,ln in enumerate(textwrap.wrap(o, cls.W-8)):
-                print(f"{'    '+str(i)+'. ' if j==0 else '       '}{ln}")
-        print()
-
-    @classmethod
-    def _notes(cls, n):
-        print(f"{C.BOLD}{C.YELLOW}>> DESIGN NOTES{C.RESET}")
-        for ln in textwrap.wrap(n, cls.W-4): print(f"    {ln}")
-        print()
-
-    @classmethod
-    def _pseudocode_preview(cls, code):
-        print(f"{C.BOLD}{C.YELLOW}>> PSEUDOCODE (preview){C.RESET}")
-        for ln in code.strip().split("\n")[:22]: print(f"  {C.GREEN}{ln}{C.RESET}")
-        print(f"  {C.GRAY}  ... (full file in --export output){C.RESET}\n")
-
-    @classmethod
-    def _engines_hint(cls, game):
-        print(f"{C.BOLD}{C.YELLOW}>> SUPPORTED GAME ENGINES{C.RESET}")
+            for j,ln in enumerate(textwrap.wrap(o, self.W-8)):
+                w(f"{'    '+str(i)+'. ' if j==0 else '       '}{ln}")
+        w("")
+
+    def _notes(self, n):
+        c, w = self.c, self._w
+        w(f"{c.BOLD}{c.YELLOW}>> DESIGN NOTES{c.RESET}")
+        for ln in textwrap.wrap(n, self.W-4): w(f"    {ln}")
+        w("")
+
+    def _pseudocode_preview(self, code):
+        c, w = self.c, self._w
+        w(f"{c.BOLD}{c.YELLOW}>> PSEUDOCODE (preview){c.RESET}")
+        for ln in code.strip().split("\n")[:22]: w(f"  {c.GREEN}{ln}{c.RESET}")
+        w(f"  {c.GRAY}  ... (full file in --export output){c.RESET}\n")
+
+    def _engines_hint(self, game):
+        c, w = self.c, self._w
+        w(f"{c.BOLD}{c.YELLOW}>> SUPPORTED GAME ENGINES{c.RESET}")
         best = GENRES.get(game.genre,{}).get("best_engines",[])
         for key, info in ENGINES.items():
             star = "* " if key in best else "  "
-            print(f"  {C.CYAN}{star}{key:<14}{C.RESET} {info['label']:<14} "
-                  f"{C.GRAY}{info['description'][:42]}{C.RESET}")
-        print(f"\n  {C.DIM}(* = good match for '{game.genre}')  --engine KEY to export scaffold{C.RESET}\n")
+            w(f"  {c.CYAN}{star}{key:<14}{c.RESET} {info['label']:<14} "
+                  f"{c.GRAY}{info['description'][:42]}{c.RESET}")
+        w(f"\n  {c.DIM}(* = good match for '{game.genre}')  --engine KEY to export scaffold{c.RESET}\n")
 
-    @classmethod
-    def _footer(cls):
-        cls._hr("═",C.CYAN)
-        print(f"  {C.BOLD}MECHANISTIC EMPATHY ENGINE v{__version__}{C.RESET}  "
-              f"{C.GRAY}|  MIT License  |  Open Source{C.RESET}")
-        print(f"  {C.DIM}define_condition() . generate_game() . export_game(engine_target='...')  {C.RESET}")
-        cls._hr("═",C.CYAN); print()
+    def _footer(self):
+        c, w = self.c, self._w
+        self._hr("═",c.CYAN)
+        w(f"  {c.BOLD}MECHANISTIC EMPATHY ENGINE v{__version__}{c.RESET}  "
+              f"{c.GRAY}|  MIT License  |  Open Source{c.RESET}")
+        w(f"  {c.DIM}define_condition() . generate_game() . export_game(engine_target='...')  {c.RESET}")
+        self._hr("═",c.CYAN); w("")
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# GENERATION SERVICE
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _export_zip(game: GeneratedGame, engine_key: str, cache=None) -> bytes:
+    """Export into a scratch directory and return it as zip bytes (worker-side)."""
+    buf = io.BytesIO()
+    with tempfile.TemporaryDirectory(prefix="empathy_") as tmp:
+        MechanisticEngine(cache).export_game(game, tmp, engine_target=engine_key, verbose=False)
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name in sorted(os.listdir(tmp)):
+                zf.write(os.path.join(tmp, name), f"{game.condition}_{game.genre}/{name}")
+    return buf.getvalue()
+
+
+class GenerationService:
+    """
+    Long-running local generation server (asyncio, HTTP/1.1 keep-alive).
+
+      GET /list                                        catalog
+      GET /generate?condition=adhd&genre=puzzle        spec JSON
+      GET /scaffold?condition=..&genre=..&engine=..    scaffold source
+      GET /export?condition=..&genre=..&engine=..      full export as zip
+
+    Specs, scaffolds and zips are cached in-process for the server's
+    lifetime.  Exports touch the filesystem and compress, so they run in
+    a process pool; concurrent requests for the same zip share one job.
+    Binds to 127.0.0.1 only, or to a Unix socket with unix_path.
+    """
+
+    def __init__(self, engine=None, port=8765, unix_path=None, workers=None):
+        self.engine    = engine or MechanisticEngine()
+        self.port      = port
+        self.unix_path = unix_path
+        self.workers   = workers
+        self._games: dict = {}
+        self._specs: dict = {}
+        self._scaffolds: dict = {}
+        self._zips: dict = {}
+        self._pool = None
+
+    # ── cached artifacts ─────────────────────────────────────────────────────
+    def game(self, condition, genre) -> GeneratedGame:
+        key = (condition.lower().replace(" ","_"), genre.lower().replace(" ","_"))
+        if key not in self._games:
+            self._games[key] = self.engine.generate_game(*key)
+        return self._games[key]
+
+    def spec(self, condition, genre) -> bytes:
+        g = self.game(condition, genre)
+        key = (g.condition, g.genre)
+        if key not in self._specs:
+            self._specs[key] = game_to_json(g).encode("utf-8")
+        return self._specs[key]
+
+    def scaffold(self, condition, genre, engine_key) -> bytes:
+        g = self.game(condition, genre)
+        engine_key = engine_key.lower()
+        if engine_key not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine_key}'. Available: {', '.join(ENGINES)}")
+        key = (g.condition, g.genre, engine_key)
+        if key not in self._scaffolds:
+            self._scaffolds[key] = self.engine.render_scaffold(g, engine_key).encode("utf-8")
+        return self._scaffolds[key]
+
+    async def export_zip(self, condition, genre, engine_key) -> bytes:
+        g = self.game(condition, genre)
+        engine_key = engine_key.lower()
+        if engine_key not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine_key}'. Available: {', '.join(ENGINES)}")
+        key = (g.condition, g.genre, engine_key)
+        fut = self._zips.get(key)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut  = self._zips[key] = asyncio.ensure_future(
+                loop.run_in_executor(self._pool, _export_zip, g, engine_key, self.engine.cache))
+        try:
+            return await fut
+        except Exception:
+            self._zips.pop(key, None)
+            raise
+
+    # ── HTTP plumbing ────────────────────────────────────────────────────────
+    async def _route(self, target):
+        url = urlsplit(target)
+        q   = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        def need(*names):
+            missing = [n for n in names if not q.get(n)]
+            if missing:
+                raise KeyError(f"missing query parameter(s): {', '.join(missing)}")
+            return [q[n] for n in names]
+        if url.path == "/list":
+            body = _JSON_COMPACT.encode(dict(conditions=self.engine.list_conditions(),
+                                             genres=self.engine.list_genres(),
+                                             engines=self.engine.list_engines()))
+            return 200, "application/json", body.encode("utf-8")
+        if url.path == "/generate":
+            return 200, "application/json", self.spec(*need("condition", "genre"))
+        if url.path == "/scaffold":
+            c, g = need("condition", "genre")
+            return 200, "text/x-python; charset=utf-8", self.scaffold(c, g, q.get("engine", "pygame"))
+        if url.path == "/export":
+            c, g = need("condition", "genre")
+            return 200, "application/zip", await self.export_zip(c, g, q.get("engine", "pygame"))
+        return 404, "application/json", b'{"error":"not found"}'
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, target, version = (line.decode("latin-1").split() + ["", "", ""])[:3]
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                if method != "GET":
+                    status, ctype, body = 405, "application/json", b'{"error":"GET only"}'
+                else:
+                    try:
+                        status, ctype, body = await self._route(target)
+                    except KeyError as e:
+                        status, ctype, body = 400, "application/json", _JSON_COMPACT.encode({"error": e.args[0]}).encode()
+                    except ValueError as e:
+                        status, ctype, body = 404, "application/json", _JSON_COMPACT.encode({"error": str(e)}).encode()
+                    except Exception as e:
+                        # Keep the connection (and the server) alive; report the failure
+                        status, ctype, body = 500, "application/json", _JSON_COMPACT.encode(
+                            {"error": f"{type(e).__name__}: {e}"}).encode()
+                close = headers.get("connection", "").lower() == "close" or version == "HTTP/1.0"
+                writer.write(f"HTTP/1.1 {status} {_HTTP_REASONS.get(status, '')}\r\n"
+                             f"Content-Type: {ctype}\r\nContent-Length: {len(body)}\r\n"
+                             f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n"
+                             .encode("latin-1") + body)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self._pool = ProcessPoolExecutor(self.workers)
+        try:
+            if self.unix_path:
+                server = await asyncio.start_unix_server(self._handle, self.unix_path)
+                where  = self.unix_path
+            else:
+                server = await asyncio.start_server(self._handle, "127.0.0.1", self.port)
+                where  = f"http://127.0.0.1:{self.port}"
+            print(f"{C.GREEN}Serving on {where}  (Ctrl-C to stop){C.RESET}")
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+
+    def run(self):
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            print(f"\n{C.GRAY}Server stopped.{C.RESET}")
+
+
+_HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                 500: "Internal Server Error"}
+
+
+async def _load_client(port, unix_path, targets, n, latencies, errors):
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for i in range(n):
+            target = targets[i % len(targets)]
+            t0 = time.perf_counter()
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                h = await reader.readline()
+                if h in (b"\r\n", b""):
+                    break
+                if h.lower().startswith(b"content-length:"):
+                    length = int(h.split(b":")[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def load_test(port=8765, unix_path=None, requests=2000, concurrency=16, targets=None):
+    """
+    Hammer a running GenerationService from a local client and report
+    requests/sec and latency percentiles.  Default targets cycle through
+    /generate for the whole catalog.
+    """
+    if not targets:
+        targets = [f"/generate?condition={c}&genre={g}"
+                   for c in ConditionLibrary.all_names() for g in sorted(GENRES)]
+    latencies, errors = [], []
+    per = [requests // concurrency + (1 if i < requests % concurrency else 0)
+           for i in range(concurrency)]
+
+    async def run():
+        await asyncio.gather(*(_load_client(port, unix_path, targets[i:] + targets[:i],
+                                            n, latencies, errors)
+                               for i, n in enumerate(per) if n))
+    t0 = time.perf_counter()
+    asyncio.run(run())
+    wall = time.perf_counter() - t0
+    lat  = sorted(latencies)
+    pct  = lambda q: 1e3 * lat[min(len(lat) - 1, int(q * len(lat)))] if lat else 0.0
+    report = dict(requests=len(lat), errors=len(errors), seconds=round(wall, 3),
+                  rps=round(len(lat) / wall, 1) if wall else 0.0,
+                  p50_ms=round(pct(0.50), 3), p90_ms=round(pct(0.90), 3),
+                  p99_ms=round(pct(0.99), 3), max_ms=round(1e3 * lat[-1], 3) if lat else 0.0)
+    print(f"{C.BOLD}{report['requests']} requests{C.RESET} ({report['errors']} errors) "
+          f"in {report['seconds']}s  ->  {C.GREEN}{report['rps']} req/s{C.RESET}")
+    print(f"  latency ms  p50={report['p50_ms']}  p90={report['p90_ms']}  "
+          f"p99={report['p99_ms']}  max={report['max_ms']}")
+    return report
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+# BENCHMARKS
+# ══════════════════════════════════════════════════════════════════════════════
+
+def _retained_size(root) -> int:
+    """Bytes reachable from root through data-model fields and sequences, each object once."""
+    seen, stack, total = set(), [root], 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dataclass_fields__"):
+            stack.extend(getattr(obj, k) for k in obj.__dataclass_fields__)
+            if hasattr(obj, "__dict__"):
+                total += sys.getsizeof(obj.__dict__)
+    return total
+
+
+def bench_memory(engine: MechanisticEngine, n=100_000):
+    """
+    Retained size of n generated games held in a list, cycling through every
+    condition x genre: as plain dataclasses, frozen with interned strings,
+    and frozen with a shared sub-object pool.
+    """
+    combos = [(c, g) for c in engine.list_conditions() for g in engine.list_genres()]
+    t0 = time.perf_counter()
+    games = [engine.generate_game(*combos[i % len(combos)]) for i in range(n)]
+    timings = {"dataclass": time.perf_counter() - t0}
+    variants = {"dataclass": games}
+    for label, pool in (("frozen", None), ("frozen+pool", {})):
+        t0 = time.perf_counter()
+        variants[label] = [freeze(g, pool) for g in games]
+        timings[label] = time.perf_counter() - t0
+    report = {}
+    for label, held in variants.items():
+        size = _retained_size(held)
+        report[label] = dict(bytes=size, per_game=size // n, seconds=round(timings[label], 2))
+    base = report["dataclass"]["bytes"]
+    print(f"{C.BOLD}Memory: {n} games{C.RESET} ({len(combos)} distinct condition x genre)")
+    for label, r in report.items():
+        print(f"  {C.CYAN}{label:<12}{C.RESET} {r['bytes']/2**20:9.1f} MB  {r['per_game']:>7} B/game  "
+              f"{C.GREEN}x{base / max(r['bytes'], 1):.1f}{C.RESET}  {C.GRAY}({r['seconds']}s){C.RESET}")
+    return report
+
+
+def bench_generate(engine: MechanisticEngine, n=100_000):
+    """
+    Batch generation throughput over every condition x genre: full (all text
+    fields read, the old eager cost), lazy (text never read) and lite.
+    """
+    combos = [(c, g) for c in engine.list_conditions() for g in engine.list_genres()]
+
+    def full(c, g):
+        game = engine.generate_game(c, g)
+        game.core_loop, game.learning_objectives, game.design_notes, game.pseudocode
+    modes = {"full": full,
+             "lazy": engine.generate_game,
+             "lite": lambda c, g: engine.generate_game(c, g, lite=True)}
+    report = {}
+    for label, fn in modes.items():
+        t0 = time.perf_counter()
+        for i in range(n):
+            fn(*combos[i % len(combos)])
+        wall = time.perf_counter() - t0
+        report[label] = dict(seconds=round(wall, 2), games_per_s=round(n / wall, 1))
+    base = report["full"]["games_per_s"]
+    print(f"{C.BOLD}Generate: {n} games{C.RESET} ({len(combos)} distinct condition x genre)")
+    for label, r in report.items():
+        print(f"  {C.CYAN}{label:<6}{C.RESET} {r['games_per_s']:>10.0f} games/s  "
+              f"{C.GREEN}x{r['games_per_s'] / base:.1f}{C.RESET}  {C.GRAY}({r['seconds']}s){C.RESET}")
+    return report
+
+
+def bench_timeline(engine: MechanisticEngine, n=100_000, condition="bipolar", years=40):
+    """
+    TimelineStore over a simulated lifetime at one-minute resolution: build
+    time and size, then N random seeks, one-week event ranges and views.
+    """
+    import random
+    t0 = time.perf_counter()
+    store = TimelineStore.simulate(condition, years=years)
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    store.view(store.start, store.end)
+    lod = time.perf_counter() - t0
+    rng, week, span = random.Random(0), TimelineStore.minutes(days=7), store.end - store.start
+    points = [store.start + rng.random() * span for _ in range(n)]
+    report = dict(samples=len(store), events=len(store.ev_start), build_s=round(build, 2),
+                  lod_s=round(lod, 2), mb=round(len(store.samples) / 1e6, 1))
+    queries = {"seek":   store.seek,
+               "range":  lambda t: store.events_between(t, t + week),
+               "view":   lambda t: store.view(t, min(t + 52 * week, store.end), 800)}
+    for label, fn in queries.items():
+        t0 = time.perf_counter()
+        for t in points:
+            fn(t)
+        report[f"{label}_us"] = round((time.perf_counter() - t0) / n * 1e6, 2)
+    print(f"{C.BOLD}Timeline: {years} years of {condition}{C.RESET} "
+          f"({report['samples']} samples, {report['events']} events, {report['mb']} MB)")
+    print(f"  {C.CYAN}build {C.RESET} {report['build_s']}s  {C.GRAY}(+{report['lod_s']}s LOD pyramid){C.RESET}")
+    for label in queries:
+        print(f"  {C.CYAN}{label:<6}{C.RESET} {report[label + '_us']:>10.2f} us/query")
+    return report
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -2418,26 +5323,106 @@ def build_parser():
           python mechanistic_empathy_engine.py --list-conditions
           python mechanistic_empathy_engine.py --list-genres
           python mechanistic_empathy_engine.py --list-engines
+          python mechanistic_empathy_engine.py -c adhd -g puzzle -e ./out --trace trace.json
+          python mechanistic_empathy_engine.py -c all -g all -f ndjson | jq .title
+          python mechanistic_empathy_engine.py --conditions-from ./conditions/ -c fibromyalgia
+          python mechanistic_empathy_engine.py --serve --port 8765
+          python mechanistic_empathy_engine.py --load-test --port 8765 --concurrency 32
 
         Conditions: {', '.join(ConditionLibrary.all_names())}
         Genres:     {', '.join(sorted(GENRES))}
         Engines:    {', '.join(sorted(ENGINES))}
         """))
-    p.add_argument("--condition","-c")
-    p.add_argument("--genre","-g")
+    p.add_argument("--condition","-c", help="Condition, comma-separated list, or 'all'")
+    p.add_argument("--genre","-g",     help="Genre, comma-separated list, or 'all'")
+    p.add_argument("--format","-f", choices=["text","json","ndjson"], default="text",
+                   help="text report (default), JSON, or one compact JSON spec per line")
     p.add_argument("--export","-e", metavar="DIR")
     p.add_argument("--engine","-E", metavar="ENGINE", default="pygame",
                    help="Game engine scaffold (default: pygame)")
     p.add_argument("--list-conditions", action="store_true")
     p.add_argument("--list-genres",     action="store_true")
     p.add_argument("--list-engines",    action="store_true")
+    p.add_argument("--width", type=int, metavar="COLS",
+                   help="Report width (default: terminal width, 80 when piped)")
+    p.add_argument("--no-color", action="store_true",
+                   help="Plain-text report without ANSI colour codes")
+    p.add_argument("--conditions-from", action="append", metavar="PATH",
+                   help="Load extra conditions from a JSON/TOML file or directory (repeatable)")
+    p.add_argument("--trace", metavar="FILE",
+                   help="Write a Chrome trace (JSON) of generation/export stages")
+    cache = p.add_argument_group("persistent spec cache")
+    cache.add_argument("--cache", metavar="FILE",
+                       help="SQLite cache of generated games/scaffolds shared across processes")
+    cache.add_argument("--cache-size", type=int, default=256, metavar="MB",
+                       help="Evict least-recently-used entries above this size (default: 256)")
+    cache.add_argument("--warm-cache", action="store_true",
+                       help="Pre-populate --cache with every condition x genre x engine and exit")
+    svc = p.add_argument_group("local generation service")
+    svc.add_argument("--serve", action="store_true",
+                     help="Run the HTTP generation service on 127.0.0.1 (or --unix)")
+    svc.add_argument("--port", type=int, default=8765)
+    svc.add_argument("--unix", metavar="PATH", help="Listen on a Unix socket instead of TCP")
+    svc.add_argument("--workers", type=int, help="Export worker processes (default: CPU count)")
+    svc.add_argument("--load-test", action="store_true",
+                     help="Benchmark a running service: req/s and latency percentiles")
+    svc.add_argument("--requests", type=int, default=2000)
+    svc.add_argument("--concurrency", type=int, default=16)
+    svc.add_argument("--target", action="append", metavar="PATH",
+                     help="Request path for --load-test (repeatable; default: whole catalog)")
+    p.add_argument("--bench", choices=["memory", "generate", "timeline"],
+                   help="Run a benchmark and exit (memory: retained size of N games; "
+                        "generate: games/s for full, lazy and lite generation; "
+                        "timeline: lifetime TimelineStore seek/range/view latency)")
+    p.add_argument("--bench-n", type=int, default=100_000, metavar="N",
+                   help="Games (or timeline queries) per benchmark (default: 100000)")
     p.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
     return p
 
 
+def _expand_arg(value, options, kind):
+    """'all' -> every option; 'a,b' -> ['a', 'b'], each checked against options."""
+    if value.strip().lower() == "all":
+        return list(options)
+    names = [v.strip() for v in value.split(",") if v.strip()]
+    for name in names:
+        if name.lower().replace(" ","_") not in options:
+            raise ValueError(f"Unknown {kind} '{name}'. Available: {', '.join(options)}.")
+    return names
+
+
 def main():
     parser = build_parser(); args = parser.parse_args()
-    engine = MechanisticEngine()
+    cache  = SpecCache(args.cache, args.cache_size * 2**20) if args.cache else None
+    engine = MechanisticEngine(cache)
+    for path in args.conditions_from or ():
+        try:
+            engine.load_conditions(path)
+        except (OSError, ValueError, ImportError) as e:
+            parser.error(str(e))
+
+    if args.warm_cache:
+        if not cache:
+            parser.error("--warm-cache needs --cache FILE")
+        t0 = time.perf_counter()
+        n, gone = cache.warm(engine)
+        print(f"{C.GREEN}Cache warmed: {n} new, {gone} evicted in {time.perf_counter()-t0:.2f}s{C.RESET}")
+        for kind, st in sorted(cache.stats().items()):
+            print(f"  {C.CYAN}{kind:<10}{C.RESET} {st['entries']:>6} entries  {st['bytes']/2**20:8.2f} MB")
+        return
+
+    if args.bench:
+        {"memory": bench_memory, "generate": bench_generate,
+         "timeline": bench_timeline}[args.bench](engine, args.bench_n)
+        return
+
+    if args.serve:
+        GenerationService(engine, port=args.port, unix_path=args.unix, workers=args.workers).run()
+        return
+
+    if args.load_test:
+        load_test(args.port, args.unix, args.requests, args.concurrency, args.target)
+        return
 
     if args.list_conditions:
         print(f"\n{C.BOLD}Conditions ({len(engine.list_conditions())}){C.RESET}\n")
@@ -2462,13 +5447,38 @@ def main():
         print(); return
 
     if args.condition and args.genre:
+        rec = Tracer.register(ChromeTraceRecorder()) if args.trace else None
+        out, array = sys.stdout, False
         try:
-            game = engine.generate_game(args.condition, args.genre)
-            TerminalRenderer.render(game)
-            if args.export:
-                engine.export_game(game, args.export, engine_target=args.engine)
+            # every name is checked up front, so a bad one never leaves a half-written array
+            pairs = [(c, g) for c in _expand_arg(args.condition, engine.list_conditions(), "condition")
+                            for g in _expand_arg(args.genre, engine.list_genres(), "genre")]
+            array = args.format == "json" and len(pairs) > 1
+            if array: out.write("[")
+            for i, (c, g) in enumerate(pairs):
+                game = engine.generate_game(c, g)
+                if args.format == "text":
+                    TerminalRenderer.render(game, width=args.width,
+                                            color=False if args.no_color else None)
+                else:
+                    out.write(("," if array and i else "") + game_to_json(game)
+                              + ("" if array else "\n"))
+                    out.flush()
+                if args.export:
+                    d = args.export if len(pairs) == 1 else \
+                        os.path.join(args.export, f"{game.condition}_{game.genre}")
+                    engine.export_game(game, d, engine_target=args.engine,
+                                       verbose=args.format == "text")
+            if array: out.write("]\n")
         except ValueError as e:
-            print(f"\n{C.RED}Error: {e}{C.RESET}\n"); sys.exit(1)
+            if args.format == "text":
+                print(f"\n{C.RED}Error: {e}{C.RESET}\n"); sys.exit(1)
+            if array: out.write("]\n")       # e.g. a malformed loaded record mid-batch
+            print(f"Error: {e}", file=sys.stderr); sys.exit(1)
+        finally:
+            if rec:
+                Tracer.unregister(rec)
+                print(f"{C.GRAY}Trace written -> {rec.dump(args.trace)}{C.RESET}", file=sys.stderr)
         return
 
     interactive_mode(engine)
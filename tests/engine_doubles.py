@@ -0,0 +1,261 @@
+"""
+Stand-ins for the game engines the generated scaffolds import.
+
+Only the surface the scaffolds touch is provided.  Every stub counts its
+constructions, method calls and attribute writes in COUNTS ("Label()",
+"Fog.setLinearRange", "Label.text="), so a test can run a scaffold's
+frame callbacks headless and check that a frame builds no objects and
+only pushes state that changed.
+
+    with installed("arcade") as counts: ...
+"""
+
+import builtins
+import contextlib
+import sys
+import types
+from collections import Counter
+
+COUNTS = Counter()
+
+
+class Stub:
+    """Takes any arguments; unknown methods are no-ops; calls and attribute writes are counted."""
+
+    def __init__(self, *args, **kw):
+        COUNTS[type(self).__name__ + "()"] += 1
+        for k, v in kw.items():
+            object.__setattr__(self, k, v)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        key = f"{type(self).__name__}.{name}"
+        def method(*a, **k):
+            COUNTS[key] += 1
+        return method
+
+    def __setattr__(self, name, value):
+        if not name.startswith("_"):
+            COUNTS[f"{type(self).__name__}.{name}="] += 1
+        object.__setattr__(self, name, value)
+
+
+class StubList(list):
+    def __init__(self, *args):
+        COUNTS[type(self).__name__ + "()"] += 1
+        super().__init__(*args)
+
+    def draw(self, *a, **k):
+        pass
+
+
+class Names:
+    """Namespace whose every attribute is its own name (key codes, colours)."""
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return name
+
+
+def _noop(*a, **k):
+    return None
+
+
+def _stub(name, base=Stub, **attrs):
+    return type(name, (base,), attrs)
+
+
+def _module(name, **attrs):
+    mod = types.ModuleType(name)
+    mod.__dict__.update(attrs)
+    return mod
+
+
+def _arcade():
+    class Text(Stub):
+        def __init__(self, text, x, y, color=None, size=12, **kw):
+            super().__init__(**kw)
+            object.__setattr__(self, "text", text)
+
+    class Sprite(Stub):
+        def __init__(self, width=1, height=1, color=None):
+            super().__init__(width=width, height=height, color=color, left=0, bottom=0,
+                             right=width, center_x=0, center_y=0, change_x=0, change_y=0,
+                             visible=True)
+
+    return {"arcade": _module(
+        "arcade", Window=_stub("Window"), SpriteSolidColor=_stub("SpriteSolidColor", Sprite),
+        SpriteList=_stub("SpriteList", StubList), ShapeElementList=_stub("ShapeElementList", StubList),
+        Text=Text, color=Names(), key=Names(), create_rectangle_filled=lambda *a: a,
+        set_background_color=_noop, run=_noop)}
+
+
+def _pyglet():
+    class Window(Stub):
+        def event(self, fn):
+            return fn
+
+    mods = {
+        "pyglet.window.key": Names(),
+        "pyglet.window": _module("pyglet.window", Window=Window),
+        "pyglet.shapes": _module("pyglet.shapes", Rectangle=_stub("Rectangle")),
+        "pyglet.graphics": _module("pyglet.graphics", Batch=_stub("Batch"), Group=_stub("Group")),
+        "pyglet.text": _module("pyglet.text", Label=_stub("Label")),
+        "pyglet.clock": _module("pyglet.clock", schedule_interval=_noop),
+        "pyglet.app": _module("pyglet.app", run=_noop),
+    }
+    mods["pyglet.window"].key = mods["pyglet.window.key"]
+    mods["pyglet"] = _module("pyglet", **{k.split(".")[1]: v for k, v in mods.items() if k.count(".") == 1})
+    return mods
+
+
+def _panda3d():
+    class NodePath(Stub):
+        def __init__(self, node=None):
+            super().__init__(_node=node, _hidden=False)
+        def node(self): return self._node
+        def attachNewNode(self, node): return NodePath(node)
+        def hide(self): object.__setattr__(self, "_hidden", True)
+        def show(self): object.__setattr__(self, "_hidden", False)
+        def isHidden(self): return self._hidden
+
+    class TextNode(Stub):
+        def __init__(self, name):
+            super().__init__(name=name, text="")
+        def setText(self, text):
+            COUNTS["TextNode.setText"] += 1
+            object.__setattr__(self, "text", text)
+
+    class ShowBase(Stub):
+        instances = []
+        def __init__(self):
+            super().__init__(render=NodePath(), aspect2d=NodePath(), taskMgr=Stub(), keys={})
+            ShowBase.instances.append(self)
+        def accept(self, key, fn): self.keys[key] = fn
+
+    class Clock:
+        dt = 1 / 60
+        def getDt(self): return self.dt
+
+    return {
+        "__builtins__": {"globalClock": Clock()},   # ShowBase puts it in builtins too
+        "direct": _module("direct"), "direct.showbase": _module("direct.showbase"),
+        "direct.showbase.ShowBase": _module("direct.showbase.ShowBase", ShowBase=ShowBase),
+        "direct.task": _module("direct.task", Task=types.SimpleNamespace(cont=1)),
+        "panda3d": _module("panda3d"),
+        "panda3d.core": _module("panda3d.core", TextNode=TextNode, Fog=_stub("Fog"),
+                                CardMaker=_stub("CardMaker")),
+    }
+
+
+def _kivy():
+    class Widget(Stub):
+        def __init__(self, **kw):
+            super().__init__(canvas=contextlib.nullcontext())
+
+    return {
+        "kivy": _module("kivy"), "kivy.uix": _module("kivy.uix"),
+        "kivy.app": _module("kivy.app", App=_stub("App")),
+        "kivy.uix.widget": _module("kivy.uix.widget", Widget=Widget),
+        "kivy.uix.label": _module("kivy.uix.label", Label=_stub("Label")),
+        "kivy.graphics": _module("kivy.graphics", Color=_stub("Color"), Rectangle=_stub("Rectangle")),
+        "kivy.clock": _module("kivy.clock", Clock=types.SimpleNamespace(schedule_interval=_noop)),
+    }
+
+
+def _ursina():
+    colors = Names()
+    colors.hsv = lambda h, s, v: ("hsv", h, s, v)
+    return {
+        "ursina": _module("ursina", Ursina=_stub("Ursina"), window=_stub("Window")(),
+                          Entity=_stub("Entity"), Text=_stub("Text"), color=colors,
+                          time=types.SimpleNamespace(dt=1 / 60)),
+        "ursina.prefabs": _module("ursina.prefabs"),
+        "ursina.prefabs.first_person_controller": _module(
+            "ursina.prefabs.first_person_controller",
+            FirstPersonController=_stub("FirstPersonController")),
+    }
+
+
+def _cocos2d():
+    class Label(Stub):
+        def __init__(self, text="", **kw):
+            super().__init__(element=_stub("Element")(text=text), x=400)
+
+    mods = {
+        "cocos.director": _module("cocos.director", director=_stub("Director")()),
+        "cocos.layer": _module("cocos.layer", Layer=_stub("Layer")),
+        "cocos.scene": _module("cocos.scene", Scene=_stub("Scene")),
+        "cocos.text": _module("cocos.text", Label=Label),
+    }
+    mods["cocos"] = _module("cocos", **{k.split(".")[1]: v for k, v in mods.items()})
+    key = Names()
+    mods["pyglet.window"] = _module("pyglet.window", key=key)
+    mods["pyglet"] = _module("pyglet", window=mods["pyglet.window"])
+    mods["pyglet.window.key"] = key
+    return mods
+
+
+CALLS = []   # (name, args) for every recorded GL call, oldest first
+
+
+def _gl_module(name, functions, constants):
+    """A module of GL entry points that count themselves and append to CALLS."""
+    def entry(fn, result=None):
+        def call(*args):
+            COUNTS[fn] += 1
+            CALLS.append((fn, args))
+            return result(*args) if result else None
+        return call
+
+    attrs = {fn: entry(fn, functions[fn]) for fn in functions}
+    attrs.update((c, 1 << i) for i, c in enumerate(constants))   # distinct flag bits
+    return _module(name, **attrs)
+
+
+def _pyopengl():
+    CALLS.clear()
+    gl = dict.fromkeys("""glClearColor glEnable glBlendFunc glBindBuffer glBufferData
+        glBufferSubData glEnableClientState glDisableClientState glVertexPointer
+        glColorPointer glDrawArrays glClear glLoadIdentity""".split())
+    gl["glGenBuffers"] = lambda n: list(range(1, n + 1))
+    glut = dict.fromkeys("""glutInit glutInitDisplayMode glutInitWindowSize glutCreateWindow
+        glutDisplayFunc glutKeyboardFunc glutTimerFunc glutMainLoop glutSwapBuffers
+        glutSetWindowTitle glutPostRedisplay""".split())
+    mods = {
+        "OpenGL.GL": _gl_module("OpenGL.GL", gl, """GL_ARRAY_BUFFER GL_DYNAMIC_DRAW GL_FLOAT
+            GL_TRIANGLES GL_VERTEX_ARRAY GL_COLOR_ARRAY GL_BLEND GL_SRC_ALPHA
+            GL_ONE_MINUS_SRC_ALPHA GL_COLOR_BUFFER_BIT""".split()),
+        "OpenGL.GLUT": _gl_module("OpenGL.GLUT", glut, ["GLUT_DOUBLE", "GLUT_RGB"]),
+        "OpenGL.GLU": _gl_module("OpenGL.GLU", {"gluOrtho2D": None}, []),
+    }
+    mods["OpenGL"] = _module("OpenGL", **{k.split(".")[1]: v for k, v in mods.items()})
+    return mods
+
+
+ENGINES = {"arcade": _arcade, "pyglet": _pyglet, "panda3d": _panda3d, "kivy": _kivy,
+           "ursina": _ursina, "cocos2d": _cocos2d, "pyopengl": _pyopengl}
+
+
+@contextlib.contextmanager
+def installed(engine):
+    """Put the doubles for engine in sys.modules (and COUNTS back to zero) for the block."""
+    modules = ENGINES[engine]()
+    names = modules.pop("__builtins__", {})
+    saved = {name: sys.modules.get(name) for name in modules}
+    sys.modules.update(modules)
+    for name, value in names.items():
+        setattr(builtins, name, value)
+    COUNTS.clear()
+    try:
+        yield COUNTS
+    finally:
+        for name in names:
+            delattr(builtins, name)
+        for name, mod in saved.items():
+            if mod is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = mod
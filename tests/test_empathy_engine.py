@@ -0,0 +1,979 @@
+"""Behavioural tests for empathy_engine.  Run with ``python -m pytest -q``."""
+
+import asyncio
+import atexit
+import copy
+import json
+import math
+import os
+import runpy
+import sqlite3
+import subprocess
+import sys
+import time
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import empathy_engine as ee
+import engine_doubles
+
+ENGINE_PY = ee.__file__
+
+
+@pytest.fixture(autouse=True)
+def _library():
+    """Tests may register or load conditions; restore the catalog afterwards."""
+    lib = ee.ConditionLibrary
+    names = ("REGISTRY", "_PENDING", "_SOURCES", "_BY_NT", "_BY_SYSTEM", "_BY_SYMPTOM", "_BY_MEDICATION")
+    saved = {n: copy.deepcopy(getattr(lib, n)) for n in names}
+    yield
+    for n, d in saved.items():
+        getattr(lib, n).clear()
+        getattr(lib, n).update(d)
+
+
+def _record(name, **over):
+    """A condition record in the ConditionLibrary.load() layout."""
+    d = dict(condition_name=name,
+             neurotransmitters=[dict(name="Serotonin", baseline=0.3, role="mood", game_effect="x")],
+             systems_affected=["limbic"], primary_symptoms=["low mood"],
+             timeline_pattern="chronic", medication_targets=["SSRI -> serotonin"])
+    d.update(over)
+    return d
+
+
+@pytest.fixture
+def engine():
+    return ee.MechanisticEngine()
+
+
+@pytest.fixture
+def scaffold(tmp_path, monkeypatch):
+    """Load a generated pygame scaffold as a namespace; exit hooks are collected, not registered."""
+    pygame = pytest.importorskip("pygame")
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    monkeypatch.chdir(tmp_path)
+    exit_hooks = []
+    monkeypatch.setattr(atexit, "register", lambda fn, *a: exit_hooks.append((fn, a)))
+
+    def load(condition="adhd", genre="platformer"):
+        game = ee.MechanisticEngine().generate_game(condition, genre)
+        path = tmp_path / f"{condition}_game.py"
+        path.write_text(ee.EngineAdapterGenerator.generate(game, "pygame"), encoding="utf-8")
+        return runpy.run_path(str(path))
+
+    def run(ns, argv, frames, held=()):
+        """Drive ns["main"](argv) for a number of frames; held is a key set or frame -> key set."""
+        count = [0]
+        def events():
+            count[0] += 1
+            return [pygame.event.Event(pygame.QUIT)] if count[0] > frames else []
+        class Keys:
+            def __getitem__(self, key):
+                return key in (held(count[0]) if callable(held) else held)
+        monkeypatch.setattr(pygame.event, "get", events)
+        monkeypatch.setattr(pygame.key, "get_pressed", Keys)
+        with pytest.raises(SystemExit):
+            ns["main"](argv)
+        for fn, a in exit_hooks:
+            fn(*a)
+        exit_hooks.clear()
+
+    load.run = run
+    return load
+
+
+@pytest.fixture
+def adapter(tmp_path, monkeypatch):
+    """Load a generated non-pygame scaffold against the engine doubles; yields (namespace, COUNTS)."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(atexit, "register", lambda fn, *a: None)
+    stack = []
+
+    def load(engine_key, condition="depression", genre="platformer"):
+        game = ee.MechanisticEngine().generate_game(condition, genre)
+        path = tmp_path / f"{engine_key}_game.py"
+        path.write_text(ee.EngineAdapterGenerator.generate(game, engine_key), encoding="utf-8")
+        cm = engine_doubles.installed(engine_key)
+        counts = cm.__enter__()
+        stack.append(cm)
+        return runpy.run_path(str(path)), counts
+
+    yield load
+    for cm in reversed(stack):
+        cm.__exit__(None, None, None)
+
+
+# ── Tracing (user-026) ────────────────────────────────────────────────────────
+
+def test_tracer_without_hooks_returns_null_span():
+    assert ee.Tracer.span("x") is ee._NULL_SPAN
+    assert not ee.Tracer.span("x")
+
+
+def test_chrome_trace_records_generate_and_export_stages(engine, tmp_path):
+    rec = ee.Tracer.register(ee.ChromeTraceRecorder())
+    try:
+        game = engine.generate_game("adhd", "puzzle")
+        engine.export_game(game, str(tmp_path), "pygame", verbose=False)
+    finally:
+        ee.Tracer.unregister(rec)
+    names = {e["name"] for e in rec.events}
+    assert {"generate_game", "generate.mechanics", "generate.stamina"} <= names
+    ends = [e for e in rec.events if e["ph"] == "E"]
+    assert all(e["args"]["dur_ms"] >= 0 for e in ends)
+    assert any("bytes" in e["args"] for e in ends)
+    assert sum(e["ph"] == "B" for e in rec.events) == len(ends)
+
+
+# ── Frame profiler (user-027) ─────────────────────────────────────────────────
+
+def test_frame_profiler_log_is_bounded(tmp_path):
+    prof = ee.FrameProfiler(["update", "draw"], window=4, log_limit=3)
+    prof.toggle()
+    for _ in range(5):
+        prof.begin_frame()
+        prof.mark("update")
+        prof.mark("draw")
+        prof.end_frame()
+    assert len(prof.history()) == 4
+    assert [name for name, *_ in prof.stats()] == ["update", "draw", "frame"]
+    path = prof.dump_csv(str(tmp_path / "prof.csv"))
+    lines = open(path, encoding="utf-8").read().splitlines()
+    assert lines[0] == "frame,total_ms,update_ms,draw_ms"
+    assert [ln.split(",")[0] for ln in lines[1:]] == ["2", "3", "4"]
+
+
+def test_frame_profiler_disabled_records_nothing(tmp_path):
+    prof = ee.FrameProfiler(["update"])
+    prof.begin_frame(); prof.mark("update"); prof.end_frame()
+    assert prof.history() == []
+    assert prof.dump_csv(str(tmp_path / "prof.csv")) is None
+
+
+# ── Binary telemetry (user-028) ───────────────────────────────────────────────
+
+def test_telemetry_round_trip_across_ring_and_chunk_growth(tmp_path):
+    pytest.importorskip("numpy")
+    path = str(tmp_path / "run.emtl")
+    rec = ee.TelemetryRecorder(path, ["serotonin", "dopamine"], ring=16, chunk=32)
+    for frame in range(1, 201):
+        rec.record(frame, frame / 60, {"serotonin": frame / 200, "dopamine": 0.5},
+                   {"stamina": 100 - frame / 4, "mood_phase": "mania"}, flags=frame & 3)
+    rec.close()
+    assert ee.TelemetryReader.header(path)["count"] == 200
+    log = ee.TelemetryReader.open(path)
+    assert list(log["frame"][:3]) == [1, 2, 3]
+    assert log["serotonin"][-1] == pytest.approx(1.0)
+    assert log["stamina"][199] == pytest.approx(50.0)
+    assert set(log["mood"]) == {ee.TelemetryReader.MOODS["mania"]}
+    assert os.path.getsize(path) == ee.TelemetryReader.header(path)["data_offset"] + 200 * rec._size
+
+
+def test_telemetry_rejects_foreign_file(tmp_path):
+    path = tmp_path / "x.emtl"
+    path.write_bytes(b"NOPE" + bytes(80))
+    with pytest.raises(ValueError):
+        ee.TelemetryReader.header(str(path))
+
+
+def test_scaffold_telemetry_clock_advances_every_frame(scaffold):
+    pytest.importorskip("numpy")
+    ns = scaffold("anxiety")
+    scaffold.run(ns, ["--record", "s.emir", "--telemetry", "s.emtl", "--seed", "3"], frames=40)
+    log = ee.TelemetryReader.open("s.emtl")
+    assert len(log) == 40
+    assert log["t"] == pytest.approx([(i + 1) / 60 for i in range(40)], rel=1e-5)
+
+
+# ── Input record/replay (user-029) ────────────────────────────────────────────
+
+def test_input_log_stores_changes_only(tmp_path):
+    log = ee.InputLog(seed=42, fps=30)
+    masks = [0] * 500 + [3] * 200 + [1] + [0] * 1000
+    for m in masks:
+        log.append(m)
+    assert len(log._buf) <= 12
+    back = ee.InputLog.load(log.save(str(tmp_path / "a.emir")))
+    assert (back.seed, back.fps, back.frames) == (42, 30, len(masks))
+    assert list(back.masks()) == masks
+
+
+def test_replay_reproduces_live_session(scaffold):
+    pytest.importorskip("numpy")
+    ns = scaffold("bipolar")
+    held = {ns["pygame"].K_RIGHT, ns["pygame"].K_SPACE}
+    scaffold.run(ns, ["--record", "live.emir", "--telemetry", "live.emtl"], frames=90, held=held)
+    first = ns["replay"]("live.emir", "replay.emtl")
+    assert ns["replay"]("live.emir") == first
+    live, again = ee.TelemetryReader.open("live.emtl"), ee.TelemetryReader.open("replay.emtl")
+    assert len(live) == len(again) == 90
+    assert live.tobytes() == again.tobytes()
+
+
+# ── Terminal renderer (user-030) ──────────────────────────────────────────────
+
+class _CountingStream:
+    def __init__(self):
+        self.writes = []
+    def write(self, s):
+        self.writes.append(s)
+    def flush(self):
+        pass
+
+
+def test_terminal_renderer_single_write_plain_text(engine):
+    game = engine.generate_game("depression", "platformer")
+    out = _CountingStream()
+    ee.TerminalRenderer.render(game, stream=out, width=100)
+    assert len(out.writes) == 1
+    text = out.writes[0]
+    assert "\x1b[" not in text
+    assert "═" * 100 in text and "═" * 101 not in text
+    assert game.title in text
+
+
+def test_terminal_renderer_color_and_minimum_width(engine):
+    game = engine.generate_game("adhd", "puzzle")
+    r = ee.TerminalRenderer(stream=_CountingStream(), width=10, color=True)
+    assert r.W == 40
+    assert "\x1b[" in r.format(game)
+    assert r.format(game) == r.format(game)
+
+
+def test_no_color_blanks_every_code_without_module_leftovers():
+    codes = [k for k in vars(ee.C) if k.isupper()]
+    assert codes and all(getattr(ee._NoColor, k) == "" for k in codes)
+    assert "_k" not in vars(ee)
+
+
+# ── JSON / NDJSON output (user-031) ───────────────────────────────────────────
+
+def _cli(*args):
+    return subprocess.run([sys.executable, ENGINE_PY, *args], capture_output=True,
+                          text=True, encoding="utf-8", timeout=120)
+
+
+def test_cli_ndjson_one_record_per_game():
+    res = _cli("-c", "adhd,anxiety", "-g", "puzzle,platformer", "-f", "ndjson")
+    assert res.returncode == 0, res.stderr
+    records = [json.loads(line) for line in res.stdout.splitlines()]
+    assert [(r["condition"], r["genre"]) for r in records] == [
+        ("adhd", "puzzle"), ("adhd", "platformer"), ("anxiety", "puzzle"), ("anxiety", "platformer")]
+    assert all(r["mechanics"] for r in records)
+
+
+def test_cli_json_array_and_errors_on_stderr():
+    res = _cli("-c", "adhd,depression", "-g", "puzzle", "-f", "json")
+    games = json.loads(res.stdout)
+    assert [g["condition"] for g in games] == ["adhd", "depression"]
+    bad = _cli("-c", "nope", "-g", "puzzle", "-f", "ndjson")
+    assert bad.returncode == 1
+    assert bad.stdout == "" and "Unknown condition" in bad.stderr
+
+
+def test_cli_json_array_stays_valid_on_bad_names(tmp_path):
+    for args in (("-c", "adhd,bogus", "-g", "puzzle"), ("-c", "adhd", "-g", "puzzle,bogus")):
+        res = _cli(*args, "-f", "json")
+        assert res.returncode == 1 and res.stdout == ""
+        assert "Unknown" in res.stderr and "'bogus'" in res.stderr and "\x1b" not in res.stderr
+    db = tmp_path / "db.json"
+    db.write_text(json.dumps({"broken": {"neurotransmitters": []}}), encoding="utf-8")
+    res = _cli("--conditions-from", str(db), "-c", "adhd,broken", "-g", "puzzle", "-f", "json")
+    assert res.returncode == 1 and "bad condition record" in res.stderr
+    assert [g["condition"] for g in json.loads(res.stdout)] == ["adhd"]
+
+
+# ── Generation service (user-032) ─────────────────────────────────────────────
+
+def _serve_requests(svc, targets):
+    """Send GETs over one keep-alive connection; [(status, body), ...]."""
+    async def go():
+        server = await asyncio.start_server(svc._handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        out = []
+        for target in targets:
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: x\r\n\r\n".encode("latin-1"))
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while (h := await reader.readline()) not in (b"\r\n", b""):
+                if h.lower().startswith(b"content-length:"):
+                    length = int(h.split(b":")[1])
+            out.append((status, await reader.readexactly(length)))
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return out
+    return asyncio.run(go())
+
+
+def test_service_serves_and_caches_artifacts(engine):
+    svc = ee.GenerationService(engine)
+    (s1, spec), (s2, code), (s3, _) = _serve_requests(svc, [
+        "/generate?condition=adhd&genre=puzzle",
+        "/scaffold?condition=adhd&genre=puzzle&engine=pygame",
+        "/list"])
+    assert (s1, s2, s3) == (200, 200, 200)
+    assert json.loads(spec)["condition"] == "adhd"
+    assert b"import pygame" in code
+    assert svc.scaffold("adhd", "puzzle", "PyGame") is svc.scaffold("adhd", "puzzle", "pygame")
+
+
+def test_service_rejects_unknown_engine_and_reports_crashes(engine, monkeypatch):
+    svc = ee.GenerationService(engine)
+    def boom(*a):
+        raise RuntimeError("kaput")
+    monkeypatch.setattr(svc, "spec", boom)
+    (bad, body), (crash, err), (after, _) = _serve_requests(svc, [
+        "/scaffold?condition=adhd&genre=puzzle&engine=unity",
+        "/generate?condition=adhd&genre=puzzle",
+        "/list"])
+    assert bad == 404 and b"Unknown engine" in body
+    assert crash == 500 and b"kaput" in err
+    assert after == 200
+    assert not svc._scaffolds
+
+
+# ── Spec cache (user-033) ─────────────────────────────────────────────────────
+
+def test_spec_cache_hits_across_engines_and_misses_on_profile_change(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    first = ee.MechanisticEngine(ee.SpecCache(path))
+    game = first.generate_game("adhd", "puzzle")
+    code = first.render_scaffold(game, "pygame")
+    again = ee.MechanisticEngine(ee.SpecCache(path))
+    hit = again.generate_game("adhd", "puzzle")
+    assert hit.pseudocode == game.pseudocode and hit.mechanics == game.mechanics
+    assert again.render_scaffold(hit, "pygame") == code
+    assert ee.SpecCache(path).stats()["game"]["entries"] == 1
+    p = ee.ConditionLibrary.get("adhd")
+    key = ee.SpecCache.key("game", "adhd", p, "puzzle")
+    edited = ee.PhysiologyProfile(**{**p.__dict__, "primary_symptoms": ["other"]})
+    assert ee.SpecCache.key("game", "adhd", edited, "puzzle") != key
+
+
+def test_spec_cache_evicts_least_recently_used(tmp_path):
+    cache = ee.SpecCache(str(tmp_path / "c.sqlite"), max_bytes=3000)
+    for i in range(3):
+        cache.put(f"k{i}", "blob", bytes(900))
+    cache.get("k0")
+    cache.put("k3", "blob", bytes(900))
+    assert cache.get("k1") is None
+    assert cache.get("k0") is not None and cache.get("k3") is not None
+
+
+def test_spec_cache_hit_does_not_wait_for_writer(tmp_path):
+    path = str(tmp_path / "c.sqlite")
+    cache = ee.SpecCache(path)
+    cache.put("k", "blob", b"v")
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        t0 = time.perf_counter()
+        assert cache.get("k") == b"v"
+        assert time.perf_counter() - t0 < 1.0
+    finally:
+        writer.execute("ROLLBACK")
+    assert cache._conn().execute("PRAGMA busy_timeout").fetchone()[0] == cache.TIMEOUT_S * 1000
+
+
+def test_spec_cache_warm_reports_written_and_evicted(engine, tmp_path):
+    cache = ee.SpecCache(str(tmp_path / "c.sqlite"))
+    written, evicted = cache.warm(ee.MechanisticEngine(cache), engines=["pygame"])
+    n = len(engine.list_conditions()) * len(engine.list_genres())
+    assert (written, evicted) == (2 * n, 0)
+
+
+# ── External condition database (user-034) ────────────────────────────────────
+
+def test_load_directory_is_lazy(tmp_path):
+    (tmp_path / "fibro.json").write_text(json.dumps(_record("Fibromyalgia")), encoding="utf-8")
+    (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+    assert ee.ConditionLibrary.load(str(tmp_path)) == 2
+    assert "fibro" in ee.ConditionLibrary.all_names()
+    assert "fibro" not in ee.ConditionLibrary.REGISTRY
+    p = ee.ConditionLibrary.get("FIBRO")
+    assert p.condition_name == "Fibromyalgia" and p.neurotransmitters[0].baseline == 0.3
+    assert ee.ConditionLibrary.REGISTRY["fibro"] is p
+    game = ee.MechanisticEngine().generate_game("fibro", "puzzle")
+    assert game.condition == "fibro"
+
+
+def test_load_single_file_overrides_builtin(tmp_path):
+    path = tmp_path / "db.json"
+    path.write_text(json.dumps({"adhd": _record("Custom ADHD"), "bad": {"neurotransmitters": []}}),
+                    encoding="utf-8")
+    assert ee.ConditionLibrary.load(str(path)) == 2
+    assert ee.ConditionLibrary.get("adhd").condition_name == "Custom ADHD"
+    with pytest.raises(ValueError, match="bad condition record 'bad'"):
+        ee.ConditionLibrary.get("bad")
+    with pytest.raises(ValueError, match="not found"):
+        ee.ConditionLibrary.load(str(tmp_path / "missing"))
+
+
+# ── Condition index and query (user-035) ──────────────────────────────────────
+
+def test_query_matches_every_criterion():
+    q = ee.ConditionLibrary.query
+    low_5ht = q(nt={"serotonin": (None, 0.5)})
+    assert "depression" in low_5ht
+    assert all(any(ee.NTRegistry.key(n.name) == "serotonin" and n.baseline < 0.5
+                   for n in ee.ConditionLibrary.get(c).neurotransmitters) for c in low_5ht)
+    assert q(symptom="sleep") == sorted(
+        c for c in ee.ConditionLibrary.all_names()
+        if any("sleep" in s.split() for s in ee.ConditionLibrary.get(c).primary_symptoms))
+    assert "depression" in q(system="HPA_axis", medication="SNRIs")
+    assert q() == ee.ConditionLibrary.all_names()
+    assert q(system="no_such_system") == []
+
+
+def test_query_after_load_drops_overridden_entries(tmp_path):
+    assert "depression" in ee.ConditionLibrary.query(system="HPA_axis")
+    path = tmp_path / "db.json"
+    path.write_text(json.dumps({"depression": _record("Depression v2", systems_affected=["vestibular_nuclei"])}),
+                    encoding="utf-8")
+    ee.ConditionLibrary.load(str(path))
+    assert "depression" not in ee.ConditionLibrary.query(system="HPA_axis")
+    assert "depression" not in ee.ConditionLibrary.query(nt={"dopamine": (0.0, 1.0)})
+    assert ee.ConditionLibrary.query(system="vestibular_nuclei") == ["depression"]
+
+
+def test_register_reindexes_replaced_profile():
+    p = ee.ConditionLibrary.get("adhd")
+    ee.ConditionLibrary.register("adhd", ee.ConditionLibrary.profile_from_dict(
+        _record("ADHD v2", systems_affected=["vestibular_nuclei"])))
+    assert "adhd" not in ee.ConditionLibrary.query(system=p.systems_affected[0])
+    assert ee.ConditionLibrary.query(system="vestibular_nuclei") == ["adhd"]
+
+
+# ── Frozen data model (user-036) ──────────────────────────────────────────────
+
+def test_freeze_round_trip_and_pool_shares_sub_objects_only(engine):
+    a = engine.generate_game("adhd", "puzzle")
+    b = engine.generate_game("adhd", "puzzle")
+    pool = {}
+    fa, fb = ee.freeze(a, pool), ee.freeze(b, pool)
+    assert fa is not fb and fa == fb
+    assert fa.timeline is fb.timeline and fa.mechanics[0] is fb.mechanics[0]
+    assert not hasattr(fa, "__dict__")
+    with pytest.raises(AttributeError):
+        fa.title = "x"
+    back = ee.thaw(fa)
+    assert isinstance(back, ee.GeneratedGame) and isinstance(back.mechanics, list)
+    assert ee.game_to_dict(back, pseudocode=True) == ee.game_to_dict(a, pseudocode=True)
+    assert ee.game_to_json(fa) == ee.game_to_json(a)
+
+
+def test_bench_memory_counts_every_game(engine, capsys):
+    report = ee.bench_memory(engine, n=200)
+    assert report["frozen+pool"]["per_game"] > 50
+    assert report["frozen+pool"]["bytes"] < report["frozen"]["bytes"] < report["dataclass"]["bytes"]
+
+
+def test_update_condition_refreshes_frozen_export(engine, tmp_path):
+    game = ee.freeze(engine.generate_game("depression", "platformer"))
+    engine.export_game(game, str(tmp_path), "pygame", verbose=False)
+    p = ee.ConditionLibrary.get("depression")
+    new = ee.PhysiologyProfile(**{**p.__dict__, "primary_symptoms": p.primary_symptoms + ["brain fog"]})
+    report = engine.update_condition("depression", new, verbose=False)
+    assert report["profile"] == ["primary_symptoms"]
+    (refreshed,) = engine._exports.values()
+    assert isinstance(refreshed, ee.FrozenGame)
+    assert f"{len(new.primary_symptoms)} symptom mechanics" in refreshed.core_loop
+    assert refreshed.mechanics[:4] == game.mechanics[:4]
+
+
+# ── Neurotransmitter registry (user-037) ──────────────────────────────────────
+
+def test_nt_registry_canonical_keys_and_stable_ids():
+    R = ee.NTRegistry
+    assert R.key("Glutamate (NMDA)") == "glutamate_nmda"
+    assert R.key("Substance P") == R.key("substance_p") == "substance_p"
+    assert R.id("Serotonin") == ee.NT_SEROTONIN and R.id("CORTISOL") == ee.NT_CORTISOL
+    i = R.register("Orexin-A")
+    assert R.register("orexin a") == i and R.KEYS[i] == "orexin_a"
+    levels = R.levels([ee.Neurotransmitter("Dopamine", 0.2, "", ""),
+                       ee.Neurotransmitter("Orexin A", 0.7, "", "")], default=1.0)
+    assert len(levels) == len(R.KEYS)
+    assert levels[ee.NT_DOPAMINE] == 0.2 and levels[i] == 0.7 and levels[ee.NT_GABA] == 1.0
+
+
+def test_medication_presets_resolve_to_canonical_keys():
+    assert ee.medication_preset("chronic_pain")["substance_p"] == -0.4
+    assert set(ee.medication_preset("schizophrenia")) == {"dopamine_mesolimbic", "glutamate_nmda"}
+
+
+# ── Lazy text fields and lite mode (user-038) ─────────────────────────────────
+
+def test_deferred_text_is_formatted_once_on_first_read(engine):
+    game = engine.generate_game("anxiety", "puzzle")
+    assert type(game.__dict__["_lazy_pseudocode"]) is ee._Deferred
+    code = game.pseudocode
+    assert game.__dict__["_lazy_pseudocode"] is code
+    assert "anxiety" in code and game.learning_objectives and game.design_notes
+
+
+def test_deferred_text_uses_profile_at_generation_time(engine):
+    eager = engine.generate_game("depression", "puzzle")
+    expected = ee.game_to_dict(eager, pseudocode=True)
+    lazy = engine.generate_game("depression", "puzzle")
+    engine.define_condition("depression", ee.ConditionLibrary.profile_from_dict(
+        _record("Redefined", neurotransmitters=[dict(name="Orexin", baseline=0.1)])))
+    assert ee.game_to_dict(lazy, pseudocode=True) == expected
+    assert "orexin" not in lazy.pseudocode
+
+
+def test_lite_games_skip_text(engine):
+    game = engine.generate_game("adhd", "platformer", lite=True)
+    assert game.pseudocode == game.core_loop == "" and game.learning_objectives == []
+    assert game.mechanics == engine.generate_game("adhd", "platformer").mechanics
+
+
+# ── Incremental regeneration (user-039) ───────────────────────────────────────
+
+def test_update_condition_rewrites_only_affected_files(engine, tmp_path):
+    game = engine.generate_game("adhd", "platformer")
+    paths = engine.export_game(game, str(tmp_path), "pygame", verbose=False)
+    before = {role: open(path, "rb").read() for role, path in paths.items()}
+    p = ee.ConditionLibrary.get("adhd")
+    same = engine.update_condition("adhd", ee.PhysiologyProfile(**p.__dict__), verbose=False)
+    assert same["profile"] == [] and same["files"] == {}
+    new = ee.PhysiologyProfile(**{**p.__dict__, "medication_targets": ["modafinil -> orexin"]})
+    report = engine.update_condition("adhd", new, verbose=False)
+    assert report["profile"] == ["medication_targets"]
+    rewritten = {path for path, changed in report["files"].items() if changed}
+    assert rewritten and rewritten < set(paths.values())
+    for role, path in paths.items():
+        assert (open(path, "rb").read() == before[role]) == (path not in rewritten)
+
+
+def test_exports_remembered_are_bounded(engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(ee.MechanisticEngine, "EXPORTS_KEPT", 2)
+    game = engine.generate_game("adhd", "puzzle", lite=True)
+    for d in ("a", "b", "a", "c"):
+        engine.export_game(game, str(tmp_path / d), "pygame", verbose=False)
+    assert [os.path.basename(k[0]) for k in engine._exports] == ["a", "c"]
+
+
+# ── Pharmacokinetic medication model (user-040) ───────────────────────────────
+
+_DRUG = dict(name="test", onset=2.0, t_max=5.0, half_life=10.0, interval=20.0,
+             effects={"serotonin": 1.5})
+
+
+def _table_concentration(meds, t, doses):
+    """Reference superposition straight from the tabulated single-dose curve."""
+    tab, c = meds.tables[0], 0.0
+    for td in doses:
+        x = (t - td) / meds.STEP
+        if 0 <= x < len(tab) - 1:
+            i = int(x)
+            c += tab[i] + (tab[i + 1] - tab[i]) * (x - i)
+    return c
+
+
+def test_single_dose_curve_peaks_at_one():
+    meds = ee.MedicationModel([_DRUG])
+    meds.dose(0.0)
+    assert meds.concentration(1.9) == 0.0
+    assert meds.concentration(_DRUG["onset"] + _DRUG["t_max"]) == pytest.approx(1.0, abs=1e-6)
+    assert meds.concentration(200.0) == 0.0 and not meds.doses[0]
+
+
+def test_stacked_doses_superpose_in_constant_time():
+    meds, doses = ee.MedicationModel([_DRUG]), []
+    for step in range(6000):
+        t = step * 0.05
+        if step % 40 == 0:
+            meds.dose(t); doses.append(t)
+        assert meds.concentration(t) == pytest.approx(_table_concentration(meds, t, doses), abs=5e-3)
+    assert meds._sums[0][2] == sum(td + _DRUG["onset"] <= t for td in meds.doses[0])
+    assert len(meds.doses[0]) < len(doses)
+    meds.doses = [ee.deque(meds.doses[0])]          # restored snapshot: sums rebuilt
+    assert meds.concentration(t) == pytest.approx(_table_concentration(meds, t, doses), abs=5e-3)
+    kept = list(meds.doses[0])                       # earlier time: sums rebuilt too
+    assert meds.concentration(t - 30) == pytest.approx(_table_concentration(meds, t - 30, kept), abs=5e-3)
+
+
+def test_apply_clamps_and_returns_to_baseline():
+    meds = ee.MedicationModel([_DRUG])
+    nt = {"serotonin": 1.2, "dopamine": 0.4}
+    for k in range(3):
+        meds.dose(k * 1.0)
+    peak = 0.0
+    for step in range(4000):
+        meds.apply(step * 0.05, nt)
+        peak = max(peak, nt["serotonin"])
+        if step == 100:
+            nt["serotonin"] -= 0.1      # another mechanic's edit survives the drug
+    assert peak == 2.0
+    assert not meds.applied
+    assert nt == {"serotonin": pytest.approx(1.1, abs=1e-9), "dopamine": 0.4}
+
+
+# ── Timeline event store (user-041) ───────────────────────────────────────────
+
+def test_timeline_store_seek_and_event_overlap():
+    store = ee.TimelineStore(step=1.0)
+    store.extend([i / 999 for i in range(1000)])
+    store.add_event(100, 400, "episode", "long")
+    store.add_event(350, 360, "trigger")
+    store.add_event(500, 500, "diagnosis")
+    level, active = store.seek(355.5)
+    assert level == pytest.approx(355 / 999, abs=1 / 255)
+    assert [e[2] for e in active] == ["episode", "trigger"]
+    assert [e[2] for e in store.events_between(450, 600)] == ["diagnosis"]
+    assert store.events_between(401, 499) == []
+    assert bytes(store.samples_between(10, 13)) == bytes(store.samples[10:13])
+
+
+def test_timeline_store_view_reads_lod_pyramid():
+    store = ee.TimelineStore(step=1.0)
+    store.extend(bytes(range(256)) * 64)               # 16384 samples
+    mins, maxs, means, bucket = store.view(0, len(store), width=100)
+    assert bucket == 64 and len(mins) == 256
+    assert mins[0] == 0 and maxs[0] == 63 and means[0] == 32
+    store.extend(bytes([255]) * 4096)                  # the pyramid extends incrementally
+    mins, maxs, _, bucket = store.view(16384, 20480, width=8)
+    assert bucket == 512 and set(mins) == set(maxs) == {255}
+    raw, _, _, bucket = store.view(0, 5, width=100)
+    assert bucket == 1.0 and raw == bytes(range(5))
+
+
+def test_timeline_store_simulate_is_seeded():
+    pytest.importorskip("numpy")
+    a = ee.TimelineStore.simulate("bipolar", years=2, seed=7)
+    b = ee.TimelineStore.simulate("bipolar", years=2, seed=7)
+    assert len(a) == math.ceil(ee.TimelineStore.minutes(years=2))
+    assert a.samples == b.samples and a.ev_info == b.ev_info
+    assert a.ev_info[0] == ("onset", "First signs")
+
+
+# ── Rewind (user-042) ─────────────────────────────────────────────────────────
+
+def test_rewind_seek_rebuilds_state_from_keyframe_and_deltas():
+    rw = ee.Rewind(keyframe=1.0, budget=1 << 20)
+    for i in range(100):
+        rw.record(i * 0.1, {"x": i, "slow": i // 25, "const": "c"})
+    t, state = rw.seek(4.25)
+    assert t == pytest.approx(4.2) and state == {"x": 42, "slow": 1, "const": "c"}
+    assert len(rw.starts) == 10
+    assert all("const" not in d for block in rw.blocks for d in block[2])
+    rw.truncate(t)
+    rw.record(4.3, {"x": -1, "slow": 1, "const": "c"})
+    assert rw.seek(99)[1]["x"] == -1 and rw.seek(4.2)[1]["x"] == 42
+
+
+def test_rewind_budget_drops_oldest_keyframes():
+    rw = ee.Rewind(keyframe=1.0, budget=20_000)
+    for i in range(1000):
+        rw.record(i * 0.1, {"x": i, "blob": (i // 10,) * 20})
+    assert rw.size <= 20_000 and rw.start > 0
+    assert rw.seek(0.0)[0] == rw.start
+
+
+def test_telemetry_truncate_drops_frames_after_time(tmp_path):
+    pytest.importorskip("numpy")
+    path = str(tmp_path / "t.emtl")
+    rec = ee.TelemetryRecorder(path, ["serotonin"], ring=8, chunk=16)
+    for f in range(1, 41):
+        rec.record(f, f * 0.1, {"serotonin": 1.0}, {})
+    assert rec.truncate(1.45) == 14
+    for f in range(15, 21):
+        rec.record(f, f * 0.1, {"serotonin": 1.0}, {})
+    rec.close()
+    log = ee.TelemetryReader.open(path)
+    assert list(log["frame"]) == list(range(1, 21))
+
+
+def test_runtime_rng_resumes_from_seed_and_draw_count(scaffold):
+    ns = scaffold("anxiety")
+    rt = ns["MechanicRuntime"](dict(ns["NT"]), ns["MECHANICS"], seed=5)
+    for _ in range(3):
+        rt.roll()
+    draws, ahead = rt.draws, [rt.roll() for _ in range(4)]
+    rt.draws = draws
+    rt.resync_rng()
+    assert [rt.roll() for _ in range(4)] == ahead
+    assert "draws" in rt.STATE
+
+
+def test_scaffold_rewind_keeps_telemetry_monotonic(scaffold):
+    pytest.importorskip("numpy")
+    ns = scaffold("anxiety")
+    back = ns["pygame"].K_BACKSPACE
+    scaffold.run(ns, ["--telemetry", "r.emtl", "--keyframe", "0.5"], frames=150,
+                 held=lambda f: {back} if 90 <= f < 110 else set())
+    log = ee.TelemetryReader.open("r.emtl")
+    assert (log["t"][1:] > log["t"][:-1]).all()
+    assert list(log["frame"]) == list(range(1, len(log) + 1))
+    assert len(log) < 130
+
+
+# ── Wave Form lookahead (user-043) ────────────────────────────────────────────
+
+def _wave(**kw):
+    return ee.WaveForm([(120.0, 0.25, 0.0), (11.0, 0.05, 2.3)], seed=9, **kw)
+
+
+def test_wave_window_is_a_pure_function_of_time():
+    wave = _wave()
+    i = int(100.0 / wave.STEP)
+    assert wave.window(100.0, 30.0) == pytest.approx(wave.compute(i, int(30.0 / wave.STEP)))
+    assert wave.at(5000.0) == pytest.approx(wave.compute(40000, 1)[0])
+    assert wave.at(100.0) == pytest.approx(wave.compute(i, 1)[0])          # seek back
+    other = _wave(block=37)
+    assert [other.at(t * 0.5) for t in range(600)] == pytest.approx([wave.at(t * 0.5) for t in range(600)])
+    assert len(wave.window(0.0, 1000.0)) == wave.ahead
+
+
+def test_wave_window_shorter_than_a_step_is_empty():
+    wave = _wave()
+    wave.at(3.0)
+    assert wave.window(3.0, 0.0) == []
+    assert wave.window(3.0, wave.STEP / 2) == []
+    assert len(wave.window(3.0, wave.STEP)) == 1
+
+
+def test_wave_python_fallback_matches_numpy():
+    pytest.importorskip("numpy")
+    fast, slow = _wave(), _wave()
+    slow._np = None
+    assert slow.compute(1000, 500) == pytest.approx(fast.compute(1000, 500))
+
+
+def test_only_fluctuating_timelines_drive_the_scaffold_wave(scaffold, tmp_path):
+    for name in ("adhd", "depression", "anxiety", "bipolar"):
+        assert ee.TimelineGenerator.wave(name) == []
+    assert scaffold("depression")["WAVE"] is None
+    path = tmp_path / "migraine.json"
+    path.write_text(json.dumps({"migraine": _record("Migraine", timeline_pattern="fluctuating")}),
+                    encoding="utf-8")
+    ee.ConditionLibrary.load(str(path))
+    ns = scaffold("migraine")
+    assert ns["WAVE"] is not None
+    gs = ns["initial_state"]()
+    nt = dict(ns["NT"])
+    rt = ns["MechanicRuntime"](nt, ns["MECHANICS"], seed=1)
+    gs = ns["step_mechanics"](nt, gs, rt, ns["MedicationModel"](ns["MEDICATION_REGIMEN"]), 0, 10.0, 1 / 60)
+    assert gs["intensity"] == pytest.approx(ns["WAVE"].at(10.0))
+
+
+# ── O(1) time skip (user-044) ─────────────────────────────────────────────────
+
+def _runtime(ns, seed=0):
+    mechanics = {name: {"active": True} for name in
+                 ("Distractor Spawner", "False Positive Alerts", "Mood Cycle")}
+    return ns["MechanicRuntime"](dict(ns["NT"]), mechanics, seed=seed)
+
+
+def test_advance_skip_matches_small_steps(scaffold):
+    ns = scaffold("bipolar")
+    big, small = _runtime(ns), _runtime(ns)
+    fired = big.advance(1000.0)
+    distractors = sum(small.advance(0.5)["distractors"] for _ in range(2000))
+    assert fired["distractors"] == distractors == 125
+    assert fired["alert_rolls"] == 66
+    assert big._mood_phase == small._mood_phase
+    assert big._mood_timer == pytest.approx(small._mood_timer)
+    assert big._distractor_timer == pytest.approx(small._distractor_timer)
+
+
+def test_advance_a_week_is_one_call(scaffold):
+    ns = scaffold("bipolar")
+    rt = _runtime(ns)
+    t0 = time.perf_counter()
+    fired = rt.advance(7 * 86400.0)
+    assert time.perf_counter() - t0 < 0.01
+    assert fired["distractors"] == 7 * 86400 // 8
+    assert rt._false_alert_on and rt.draws == 1
+    cycle = sum(rt._MOOD_PHASES)
+    assert sum(rt._MOOD_PHASES[:rt._mood_phase]) + rt._mood_timer == pytest.approx(7 * 86400.0 % cycle)
+
+
+# ── Retained-mode Arcade HUD (user-045) ───────────────────────────────────────
+
+def test_arcade_frames_build_no_objects_and_push_only_changes(adapter):
+    ns, counts = adapter("arcade")
+    w = ns["GameWindow"]()
+    w.setup()
+    built = +counts
+    for _ in range(120):
+        w.on_update(1 / 60)
+        w.on_draw()
+    assert {k: v for k, v in counts.items() if k.endswith("()")} == \
+           {k: v for k, v in built.items() if k.endswith("()")}
+    assert counts["Text.text="] == 1 + 100 - round(w.energy * 100)   # once per whole percent
+    w.on_key_press("F1", 0)
+    w.on_draw(); w.on_draw()
+    rows = counts["Text.text="]
+    w.on_key_press("M", 0)
+    w.on_draw(); w.on_draw()
+    assert counts["Text.text="] - rows == len(w.nt)
+    assert w.params()["move_speed"] == pytest.approx(250 * w.nt["norepinephrine"])
+
+
+# ── Persistent Pyglet labels (user-046) ───────────────────────────────────────
+
+def test_pyglet_labels_are_built_once_and_updated_on_change(adapter):
+    ns, counts = adapter("pyglet")
+    labels = counts["Label()"]
+    assert labels == 1 + len(ns["prof_labels"]) + len(ns["nt"])
+    for _ in range(120):
+        ns["update"](1 / 60)
+        ns["on_draw"]()
+    assert counts["Label()"] == labels
+    assert counts["Label.text="] == len(ns["nt"]) + 1 + 100 - round(ns["state"]["energy"] * 100)
+    ns["on_key_press"]("F1", 0)
+    ns["on_key_press"]("M", 0)
+    ns["on_draw"]()
+    assert all(label.visible for label in ns["nt_labels"].values())
+    assert ns["nt_labels"]["serotonin"].text == f"serotonin: {ns['nt']['serotonin']:.3f}"
+
+
+def test_pyglet_install_hint_pins_v2_in_pyproject(engine, tmp_path):
+    assert ee.ENGINES["pyglet"]["install"] == 'pip install "pyglet>=2"'
+    game = engine.generate_game("adhd", "rhythm")
+    paths = engine.export_game(game, str(tmp_path), "pyglet", verbose=False)
+    pyproject = next(p for p in paths.values() if p.endswith("pyproject.toml"))
+    tomllib = pytest.importorskip("tomllib")
+    with open(pyproject, "rb") as f:
+        deps = tomllib.load(f)["project"]["dependencies"]
+    assert "pyglet>=2" in deps
+
+
+# ── Cached Panda3D scene objects (user-047) ───────────────────────────────────
+
+def test_panda3d_fog_and_hud_text_only_change_on_change(adapter, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["game.py"])
+    ns, counts = adapter("panda3d")
+    game = sys.modules["direct.showbase.ShowBase"].ShowBase.instances[-1]
+    hint = game.hint.node().text
+    assert "F3=Frame time" in hint and counts["TextNode.setText"] == 1
+    task, seen = types.SimpleNamespace(time=0.0), []
+    for i in range(240):
+        task.time = i / 60
+        game.update_task(task)
+        if not seen or seen[-1] != game.hud.node().text:
+            seen.append(game.hud.node().text)
+    assert counts["Fog()"] == 1 and counts["Fog.setLinearRange"] == 1
+    assert counts["TextNode.setText"] == 1 + len(seen)      # the frame readout is hidden
+    game.keys["f3"]()
+    game.keys["m"]()
+    game.update_task(task)
+    assert counts["Fog.setLinearRange"] == 2
+    assert game.hud.node().text != seen[-1] and "cached" in game.frame_hud.node().text
+    assert game.hint.node().text == hint
+
+
+# ── Persistent Kivy canvas instructions (user-048) ────────────────────────────
+
+def test_kivy_update_mutates_only_changed_instructions(adapter):
+    ns, counts = adapter("kivy")
+    w = ns["GameWidget"]()
+    assert counts["Rectangle()"] == 4 and counts["Color()"] == 4
+    built = {k: v for k, v in counts.items() if k.endswith("()")}
+    pcts, bars = [], []
+    for _ in range(600):
+        w.update(1 / 60)
+        pcts.append(round(w.energy * 100)); bars.append(int(200 * w.energy))
+    assert {k: v for k, v in counts.items() if k.endswith("()")} == built
+    assert counts["Label.text="] == len(set(pcts) - {100})
+    assert counts["Rectangle.size="] == len(set(bars) - {200})
+    assert counts["Color.rgb="] == counts["Rectangle.size="] + 1   # + player tint on frame one
+    assert counts["Rectangle.pos="] == 0
+    w.on_touch_down(types.SimpleNamespace(x=600))
+    w.energy = 0.0
+    w.update(1 / 60)
+    assert counts["Rectangle.pos="] == 1
+    graphics = lambda: {k: v for k, v in counts.items() if not k.startswith("GameWidget")}
+    before = graphics()
+    w.update(1 / 60)                                  # idle frame: no graphics writes
+    assert graphics() == before
+
+
+# ── Change-driven Ursina and Cocos2d HUDs (user-049) ──────────────────────────
+
+def test_ursina_update_reassigns_only_on_change(adapter, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["game.py"])
+    ns, counts = adapter("ursina")
+    update = ns["update"]
+    update.__globals__["HUD_HZ"] = 1e-6              # keep the FPS counter out of the counts
+    pcts = []
+    for _ in range(600):
+        update()
+        pcts.append(round(update.__globals__["energy"][0] * 100))
+    assert counts["Text.text="] == len(set(pcts) - {100})
+    assert counts["Entity.color="] == counts["FirstPersonController.speed="] == 1
+    update.__globals__["input"]("m")
+    update()
+    assert counts["Entity.color="] == counts["FirstPersonController.speed="] == 2
+
+
+def test_cocos2d_label_relayouts_only_on_change(adapter, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["game.py"])
+    ns, counts = adapter("cocos2d")
+    layer = ns["GameLayer"]()
+    layer.update.__globals__["HUD_HZ"] = 1e-6
+    pcts = []
+    for _ in range(600):
+        layer.update(1 / 60)
+        pcts.append(round(layer.energy * 100))
+    assert counts["Element.text="] == len(set(pcts))      # the first frame adds serotonin
+    assert layer.hint.element.text == "F1=Console  M=Medication"
+    text = layer.lbl.element.text
+    layer.on_key_press("M", 0)
+    layer.update(0.0)
+    assert counts["Element.text="] == len(set(pcts)) + 1
+    assert layer.lbl.element.text != text and "serotonin" in text
+
+
+# ── VBO-batched PyOpenGL renderer (user-050) ──────────────────────────────────
+
+def _uploads():
+    """(offset, size) of each glBufferSubData since the last call; drains CALLS."""
+    spans = [args[1:3] for name, args in engine_doubles.CALLS if name == "glBufferSubData"]
+    engine_doubles.CALLS.clear()
+    return spans
+
+
+def test_pyopengl_one_draw_call_and_dirty_span_uploads(adapter, monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(sys, "argv", ["game.py"])
+    ns, counts = adapter("pyopengl")
+    display, timer_cb = ns["display"], ns["timer_cb"]
+    display()
+    assert counts["glDrawArrays"] == 1
+    draws = [args for name, args in engine_doubles.CALLS if name == "glDrawArrays"]
+    assert draws == [(ns["GL_TRIANGLES"], 0, 6 * 4)]
+    assert sorted(_uploads()) == [(0, 4 * 48), (0, 4 * 96)]   # xy, rgba: the four quads
+    display()
+    assert _uploads() == [] and counts["glDrawArrays"] == 2     # idle frame: draw only
+    shown = timer_cb.__globals__["shown"]
+    bar = shown["bar"]
+    while shown["bar"] == bar:
+        timer_cb(0)
+    display()
+    bar_quad = timer_cb.__globals__["BAR"]
+    assert sorted(_uploads()) == [(bar_quad * 48, 48), (bar_quad * 96, 96)]
+
+
+def test_pyopengl_stress_quads_share_the_draw_call(adapter, monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(sys, "argv", ["game.py", "--stress", "50"])
+    ns, counts = adapter("pyopengl")
+    ns["energy"][0] = 0.0                                        # hold the energy bar still
+    ns["timer_cb"](0); ns["display"](); _uploads()
+    for frame in range(5):
+        ns["timer_cb"](0)
+        ns["display"]()
+        first = ns["timer_cb"].__globals__["FIRST_STRESS"]
+        assert _uploads() == [(first * 48, 50 * 48)]             # positions only, colours kept
+    assert counts["glDrawArrays"] == 6